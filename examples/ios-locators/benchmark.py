@@ -0,0 +1,73 @@
+#!vpy/bin/python
+"""
+Compare how long it takes to find the same iOS element with each locator strategy, on a stub driver.
+
+The stub is an :class:`slickwd.AppiumSourceDriver` loaded with a generated XCUITest page source, made to do the work
+WebDriverAgent does for each strategy: every lookup pays a round trip, xpath builds (serializes and parses) the whole
+page source first, a predicate is evaluated against every element, a class chain only walks the path it names, and an
+accessibility id is looked up directly.  The numbers show the relative cost, not what a real device will measure.
+
+    python benchmark.py [number of table cells] [round trip in milliseconds]
+"""
+
+import sys
+import time
+
+from slickwd import Browser, BrowserType, WebElementLocator, Find, AppiumSourceDriver, lxml_etree
+from selenium.webdriver.common.by import By
+
+__author__ = 'jcorbett'
+
+
+class StubXCUITestDriver(AppiumSourceDriver):
+
+    def __init__(self, source, round_trip):
+        AppiumSourceDriver.__init__(self, source)
+        self.round_trip = round_trip
+
+    def _find(self, by, value, node):
+        time.sleep(self.round_trip)
+        if by == By.XPATH:
+            # WebDriverAgent has to build the whole page source to run an xpath against it
+            self.root = lxml_etree.fromstring(lxml_etree.tostring(self.root))
+        return AppiumSourceDriver._find(self, by, value, node)
+
+
+def page_source(cells):
+    rows = "".join(['<XCUIElementTypeCell type="XCUIElementTypeCell" name="cell {0}" label="" enabled="true" '
+                    'visible="true" x="0" y="{1}" width="375" height="44"><XCUIElementTypeStaticText '
+                    'type="XCUIElementTypeStaticText" name="Item {0}" label="Item {0}" value="Item {0}" enabled="true" '
+                    'visible="true" x="16" y="{1}" width="300" height="44"/></XCUIElementTypeCell>'.format(i, i * 44)
+                    for i in range(cells)])
+    return ('<AppiumAUT><XCUIElementTypeApplication type="XCUIElementTypeApplication" name="Example" label="Example" '
+            'enabled="true" visible="true"><XCUIElementTypeWindow type="XCUIElementTypeWindow" enabled="true" '
+            'visible="true"><XCUIElementTypeTable type="XCUIElementTypeTable" enabled="true" visible="true">{}'
+            '</XCUIElementTypeTable><XCUIElementTypeButton type="XCUIElementTypeButton" name="Log in" label="Log in" '
+            'enabled="true" visible="true"/></XCUIElementTypeWindow></XCUIElementTypeApplication></AppiumAUT>'
+            .format(rows))
+
+
+def main(cells=2000, round_trip_ms=2.0, repeat=20):
+    browser = Browser(BrowserType.FAKE_MOBILE, default_timeout=0)
+    browser.wd_instance = StubXCUITestDriver(page_source(int(cells)), round_trip_ms / 1000.0)
+    xpath = "//XCUIElementTypeButton[@name='Log in']"
+    locators = [
+        ("xpath", Find.by_xpath(xpath)),
+        ("predicate", Find.by_ios_predicate("type == 'XCUIElementTypeButton' AND name == 'Log in'")),
+        ("class chain", Find.by_ios_xpath(xpath)),
+        ("accessibility id", Find.by_ios_xpath("//*[@name='Log in']")),
+    ]
+    print("{} elements, {:.1f} ms round trip".format(int(cells) * 2 + 5, round_trip_ms))
+    for name, finder in locators:
+        locator = WebElementLocator(name, finder)
+        timings = []
+        for _ in range(repeat):
+            start = time.time()
+            assert browser.exists(locator, timeout=0, log=False)
+            timings.append(time.time() - start)
+        timings.sort()
+        print("{:<18}{:>9.2f} ms  {}".format(name, timings[len(timings) // 2] * 1000, finder.describe()))
+
+
+if __name__ == '__main__':
+    main(*[float(arg) for arg in sys.argv[1:3]])
@@ -14,6 +14,10 @@ with open('requirements.txt', 'r') as reqfile:
 if sys.version_info[0] < 3 or sys.version_info[1] < 4:
     requirements.append('enum34')
 
+# get the backport of concurrent.futures if python version is less than 3.2
+if sys.version_info[0] < 3:
+    requirements.append('futures')
+
 build_requirements = []
 with open('build-requirements.txt', 'r') as reqfile:
     build_requirements.extend(reqfile.read().split())
@@ -28,7 +32,9 @@ setup(
     package_data={'': ['*.txt', '*.rst', '*.html']},
     include_package_data=True,
     install_requires=requirements,
+    extras_require={'fake': ['lxml', 'cssselect'], 'visual': ['numpy', 'Pillow']},
     setup_requires=build_requirements,
+    entry_points={'console_scripts': ['slickwd-run = slickwd:main']},
     author="SlickQA Developers",
     url="http://www.slickqa.com/webdriver/python"
 )
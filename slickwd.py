@@ -1,20 +1,82 @@
 """
 """
 
+import argparse
+import atexit
+import binascii
+import errno
+import fnmatch
+import functools
+import getpass
+import hashlib
+import heapq
+import importlib
+import inspect
+import io
+import json
 import logging
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import threading
+import traceback
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from enum import Enum
 from selenium.webdriver.common.desired_capabilities import DesiredCapabilities
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
-from selenium.common.exceptions import WebDriverException
+from selenium.common.exceptions import WebDriverException, NoSuchElementException, StaleElementReferenceException, \
+    InvalidSelectorException, UnknownMethodException
 from selenium.webdriver.support.select import Select
 from selenium import webdriver
+from selenium.webdriver.remote.remote_connection import RemoteConnection
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.remote.errorhandler import ErrorCode
 import appium
+import urllib3
 from appium.webdriver.common.mobileby import MobileBy
 
 from pydispatch import dispatcher
 import time
 
+try:
+    from urllib.parse import urljoin, urlparse
+    from urllib.request import url2pathname
+except ImportError:
+    from urlparse import urljoin, urlparse
+    from urllib import url2pathname
+
+# lxml and cssselect are only needed for the fake browser (BrowserType.FAKE), lxml for the page source index
+try:
+    import lxml.etree as lxml_etree
+except ImportError:
+    lxml_etree = None
+try:
+    import lxml.html as lxml_html
+    import cssselect
+except ImportError:
+    lxml_html = None
+    cssselect = None
+
+# numpy and Pillow are only needed for comparing screenshots (VisualComparison)
+try:
+    import numpy
+    from PIL import Image
+except ImportError:
+    numpy = None
+    Image = None
+
+try:
+    _string_types = basestring
+except NameError:
+    # python 3
+    _string_types = str
+
 __author__ = 'Jason Corbett'
 
 
@@ -52,6 +114,14 @@ class BrowserType(Enum):
     ANDROID = (DesiredCapabilities.ANDROID, None)
     PHANTOMJS = (DesiredCapabilities.PHANTOMJS, webdriver.PhantomJS)
     """PhantomJS headless browser (must download separately, `phantomjs homepage <http://phantomjs.org/>`_)"""
+    FAKE = ({'browserName': 'slickwd-fake', 'version': '', 'platform': 'ANY'}, lambda: FakeWebDriver())
+    """
+    In-process fake browser for testing page classes without a browser, see :class:`.FakeWebDriver` (requires
+    lxml and cssselect)"""
+    FAKE_MOBILE = ({'platformName': 'slickwd-fake', 'browserName': ''}, lambda: AppiumSourceDriver())
+    """
+    In-process fake app for testing mobile page classes against captured page source, see
+    :class:`.AppiumSourceDriver` (requires lxml)"""
 
 
 class Find(object):
@@ -67,6 +137,12 @@ class Find(object):
     on the page by looking for an element with the name property set to *q*.
     """
 
+    SHADOW_PATH = "slickwd shadow path"
+    """
+    Locator strategy used by :meth:`.Find.by_shadow_path`.  Webdriver doesn't know about it, the framework resolves
+    it with a single script call inside the browser.
+    """
+
     def __init__(self, by, value):
         self.finders = [(by, value), ]
         self._and = False
@@ -102,6 +178,10 @@ class Find(object):
             return "ios predicate string \"{}\"".format(value)
         elif name is MobileBy.IOS_UIAUTOMATION:
             return "ios uiautomation \"{}\"".format(value)
+        elif name is MobileBy.IOS_CLASS_CHAIN:
+            return "ios class chain \"{}\"".format(value)
+        elif name is Find.SHADOW_PATH:
+            return "shadow path \"{}\"".format(" > ".join(value))
 
     def Or(self, finder):
         """
@@ -120,6 +200,43 @@ class Find(object):
         self.finders.extend(finder.finders)
         return self
 
+    def script_finder(self):
+        """
+        Translate the first finder into something that javascript running in the browser can use.  This is used
+        by the framework when a lookup is done inside a single script call (for example
+        :meth:`.Browser.extract_rows`).  Only finders that can be expressed as a css selector or an xpath are
+        supported.
+
+        :return: a tuple of ("css" or "xpath", expression)
+        :rtype: (str, str)
+        """
+        return self.script_finders()[0]
+
+    def script_finders(self):
+        """
+        Like :meth:`.script_finder`, for every finder (the alternatives of an Or), in order.
+
+        :return: a list of ("css" or "xpath", expression) tuples
+        :rtype: list
+        """
+        retval = []
+        for by, value in self.finders:
+            if by is By.CSS_SELECTOR or by is By.TAG_NAME:
+                retval.append(("css", value))
+            elif by is By.XPATH:
+                retval.append(("xpath", value))
+            elif by is By.ID or by is By.NAME:
+                # an xpath string literal can hold any value, quotes and all
+                retval.append(("xpath", ".//*[@{}={}]".format(by, _xpath_literal(value))))
+            elif by is By.CLASS_NAME:
+                # xpath instead of ".{}" so class names with css special characters don't need escaping
+                retval.append(("xpath", ".//*[contains(concat(' ', normalize-space(@class), ' '), {})]".format(
+                    _xpath_literal(" {} ".format(value)))))
+            else:
+                raise WebDriverException("Finder {} can't be used inside the browser, use a css selector or xpath "
+                                         "instead.".format(Find.describe_single_finder(by, value)))
+        return retval
+
     def allow_multiple_finds(self):
         return self._and
 
@@ -276,14 +393,139 @@ class Find(object):
     @classmethod
     def by_ios_uiautomation(cls, uiautomation_value):
         """
-        Find a mobile element using an uiautomation locator.  Only valid on iOS.
+        Find a mobile element using an uiautomation locator.  Only valid on iOS, with the (old) UIAutomation driver.
 
-        :param uiautomation_value: The predicate to search for
+        :param uiautomation_value: The uiautomation to search for
         :type uiautomation_value: str
         :return: an instance of Find that looks for the uiautomation on the mobile device
         :rtype: :class:`.Find`
         """
-        return Find(MobileBy.IOS_PREDICATE, uiautomation_value)
+        return Find(MobileBy.IOS_UIAUTOMATION, uiautomation_value)
+
+    @classmethod
+    def by_ios_class_chain(cls, class_chain_value):
+        """
+        Find a mobile element using a class chain locator.  Only valid on iOS (XCUITest).  Class chains are resolved
+        by walking the element tree instead of building the whole page source like xpath does, so they are much faster.
+        https://github.com/facebookarchive/WebDriverAgent/wiki/Class-Chain-Queries-Construction-Rules
+
+        Example Usage::
+
+            Login_Button = WebElementLocator("Login Button",
+                                             Find.by_ios_class_chain("**/XCUIElementTypeButton[`label == \\"Log in\\"`]"))
+
+        :param class_chain_value: The class chain to search for
+        :type class_chain_value: str
+        :return: an instance of Find that looks for the class chain on the mobile device
+        :rtype: :class:`.Find`
+        """
+        return Find(MobileBy.IOS_CLASS_CHAIN, class_chain_value)
+
+    @classmethod
+    def by_ios_xpath(cls, xpath_value):
+        """
+        Find an iOS element using an xpath, translated into a faster strategy when there is an equivalent one.  An
+        xpath that only matches the name (like ``//*[@name='Log in']``) becomes an accessibility id, and one made of
+        element types, comparisons of attributes (name, label, value, type, visible and enabled) joined with *and*,
+        contains(), starts-with() and indexes becomes a class chain (see :meth:`.by_ios_class_chain`).  Anything
+        else stays an xpath.
+
+        :param xpath_value: The xpath to search for
+        :type xpath_value: str
+        :return: an instance of Find that looks for the xpath (or its equivalent) on the mobile device
+        :rtype: :class:`.Find`
+        """
+        return Find(*Find._compile_ios_xpath(xpath_value))
+
+    IOS_XPATH_STEP = re.compile(r'(//|/)(\*|XCUIElementType\w+)((?:\[(?:[^\]\'"]|\'[^\']*\'|"[^"]*")*\])*)')
+    IOS_XPATH_PREDICATE = re.compile(r'\[((?:[^\]\'"]|\'[^\']*\'|"[^"]*")*)\]')
+    IOS_XPATH_CONDITION = re.compile(r'^\s*(?:@(\w+)\s*=\s*(\'[^\']*\'|"[^"]*")|(contains|starts-with)\(\s*@(\w+)\s*,'
+                                     r'\s*(\'[^\']*\'|"[^"]*")\s*\))\s*$')
+    IOS_CLASS_CHAIN_ATTRIBUTES = frozenset(['name', 'label', 'value', 'type', 'visible', 'enabled'])
+
+    @classmethod
+    def _compile_ios_xpath(cls, xpath):
+        """
+        Internal method, the fastest (strategy, value) equivalent to an iOS xpath, see :meth:`.by_ios_xpath`.
+        """
+        original = xpath = xpath.strip()
+        if xpath.startswith("/XCUIElementTypeApplication/"):
+            # class chains start from the application
+            xpath = xpath[len("/XCUIElementTypeApplication"):]
+        elif not xpath.startswith("//"):
+            return By.XPATH, original
+        steps, position = [], 0
+        while position < len(xpath):
+            match = cls.IOS_XPATH_STEP.match(xpath, position)
+            if match is None:
+                return By.XPATH, original
+            axis, element_type, predicates = match.groups()
+            conditions, index = [], None
+            for predicate in cls.IOS_XPATH_PREDICATE.findall(predicates):
+                if predicate.strip().lstrip('-').isdigit() and index is None:
+                    index = predicate.strip()
+                    continue
+                if index is not None:
+                    # an xpath index before a condition means something a class chain can't say
+                    return By.XPATH, original
+                for condition in re.split(r'\s+and\s+', predicate):
+                    parts = cls.IOS_XPATH_CONDITION.match(condition)
+                    if parts is None:
+                        return By.XPATH, original
+                    attribute, wanted, function, function_attribute, function_wanted = parts.groups()
+                    attribute = attribute or function_attribute
+                    wanted = (wanted or function_wanted)[1:-1]
+                    if attribute not in cls.IOS_CLASS_CHAIN_ATTRIBUTES or '`' in wanted:
+                        return By.XPATH, original
+                    operator = {None: '==', 'contains': 'CONTAINS', 'starts-with': 'BEGINSWITH'}[function]
+                    if attribute in ('visible', 'enabled') and operator == '==' and wanted in ('true', 'false'):
+                        wanted = '1' if wanted == 'true' else '0'
+                    else:
+                        wanted = '"{}"'.format(wanted.replace('\\', '\\\\').replace('"', '\\"'))
+                    conditions.append((attribute, operator, wanted))
+            if index is not None and axis == '//':
+                # //X[2] is every X that is the second X of its parent, a class chain would take the second X found
+                return By.XPATH, original
+            steps.append((axis, element_type, conditions, index))
+            position = match.end()
+        if not steps:
+            return By.XPATH, original
+        if len(steps) == 1 and steps[0][0] == '//' and steps[0][1] == '*' and steps[0][3] is None and \
+                len(steps[0][2]) == 1 and steps[0][2][0][:2] == ('name', '=='):
+            return MobileBy.ACCESSIBILITY_ID, Find._ios_xpath_value(steps[0][2][0][2])
+        chain = []
+        for axis, element_type, conditions, index in steps:
+            step = ("**/" if axis == '//' else "") + element_type
+            if conditions:
+                step += "[`{}`]".format(" AND ".join(["{} {} {}".format(*condition) for condition in conditions]))
+            if index is not None:
+                step += "[{}]".format(index)
+            chain.append(step)
+        return MobileBy.IOS_CLASS_CHAIN, "/".join(chain)
+
+    @classmethod
+    def _ios_xpath_value(cls, quoted):
+        return re.sub(r'\\(.)', r'\1', quoted[1:-1])
+
+    @classmethod
+    def by_shadow_path(cls, *css_selectors):
+        """
+        Find a web element that lives inside one or more shadow roots (web components).  Each css selector except
+        the last identifies shadow hosts, and the next selector is looked for inside the shadow root of every one
+        of them.  The whole path is resolved inside the browser in one round trip.
+
+        Example Usage::
+
+            Save_Button = WebElementLocator("Save Button", Find.by_shadow_path("app-shell", "save-dialog", "button.save"))
+
+        :param css_selectors: the css selectors of each shadow host, followed by the selector of the element itself
+        :type css_selectors: str
+        :return: an instance of Find that walks the shadow roots to find the element
+        :rtype: :class:`.Find`
+        """
+        if len(css_selectors) == 0:
+            raise WebDriverException("by_shadow_path requires at least one css selector")
+        return Find(Find.SHADOW_PATH, tuple(css_selectors))
 
 
 # there is no doc because this is not intended to be used externally (not that it can't be)
@@ -296,6 +538,140 @@ class Timer(object):
         return time.time() > self.end
 
 
+class PinnedScripts(object):
+    """
+    Send big, often repeated javascript to the browser only once per page.  The first time a script runs on a page it
+    is installed as a function on *window.__slickwd* (that's also the marker, a new page doesn't have it).  After
+    that only a short stub naming the function is sent with the arguments.  When the browser navigates the marker is
+    gone, the stub reports that, and the script is installed again in the same call that runs it.  Scripts that run
+    right after a navigation would always miss, so they use :meth:`.install` to skip the stub.
+
+    Scripts shorter than the stub are always sent as they are.  Drivers that don't run real javascript (like
+    :class:`.FakeWebDriver`) set *supports_pinned_scripts* to False and always get the whole script.
+    """
+
+    STUB_JS = """
+    var pinned = window.__slickwd;
+    var args = Array.prototype.slice.call(arguments, 1);
+    return pinned && pinned[arguments[0]] ? pinned[arguments[0]].apply(null, args) : {'__slickwdMissing': true};
+    """
+
+    ASYNC_STUB_JS = """
+    var pinned = window.__slickwd;
+    var args = Array.prototype.slice.call(arguments, 1);
+    if (pinned && pinned[arguments[0]]) {
+        pinned[arguments[0]].apply(null, args);
+    } else {
+        args[args.length - 1]({'__slickwdMissing': true});
+    }
+    """
+
+    INSTALL_JS = """
+    window.__slickwd = window.__slickwd || {{}};
+    window.__slickwd['{name}'] = function() {{
+    {source}
+    }};
+    {call}window.__slickwd['{name}'].apply(null, arguments);
+    """
+
+    stats = {'calls': 0, 'installs': 0}
+    """How many pinned calls were made, and how many of them had to install the script"""
+    _lock = threading.Lock()
+
+    @classmethod
+    def name_of(cls, source):
+        return "s" + hashlib.sha1(source.encode('utf-8')).hexdigest()[:16]
+
+    @classmethod
+    def _missing(cls, result):
+        return isinstance(result, dict) and result.get('__slickwdMissing') is True
+
+    @classmethod
+    def _count(cls, stat):
+        with cls._lock:
+            cls.stats[stat] += 1
+
+    @classmethod
+    def execute(cls, wd_browser, source, *args):
+        """
+        Run a script like *execute_script* does, sending the whole script only if the page doesn't have it yet.
+
+        :param wd_browser: The selenium driver (webdriver) instance to use.
+        :param source: the javascript to run (it can use arguments and return like any *execute_script* script)
+        :type source: str
+        :return: whatever the script returns
+        """
+        if not getattr(wd_browser, 'supports_pinned_scripts', True) or len(source) <= len(cls.STUB_JS):
+            return wd_browser.execute_script(source, *args)
+        name = cls.name_of(source)
+        cls._count('calls')
+        # another thread navigating between the stub and the install would run the script on the wrong page
+        with _command_lock(wd_browser):
+            result = wd_browser.execute_script(cls.STUB_JS, name, *args)
+            if cls._missing(result):
+                cls._count('installs')
+                result = wd_browser.execute_script(cls.INSTALL_JS.format(name=name, source=source, call="return "),
+                                                   *args)
+        return result
+
+    @classmethod
+    def install(cls, wd_browser, source, *args):
+        """
+        Like :meth:`.execute`, for a page that can't have the script yet (right after navigating): the script is
+        installed and run in one call, without asking for it first.
+
+        :param wd_browser: The selenium driver (webdriver) instance to use.
+        :param source: the javascript to run
+        :type source: str
+        :return: whatever the script returns
+        """
+        if not getattr(wd_browser, 'supports_pinned_scripts', True) or len(source) <= len(cls.STUB_JS):
+            return wd_browser.execute_script(source, *args)
+        cls._count('calls')
+        cls._count('installs')
+        return wd_browser.execute_script(cls.INSTALL_JS.format(name=cls.name_of(source), source=source,
+                                                               call="return "), *args)
+
+    @classmethod
+    def execute_async(cls, wd_browser, source, *args):
+        """
+        Run a script like *execute_async_script* does, sending the whole script only if the page doesn't have it yet.
+
+        :param wd_browser: The selenium driver (webdriver) instance to use.
+        :param source: the javascript to run (the callback is the last argument, as usual)
+        :type source: str
+        :return: whatever the script passes to the callback
+        """
+        if not getattr(wd_browser, 'supports_pinned_scripts', True) or len(source) <= len(cls.ASYNC_STUB_JS):
+            return wd_browser.execute_async_script(source, *args)
+        name = cls.name_of(source)
+        cls._count('calls')
+        with _command_lock(wd_browser):
+            result = wd_browser.execute_async_script(cls.ASYNC_STUB_JS, name, *args)
+            if cls._missing(result):
+                cls._count('installs')
+                result = wd_browser.execute_async_script(cls.INSTALL_JS.format(name=name, source=source, call=""),
+                                                         *args)
+        return result
+
+    @classmethod
+    def install_async(cls, wd_browser, source, *args):
+        """
+        Like :meth:`.execute_async`, for a page that can't have the script yet (see :meth:`.install`).
+
+        :param wd_browser: The selenium driver (webdriver) instance to use.
+        :param source: the javascript to run (the callback is the last argument, as usual)
+        :type source: str
+        :return: whatever the script passes to the callback
+        """
+        if not getattr(wd_browser, 'supports_pinned_scripts', True) or len(source) <= len(cls.ASYNC_STUB_JS):
+            return wd_browser.execute_async_script(source, *args)
+        cls._count('calls')
+        cls._count('installs')
+        return wd_browser.execute_async_script(cls.INSTALL_JS.format(name=cls.name_of(source), source=source,
+                                                                     call=""), *args)
+
+
 class WebElementLocator(object):
     """
     A WebElementLocator represents information about an element you are trying to find.  It has a name field for
@@ -320,15 +696,51 @@ class WebElementLocator(object):
     }
     """
 
-    def __init__(self, name, finder):
+    SHADOW_PATH_JS = """
+    var path = arguments[0];
+    var roots = [arguments[1] || document];
+    // every matching host is searched, not just the first (a list of components each with their own shadow root)
+    for (var i = 0; i < path.length - 1 && roots.length; i++) {
+        var next = [];
+        for (var j = 0; j < roots.length; j++) {
+            var hosts = roots[j].querySelectorAll(path[i]);
+            for (var k = 0; k < hosts.length; k++) {
+                if (hosts[k].shadowRoot) {
+                    next.push(hosts[k].shadowRoot);
+                }
+            }
+        }
+        roots = next;
+    }
+    var found = [];
+    for (var r = 0; r < roots.length; r++) {
+        found.push.apply(found, Array.prototype.slice.call(roots[r].querySelectorAll(path[path.length - 1])));
+    }
+    return found;
+    """
+
+    def __init__(self, name, finder, within=None):
         # id=None, xpath=None, link_text=None, partial_link_text=None, name=None, href=None,
         # tag_name=None, class_name=None, css_selector=None):
+        """
+        :param name: a plain english name for the element, used in logging
+        :type name: str
+        :param finder: how to find the element
+        :type finder: :class:`.Find`
+        :param within: an optional locator for a parent element.  When provided this element is only looked for
+                       inside of the parent element, see :doc:`locators`.
+        :type within: :class:`.WebElementLocator`
+        """
         self.name = name
         self.finder = finder
+        self.within = within
         self.logger = logging.getLogger("slickwd.WebElementLocator")
         self.parent = None
         self.parent_initialized = False
+        self.cached_elements = weakref.WeakKeyDictionary()
         self.description = "{} found by {}".format(name, finder.describe())
+        if within is not None:
+            self.description = "{} within {}".format(self.description, within.name)
 
     def get_page_name(self):
         if self.parent is not None:
@@ -343,11 +755,102 @@ class WebElementLocator(object):
         """
         for i in range(3):
             try:
-                wd_browser.execute_async_script(WebElementLocator.WAIT_FOR_ANGULAR_JS)
+                PinnedScripts.execute_async(wd_browser, WebElementLocator.WAIT_FOR_ANGULAR_JS)
                 break
             except:
                 time.sleep(retry_interval)
 
+    # how many times the page has changed in each driver, cached elements found before a change are not reused
+    page_changes = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def page_changed(cls, wd_browser):
+        """
+        Forget the elements every locator has cached for wd_browser, call it when the driver loads another page or
+        switches to another tab.  :class:`.Browser` does this itself in go_to, refresh and when switching tabs.
+
+        :param wd_browser: The selenium driver (webdriver) instance whose page changed.
+        """
+        cls.page_changes[wd_browser] = cls.page_changes.get(wd_browser, 0) + 1
+
+    def get_cached_element(self, wd_browser):
+        """
+        Get the element this locator refers to, reusing the one found last time in the same browser (as long as it
+        hasn't loaded another page since, see :meth:`.page_changed`).  This is used for locators that other locators
+        are found *within*, so that sibling lookups (cells in a table row, fields in a card) only look for the parent
+        element once.  If the element can't be found right now NoSuchElementException is raised.
+
+        :param wd_browser: The selenium driver (webdriver) instance to use.
+        :return: a raw webdriver webelement
+        """
+        page = WebElementLocator.page_changes.get(wd_browser, 0)
+        cached = self.cached_elements.get(wd_browser)
+        if cached is not None and cached[0] == page:
+            return cached[1]
+        element = self.find_element_matching(wd_browser, 0, False)
+        if element is None:
+            raise NoSuchElementException("Unable to find element {}".format(self.describe()))
+        self.cached_elements[wd_browser] = (page, element)
+        return element
+
+    def _logger(self, wd_browser):
+        """
+        Internal method, the logger to use while looking in wd_browser: the :class:`.DebugLog` logger of the browser
+        it belongs to if it has one, otherwise :attr:`logger`.
+        """
+        debug_log = DebugLog.drivers.get(wd_browser)
+        if debug_log is None:
+            return self.logger
+        return debug_log.get_logger(self.logger.name)
+
+    def clear_cached_element(self, wd_browser=None):
+        """
+        Forget the element cached by :meth:`.get_cached_element`, the next lookup will find it again.
+
+        :param wd_browser: only forget the element cached for this driver, default is every driver
+        """
+        if wd_browser is None:
+            self.cached_elements.clear()
+        else:
+            self.cached_elements.pop(wd_browser, None)
+
+    def _find_elements_by(self, wd_browser, finder, parent_element=None):
+        """
+        Internal method, find all the elements for a single (by, value) finder.  Strategies that webdriver doesn't
+        know about (like :attr:`.Find.SHADOW_PATH`) are resolved with a script.
+        """
+        if parent_element is None and self.within is not None:
+            try:
+                return self._find_elements_by(wd_browser, finder, self.within.get_cached_element(wd_browser))
+            except StaleElementReferenceException:
+                self.within.clear_cached_element(wd_browser)
+                return self._find_elements_by(wd_browser, finder, self.within.get_cached_element(wd_browser))
+        if finder[0] is Find.SHADOW_PATH:
+            return PinnedScripts.execute(wd_browser, WebElementLocator.SHADOW_PATH_JS, list(finder[1]), parent_element) or []
+        if parent_element is not None:
+            return parent_element.find_elements(by=finder[0], value=finder[1])
+        return wd_browser.find_elements(finder[0], finder[1])
+
+    def _find_element_by(self, wd_browser, finder, parent_element=None):
+        """
+        Internal method, find the first element for a single (by, value) finder.  Raises NoSuchElementException
+        like webdriver does when nothing matches.
+        """
+        if parent_element is None and self.within is not None:
+            try:
+                return self._find_element_by(wd_browser, finder, self.within.get_cached_element(wd_browser))
+            except StaleElementReferenceException:
+                self.within.clear_cached_element(wd_browser)
+                return self._find_element_by(wd_browser, finder, self.within.get_cached_element(wd_browser))
+        if finder[0] is Find.SHADOW_PATH:
+            elements = self._find_elements_by(wd_browser, finder, parent_element)
+            if not elements:
+                raise NoSuchElementException("No element found by {}".format(Find.describe_single_finder(*finder)))
+            return elements[0]
+        if parent_element is not None:
+            return parent_element.find_element(by=finder[0], value=finder[1])
+        return wd_browser.find_element(finder[0], finder[1])
+
     def find_all_elements_matching(self, wd_browser, timeout=None, log=True, angular=False, retry_interval=.25):
         """
         Find a list of elements that match a finder.  This method can be useful if you are
@@ -363,6 +866,7 @@ class WebElementLocator(object):
         :return: list of matching elements
         :rtype: list of web element
         """
+        logger = self._logger(wd_browser)
         if timeout is None:
             timeout = 0
 
@@ -372,10 +876,10 @@ class WebElementLocator(object):
         retval = []
         if timeout == 0:
             if log:
-                self.logger.debug("Looking for a list of elements matching {}".format(self.describe()))
+                logger.debug("Looking for a list of elements matching %s", self.describe())
             for finder in self.finder.finders:
                 try:
-                    elements = wd_browser.find_elements(finder[0], finder[1])
+                    elements = self._find_elements_by(wd_browser, finder)
                     if not self.finder.allow_multiple_finds():
                         if elements:
                             retval = elements
@@ -387,19 +891,19 @@ class WebElementLocator(object):
                     pass
             if len(retval) > 0:
                 if log:
-                    self.logger.debug("Found {} elements matching {}".format(len(retval), self.describe()))
+                    logger.debug("Found %s elements matching %s", len(retval), self.describe())
 
                 return retval
         else:
             timer = Timer(timeout)
             if log:
-                self.logger.debug(
-                    "Waiting for up to {:.2f} seconds for element {} to be available.".format(float(timeout), self.describe()))
+                logger.debug(
+                    "Waiting for up to %.2f seconds for element %s to be available.", float(timeout), self.describe())
 
             while not timer.is_past_timeout():
                 for finder in self.finder.finders:
                     try:
-                        elements = wd_browser.find_elements(finder[0], finder[1])
+                        elements = self._find_elements_by(wd_browser, finder)
                         if not self.finder.allow_multiple_finds():
                             if elements:
                                 retval = elements
@@ -412,14 +916,14 @@ class WebElementLocator(object):
 
                 if len(retval) > 0:
                     if log:
-                        self.logger.debug("Found {} elements matching {}".format(len(retval), self.describe()))
+                        logger.debug("Found %s elements matching %s", len(retval), self.describe())
                     return retval
 
                 time.sleep(retry_interval)
 
             if len(retval) > 0:
                 if log:
-                    self.logger.debug("Found {} elements matching {}".format(len(retval), self.describe()))
+                    logger.debug("Found %s elements matching %s", len(retval), self.describe())
 
                 return retval
 
@@ -439,6 +943,7 @@ class WebElementLocator(object):
         :type log: bool
         :return: a raw webdriver webelement type on success, None on failure
         """
+        logger = self._logger(wd_browser)
         if timeout is None:
             timeout = 0
 
@@ -447,39 +952,35 @@ class WebElementLocator(object):
 
         if timeout == 0:
             if log:
-                self.logger.debug("Attempting 1 time to find element {} .".format(self.describe()))
+                logger.debug("Attempting 1 time to find element %s .", self.describe())
             for finder in self.finder.finders:
                 try:
-                    return wd_browser.find_element(finder[0], finder[1])
+                    return self._find_element_by(wd_browser, finder)
                 except WebDriverException:
                     pass
             else:
                 if log:
-                    self.logger.warn("Unable to find element {}".format(self.describe()))
+                    logger.warn("Unable to find element %s", self.describe())
                 return None
         else:
             timer = Timer(timeout)
             if log:
-                self.logger.debug(
-                    "Waiting for up to {:.2f} seconds for element {} to be available.".format(float(timeout), self.describe()))
+                logger.debug(
+                    "Waiting for up to %.2f seconds for element %s to be available.", float(timeout), self.describe())
 
             while not timer.is_past_timeout():
                 for finder in self.finder.finders:
                     retval = None
                     try:
-                        retval = wd_browser.find_element(finder[0], finder[1])
+                        retval = self._find_element_by(wd_browser, finder)
                     except WebDriverException:
                         pass
 
                     if retval is not None:
                         if log:
-                            self.logger.info(
-                                "Found element {} using locator property {} after {:.2f} seconds.".format(self.name,
-                                                                                                          Find.describe_single_finder(
-                                                                                                              finder[0],
-                                                                                                              finder[
-                                                                                                                  1]),
-                                                                                                          time.time() - timer.start))
+                            logger.info(
+                                "Found element %s using locator property %s after %.2f seconds.", self.name,
+                                Find.describe_single_finder(finder[0], finder[1]), time.time() - timer.start)
                         return retval
 
                 time.sleep(retry_interval)
@@ -495,6 +996,7 @@ class WebElementLocator(object):
         :param retry_interval:
         :return: list of web element
         """
+        logger = self._logger(wd_browser)
         if timeout is None:
             timeout = 0
 
@@ -505,10 +1007,10 @@ class WebElementLocator(object):
         if timeout == 0:
             try:
                 if log:
-                    self.logger.debug("Looking for a list of elements matching: {}".format(self.describe()))
+                    logger.debug("Looking for a list of elements matching: %s", self.describe())
 
                 for finder in self.finder.finders:
-                    elements = parent_element.find_elements(by=finder[0], value=finder[1])
+                    elements = self._find_elements_by(wd_browser, finder, parent_element)
                     if not self.finder.allow_multiple_finds():
                         if elements:
                             retval = elements
@@ -521,23 +1023,23 @@ class WebElementLocator(object):
 
             if len(retval) > 0:
                 if log:
-                    self.logger.debug("Found {} elements matching {}".format(len(retval), self.describe()))
+                    logger.debug("Found %s elements matching %s", len(retval), self.describe())
 
                 return retval
 
         else:
             timer = Timer(timeout)
             if log:
-                self.logger.debug(
-                    "Waiting for up to {:.2f} seconds for element {} to be available.".format(float(timeout), self.describe()))
+                logger.debug(
+                    "Waiting for up to %.2f seconds for element %s to be available.", float(timeout), self.describe())
 
             while not timer.is_past_timeout():
                 try:
                     if log:
-                        self.logger.debug("Looking for a list of elements matching: {}".format(self.describe()))
+                        logger.debug("Looking for a list of elements matching: %s", self.describe())
 
                     for finder in self.finder.finders:
-                        elements = parent_element.find_elements(by=finder[0], value=finder[1])
+                        elements = self._find_elements_by(wd_browser, finder, parent_element)
                         if not self.finder.allow_multiple_finds():
                             if elements:
                                 retval = elements
@@ -550,7 +1052,7 @@ class WebElementLocator(object):
 
                 if len(retval) > 0:
                     if log:
-                        self.logger.debug("Found {} elements matching {}".format(len(retval), self.describe()))
+                        logger.debug("Found %s elements matching %s", len(retval), self.describe())
                     return retval
 
                 time.sleep(retry_interval)
@@ -567,10 +1069,638 @@ class WebElementLocator(object):
         if self.parent is not None and self.parent_initialized is False:
             self.description = "{} on page {} found by {}".format(self.name, self.parent.get_name(),
                                                                   self.finder.describe())
+            if self.within is not None:
+                self.description = "{} within {}".format(self.description, self.within.name)
             self.parent_initialized = True
         return self.description
 
 
+class PooledRemoteConnection(RemoteConnection):
+    """
+    A selenium command executor for remote browsers that keeps its http connections alive, and shares one
+    connection pool between every :class:`.Browser` pointed at the same hub.  This avoids opening a new connection
+    (and for https a new TLS handshake) for every command.  It is what :class:`.Browser` uses when you give it a
+    remote_url.  If you want different settings, create one and pass it as the *command_executor*::
+
+        executor = PooledRemoteConnection("https://grid.example.com/wd/hub", pool_size=50,
+                                          command_timeouts={Command.GET: 120, Command.SCREENSHOT: 60})
+        browser = Browser(BrowserType.CHROME, remote_url="https://grid.example.com/wd/hub",
+                          command_executor=executor)
+
+    The pool for a hub is created by the first connection to it, so pool_size only matters the first time.
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    class _TimedPool(object):
+        """
+        Wraps the shared urllib3 PoolManager to apply per-command timeouts and count requests.
+        """
+
+        def __init__(self, manager, connection):
+            self.manager = manager
+            self.connection = connection
+
+        def request(self, method, url, body=None, headers=None):
+            timeout = self.connection.command_timeouts.get(getattr(self.connection._command, 'name', None),
+                                                           self.connection.default_command_timeout)
+            with PooledRemoteConnection._pools_lock:
+                PooledRemoteConnection._pools[self.connection.hub]['requests'] += 1
+            if timeout is None:
+                return self.manager.request(method, url, body=body, headers=headers)
+            return self.manager.request(method, url, body=body, headers=headers, timeout=timeout)
+
+    def __init__(self, remote_server_addr, pool_size=10, default_command_timeout=None, command_timeouts=None,
+                 resolve_ip=True):
+        """
+        :param remote_server_addr: the url of the selenium server, grid hub or appium server
+        :type remote_server_addr: str
+        :param pool_size: the maximum number of idle connections kept open to the hub
+        :type pool_size: int
+        :param default_command_timeout: the timeout (in seconds) of each command, default is selenium's
+        :type default_command_timeout: int or float
+        :param command_timeouts: timeouts (in seconds) for specific commands, keyed by selenium Command name
+        :type command_timeouts: dict of str to int or float
+        """
+        super(PooledRemoteConnection, self).__init__(remote_server_addr, keep_alive=True, resolve_ip=resolve_ip)
+        parsed = urlparse(self._url)
+        self.hub = "{}://{}".format(parsed.scheme, parsed.netloc)
+        self.default_command_timeout = default_command_timeout
+        self.command_timeouts = dict(command_timeouts or {})
+        self._command = threading.local()
+        with PooledRemoteConnection._pools_lock:
+            if self.hub not in PooledRemoteConnection._pools:
+                options = {'maxsize': pool_size}
+                # selenium's default timeout is the socket module's default sentinel, which urllib3 may not accept
+                if isinstance(self._timeout, (int, float)):
+                    options['timeout'] = self._timeout
+                PooledRemoteConnection._pools[self.hub] = {
+                    'manager': urllib3.PoolManager(**options),
+                    'requests': 0
+                }
+            manager = PooledRemoteConnection._pools[self.hub]['manager']
+        self._conn = PooledRemoteConnection._TimedPool(manager, self)
+
+    def execute(self, command, params):
+        self._command.name = command
+        try:
+            return super(PooledRemoteConnection, self).execute(command, params)
+        finally:
+            self._command.name = None
+
+    @classmethod
+    def get_pool_stats(cls, hub=None):
+        """
+        Get statistics on how well connections are being reused.  For each hub the number of requests sent, the
+        number of connections opened, and the number of requests that reused a connection are returned.
+
+        :param hub: only get the stats for this hub (scheme://host:port), default is all hubs
+        :type hub: str
+        :return: a dict of hub to a dict with requests, connections and reused keys
+        :rtype: dict
+        """
+        retval = {}
+        with cls._pools_lock:
+            for pool_hub, pool in cls._pools.items():
+                if hub is not None and pool_hub != hub:
+                    continue
+                manager = pool['manager']
+                connections = sum([manager.pools[key].num_connections for key in manager.pools.keys()])
+                retval[pool_hub] = {
+                    'requests': pool['requests'],
+                    'connections': connections,
+                    'reused': max(pool['requests'] - connections, 0)
+                }
+        return retval
+
+
+class CommandRecorder(object):
+    """
+    Records every webdriver command a :class:`.Browser` sends: the command, its parameters, the response and how
+    long it took.  Each command is appended to the trace file as one line of json as soon as it finishes, so a trace
+    survives a crashed run.  Use :meth:`.Browser.start_recording` rather than creating one yourself, and
+    :meth:`.Browser.replay` to run against a trace.
+    """
+
+    def __init__(self, command_executor, filename, session_id, capabilities, w3c):
+        self.command_executor = command_executor
+        self.filename = filename
+        self.counts = {}
+        """The number of times each command was sent while recording"""
+        self.start = time.time()
+        self._lock = threading.Lock()
+        self._trace = io.open(filename, 'a', encoding='utf-8')
+        self._write({'session': session_id, 'capabilities': capabilities, 'w3c': w3c})
+
+    def _write(self, entry):
+        with self._lock:
+            self._trace.write(u"{}\n".format(json.dumps(entry, separators=(',', ':'), sort_keys=True)))
+            self._trace.flush()
+
+    def execute(self, command, params):
+        recorded_params = dict((key, value) for key, value in (params or {}).items() if key != 'sessionId')
+        start = time.time()
+        response = self.command_executor.execute(command, params)
+        duration = time.time() - start
+        with self._lock:
+            self.counts[command] = self.counts.get(command, 0) + 1
+        self._write({'c': command, 'p': recorded_params, 'r': response, 't': round(duration, 4),
+                     'at': round(start - self.start, 4)})
+        return response
+
+    def close(self):
+        with self._lock:
+            self._trace.close()
+
+    def __getattr__(self, name):
+        # everything else (appium's extra commands, w3c, keep_alive) comes from the real command executor
+        return getattr(self.command_executor, name)
+
+
+class UnsupportedCommandException(UnknownMethodException):
+    """
+    Raised when the driver answers a command with the "unknown command" or "unsupported operation" status, it doesn't
+    have the command (like element screenshots on older drivers).
+    """
+    pass
+
+
+class CommandErrorHandler(object):
+    """
+    Wraps a driver's error handler (selenium's, or appium's) so that a command the driver doesn't have raises
+    :class:`.UnsupportedCommandException` instead of a plain WebDriverException, and can be told apart from a command
+    that failed.  :class:`.Browser` installs one on its driver.
+    """
+
+    UNSUPPORTED = ErrorCode.UNKNOWN_COMMAND + ErrorCode.METHOD_NOT_ALLOWED
+
+    def __init__(self, error_handler):
+        self.error_handler = error_handler
+
+    @classmethod
+    def status(cls, response):
+        """
+        The error status of a response: the w3c error name, or the json wire protocol status number.
+        """
+        value = response.get('value')
+        if isinstance(value, _string_types):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                value = None
+        if isinstance(value, dict) and isinstance(value.get('value'), dict):
+            value = value['value']
+        if isinstance(value, dict) and value.get('error'):
+            return value['error']
+        return response.get('status')
+
+    def check_response(self, response):
+        try:
+            self.error_handler.check_response(response)
+        except UnknownMethodException:
+            raise
+        except WebDriverException as e:
+            if CommandErrorHandler.status(response) in CommandErrorHandler.UNSUPPORTED:
+                raise UnsupportedCommandException(e.msg, e.screen, e.stacktrace)
+            raise
+
+    def __getattr__(self, name):
+        return getattr(self.error_handler, name)
+
+
+class SerializedConnection(object):
+    """
+    Sends one webdriver command at a time for a session, so that a :class:`.Browser` can be shared by several threads
+    (for example a test and a thread taking screenshots) without their commands interleaving on the connection.
+    Every Browser with a remote or local driver uses one, you don't need to create it yourself.
+
+    Commands sent from inside :meth:`.background` have low priority: they wait while a foreground command is running
+    or waiting, so background work only fills the gaps between the test's own commands.  Several commands that have
+    to be sent one right after the other (like switching tabs and then using the tab) can be sent inside
+    :meth:`.locked`.
+    """
+
+    def __init__(self, command_executor):
+        self.command_executor = command_executor
+        self._condition = threading.Condition()
+        self._owner = None
+        self._depth = 0
+        self._foreground_waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def background(self):
+        """
+        Commands sent by this thread inside the with block are low priority.
+        """
+        previous = getattr(self._local, 'background', False)
+        self._local.background = True
+        try:
+            yield self
+        finally:
+            self._local.background = previous
+
+    @contextmanager
+    def locked(self):
+        """
+        No other thread's commands are sent until this thread leaves the with block.  It can be nested, and commands
+        this thread sends inside it go straight through.
+        """
+        self._acquire()
+        try:
+            yield self
+        finally:
+            self._release()
+
+    def _acquire(self):
+        current = threading.current_thread()
+        background = getattr(self._local, 'background', False)
+        with self._condition:
+            if self._owner is current:
+                self._depth += 1
+                return
+            if not background:
+                self._foreground_waiting += 1
+            try:
+                while self._owner is not None or (background and self._foreground_waiting):
+                    self._condition.wait()
+            finally:
+                if not background:
+                    self._foreground_waiting -= 1
+            self._owner = current
+            self._depth = 1
+
+    def _release(self):
+        with self._condition:
+            self._depth -= 1
+            if not self._depth:
+                self._owner = None
+                self._condition.notify_all()
+
+    def execute(self, command, params):
+        self._acquire()
+        try:
+            return self.command_executor.execute(command, params)
+        finally:
+            self._release()
+
+    def __getattr__(self, name):
+        # everything else (appium's extra commands, w3c, keep_alive, stats) comes from the real command executor
+        return getattr(self.command_executor, name)
+
+
+def _serialized_connection(wd_browser):
+    """
+    Internal function, the :class:`.SerializedConnection` that commands to wd_browser go through, or None.
+    """
+    executor = getattr(wd_browser, 'command_executor', None)
+    while isinstance(executor, CommandRecorder):
+        executor = executor.command_executor
+    return executor if isinstance(executor, SerializedConnection) else None
+
+
+@contextmanager
+def _command_lock(wd_browser):
+    """
+    Internal function, keep other threads' commands to wd_browser out of the with block (see
+    :meth:`.SerializedConnection.locked`).  Drivers that don't serialize their commands aren't locked.
+    """
+    connection = _serialized_connection(wd_browser)
+    if connection is None:
+        yield
+    else:
+        with connection.locked():
+            yield
+
+
+class ReplayConnection(RemoteConnection):
+    """
+    A selenium command executor that answers commands from a trace recorded by :class:`.CommandRecorder` instead of
+    talking to a browser.  See :meth:`.Browser.replay`.
+
+    Commands are matched to the trace in order by command and parameters.  If the code being replayed sends commands
+    in a different order (because the find or wait logic changed) the next matching command further on in the trace
+    is used, then the last matching command seen before.  Commands that aren't in the trace at all get an empty
+    success response, or raise a WebDriverException if strict is True.  *stats* counts both.
+
+    While *starting* is True (Browser.__init__ is creating the session, before anything could have been recorded)
+    commands are answered without being matched or counted.
+    """
+
+    def __init__(self, filename, realtime=False, strict=False):
+        """
+        :param filename: the trace file to replay
+        :type filename: str
+        :param realtime: If True each response is delayed by how long the command took when it was recorded,
+                         otherwise responses are immediate
+        :type realtime: bool
+        :param strict: If True commands that aren't in the trace raise a WebDriverException
+        :type strict: bool
+        """
+        RemoteConnection.__init__(self, "http://127.0.0.1", keep_alive=False, resolve_ip=False)
+        self.realtime = realtime
+        self.strict = strict
+        self.stats = {'served': 0, 'missing': 0, 'commands': {}}
+        self.session = None
+        self.starting = True
+        self.entries = []
+        with io.open(filename, 'r', encoding='utf-8') as trace:
+            for line in trace:
+                entry = json.loads(line)
+                if 'session' in entry:
+                    if self.session is None:
+                        self.session = entry
+                else:
+                    entry['key'] = json.dumps([entry['c'], entry['p']], sort_keys=True)
+                    self.entries.append(entry)
+        if self.session is None:
+            raise WebDriverException("{} is not a slickwd command trace.".format(filename))
+        self.position = 0
+
+    def _serve(self, entry):
+        if self.realtime:
+            time.sleep(entry['t'])
+        self.stats['served'] += 1
+        return json.loads(json.dumps(entry['r']))
+
+    def execute(self, command, params):
+        if command == 'newSession':
+            if self.session['w3c']:
+                return {'value': {'sessionId': self.session['session'], 'capabilities': self.session['capabilities']}}
+            return {'status': 0, 'sessionId': self.session['session'], 'value': self.session['capabilities']}
+        if self.starting:
+            return {'status': 0, 'value': None}
+        self.stats['commands'][command] = self.stats['commands'].get(command, 0) + 1
+        key = json.dumps([command, dict((name, value) for name, value in (params or {}).items()
+                                        if name != 'sessionId')], sort_keys=True)
+        for index in range(self.position, len(self.entries)):
+            if self.entries[index]['key'] == key:
+                self.position = index + 1
+                return self._serve(self.entries[index])
+        for index in range(min(self.position, len(self.entries)) - 1, -1, -1):
+            if self.entries[index]['key'] == key:
+                return self._serve(self.entries[index])
+        self.stats['missing'] += 1
+        if self.strict:
+            raise WebDriverException("Command {} with parameters {} is not in the trace.".format(command, key))
+        return {'status': 0, 'value': None}
+
+
+class PerformanceStore(object):
+    """
+    Collects the browser side performance samples taken by :meth:`.Browser.enable_performance_capture` and computes
+    percentiles of them per page.  If a filename is given every sample is appended to it (one json object per line),
+    and samples from earlier runs are loaded, so percentiles cover every run.
+
+    Each sample has the page name, the action (go_to, click or wait_for_page), the url and flattened metrics such as
+    *navigation.load*, *paint.first-contentful-paint*, *resources.count* and *long_tasks.total* (all times in
+    milliseconds).  The navigation and paint metrics of a page load are only in the first sample taken after it
+    finished loading, and resources and long tasks only count what happened since the last sample, so a load is
+    never counted twice.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.samples = []
+        self._lock = threading.Lock()
+        if filename is not None and os.path.exists(filename):
+            with io.open(filename, 'r', encoding='utf-8') as store_file:
+                self.samples = [json.loads(line) for line in store_file if line.strip()]
+
+    def add(self, sample):
+        """
+        Add a sample (and append it to the file, if there is one).
+
+        :type sample: dict
+        """
+        with self._lock:
+            self.samples.append(sample)
+            if self.filename is not None:
+                with io.open(self.filename, 'a', encoding='utf-8') as store_file:
+                    store_file.write(u"{}\n".format(json.dumps(sample, separators=(',', ':'), sort_keys=True)))
+
+    @classmethod
+    def percentile(cls, values, percent):
+        """
+        The percentile of a list of numbers, interpolating between the closest ranks.
+
+        :rtype: float
+        """
+        ordered = sorted(values)
+        if not ordered:
+            return None
+        rank = (len(ordered) - 1) * percent / 100.0
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    def percentiles(self, page_name=None, action=None, percents=(50, 90, 95)):
+        """
+        Compute percentiles of every metric, per page.
+
+        :param page_name: only include samples for this page
+        :type page_name: str
+        :param action: only include samples taken after this action (go_to, click or wait_for_page)
+        :type action: str
+        :param percents: the percentiles to compute
+        :type percents: tuple of int
+        :return: {page name: {metric: {percent: value}}}
+        :rtype: dict
+        """
+        values = {}
+        with self._lock:
+            for sample in self.samples:
+                if (page_name is not None and sample['page'] != page_name) or \
+                        (action is not None and sample['action'] != action):
+                    continue
+                page_values = values.setdefault(sample['page'], {})
+                for metric, value in sample['metrics'].items():
+                    if value is not None:
+                        page_values.setdefault(metric, []).append(value)
+        return dict((page, dict((metric, dict((percent, PerformanceStore.percentile(metric_values, percent))
+                                              for percent in percents))
+                                for metric, metric_values in page_values.items()))
+                    for page, page_values in values.items())
+
+
+class TimeBudgetExceeded(WebDriverException):
+    """
+    Raised when a :class:`.Browser` wait starts after its :class:`.TimeBudget` has run out, or fails because the
+    budget ran out while it was waiting.  The budget (and its report of where the time went) is in the *budget*
+    attribute.
+    """
+
+    def __init__(self, msg, budget):
+        super(TimeBudgetExceeded, self).__init__(msg)
+        self.budget = budget
+        """the :class:`.TimeBudget` that ran out"""
+
+
+class TimeBudget(object):
+    """
+    A limit on the total time a test can spend, shared by every wait of a :class:`.Browser`.  Each wait gets at most
+    the time left in the budget (instead of its full timeout), a wait that fails after the budget has run out
+    raises :class:`.TimeBudgetExceeded`, and so does a wait started after it has run out, right away.  Use
+    :meth:`.Browser.time_budget` rather than creating one yourself.  A budget can be shared by waits on several
+    threads.
+
+    The time is charged to the waits: the time from the start of each wait to the start of the next one (or to now)
+    goes to that wait, by action and locator, so :meth:`.report` shows where the time went.  Waits made by another
+    wait (like the exists checks of a page's is_current_page in wait_for_page) are part of the outer one.
+    """
+
+    def __init__(self, seconds, name=None):
+        """
+        :param seconds: the length of the budget
+        :type seconds: int or float
+        :param name: what the budget is for (usually the test name), used in the report
+        :type name: str
+        """
+        self.seconds = seconds
+        self.name = name
+        self.start = time.time()
+        self.end = self.start + seconds
+        self.spent = OrderedDict()
+        """(action, target) -> [number of waits, seconds charged], in the order they first happened"""
+        self._lock = threading.Lock()
+        self._last = (("(before the first wait)", ""), self.start)
+        self.spent[self._last[0]] = [0, 0.0]
+
+    @property
+    def remaining(self):
+        """The seconds left in the budget, 0 once it has run out."""
+        return max(self.end - time.time(), 0)
+
+    @classmethod
+    def describe(cls, target):
+        if target is None:
+            return ""
+        if isinstance(target, (list, tuple)):
+            return ", ".join([TimeBudget.describe(part) for part in target])
+        if isinstance(target, type):
+            return target.__name__
+        if hasattr(target, 'describe'):
+            return target.describe()
+        if hasattr(target, 'get_name'):
+            return target.get_name()
+        return str(target)
+
+    def _charge(self, now):
+        key, since = self._last
+        self.spent[key][1] += now - since
+        self._last = (key, now)
+
+    def spend(self, action, target, timeout, charge=True):
+        """
+        Start a wait, and get how long it may take.
+
+        :param action: the Browser method doing the wait
+        :type action: str
+        :param target: the locator (or page) being waited for
+        :param timeout: the timeout the wait was asked to use
+        :param charge: False for a wait inside another one, the time stays charged to the outer wait
+        :type charge: bool
+        :return: the timeout the wait should use
+        :raises TimeBudgetExceeded: if the budget has run out
+        """
+        now = time.time()
+        key = (action, TimeBudget.describe(target))
+        if charge:
+            with self._lock:
+                self._charge(now)
+                self.spent.setdefault(key, [0, 0.0])[0] += 1
+                self._last = (key, now)
+        if now >= self.end:
+            raise self.exceeded("before", *key)
+        return min(timeout, self.end - now)
+
+    def exceeded(self, when, action=None, target=None):
+        """
+        The :class:`.TimeBudgetExceeded` for a wait the budget stopped, with the report in its message.
+
+        :param when: "before" if the wait couldn't start, "during" if it ran out of time
+        :type when: str
+        :param action: the Browser method doing the wait, default is the wait being charged
+        :type action: str
+        :param target: the description of what is being waited for
+        :type target: str
+        :rtype: :class:`.TimeBudgetExceeded`
+        """
+        if action is None:
+            with self._lock:
+                action, target = self._last[0]
+        return TimeBudgetExceeded("The time budget of {:.2f} seconds{} ran out {} {}{}.\n{}".format(
+            float(self.seconds), " for {}".format(self.name) if self.name else "", when, action,
+            " {}".format(target) if target else "", self.report()), self)
+
+    def report(self):
+        """
+        Where the time went, slowest first.
+
+        :rtype: str
+        """
+        with self._lock:
+            self._charge(time.time())
+            spent = sorted(self.spent.items(), key=lambda item: -item[1][1])
+        lines = ["Time budget{}: {:.2f} of {:.2f} seconds used".format(
+            " for {}".format(self.name) if self.name else "", time.time() - self.start, float(self.seconds))]
+        for (action, target), (count, seconds) in spent:
+            if seconds >= 0.005 or count:
+                lines.append("  {:>8.2f}s  {:>4}x  {} {}".format(seconds, count, action, target).rstrip())
+        return "\n".join(lines)
+
+
+def _budgeted(method):
+    """
+    Decorator for the :class:`.Browser` methods that wait.  Only the outermost wait is charged to the time budget,
+    and a wait that fails once the budget has run out raises :class:`.TimeBudgetExceeded` instead.  When the outermost
+    wait fails the debug log is dumped, if :meth:`.Browser.enable_debug_log` was asked to.
+    """
+    @functools.wraps(method)
+    def wait(self, *args, **kwargs):
+        # the nesting is kept per thread, a wait on a background thread isn't inside the foreground one
+        state = self._wait_state
+        depth = getattr(state, 'depth', 0)
+        if not depth:
+            state.charged = False
+        state.depth = depth + 1
+        try:
+            try:
+                return method(self, *args, **kwargs)
+            except TimeBudgetExceeded:
+                raise
+            except WebDriverException:
+                self._budget_ran_out()
+                raise
+        except WebDriverException:
+            if not depth and self._dump_failed_actions:
+                self.dump_debug_log(method.__name__)
+            raise
+        finally:
+            state.depth = depth
+    return wait
+
+
+def _xpath_literal(value):
+    """
+    A string literal for value in an xpath expression.  XPath 1.0 has no escapes, so a value with both kinds of
+    quote is built with concat().
+    """
+    if "'" not in value:
+        return "'{}'".format(value)
+    if '"' not in value:
+        return '"{}"'.format(value)
+    return "concat({})".format(", \"'\", ".join(["'{}'".format(part) for part in value.split("'")]))
+
+
+def _uiselector_literal(value):
+    """
+    A java string literal for value in a UiSelector expression.
+    """
+    return '"{}"'.format(value.replace('\\', '\\\\').replace('"', '\\"'))
+
+
 class Browser(object):
     """
     The Browser is the primary interface you have to automate a browser.  An instance of Browser has the same
@@ -618,30 +1748,250 @@ class Browser(object):
     check(attempts);
     """
 
-    def __init__(self, browser_type, remote_url=None, default_timeout=30):
-        """
-        Create a new browser session.  The only required parameter *browser_type* can be
-        an instance of the *BrowserType* enum, a dictionary (like those from webdriver's desired_capabilities),
-        or a string identifying the name of the browser (must correspond to a name in the *BrowserType* enum).
+    DIGEST_JS = """
+    var root = arguments[0] || document.documentElement;
+    var value;
+    if (arguments[1]) {
+        var parts = [];
+        var walk = function(element, depth) {
+            parts.push(depth + element.tagName);
+            for (var child = element.firstElementChild; child !== null; child = child.nextElementSibling) {
+                walk(child, depth + 1);
+            }
+        };
+        walk(root, 0);
+        value = parts.join(';');
+    } else {
+        value = root.innerText !== undefined ? root.innerText : root.textContent;
+    }
+    var h1 = 0xdeadbeef, h2 = 0x41c6ce57;
+    for (var i = 0; i < value.length; i++) {
+        var c = value.charCodeAt(i);
+        h1 = Math.imul(h1 ^ c, 2654435761);
+        h2 = Math.imul(h2 ^ c, 1597334677);
+    }
+    h1 = Math.imul(h1 ^ (h1 >>> 16), 2246822507) ^ Math.imul(h2 ^ (h2 >>> 13), 3266489909);
+    h2 = Math.imul(h2 ^ (h2 >>> 16), 2246822507) ^ Math.imul(h1 ^ (h1 >>> 13), 3266489909);
+    return value.length + ':' + (h2 >>> 0).toString(16) + (h1 >>> 0).toString(16);
+    """
 
-        If you use a remote_url, it should point to a selenium remote server.
-        """
-        self.default_timeout = default_timeout
-        self.angular_mode = False
+    CONTAINS_TEXT_JS = """
+    var root = arguments[0] || document.documentElement;
+    var text = root.innerText !== undefined ? root.innerText : root.textContent;
+    return text.indexOf(arguments[1]) !== -1;
+    """
 
-        # tame the huge logs from webdriver
-        wdlogger = logging.getLogger('selenium.webdriver')
-        wdlogger.setLevel(logging.WARNING)
+    STREAM_START_JS = """
+    var root = arguments[0] || document.documentElement;
+    var value;
+    if (arguments[1]) {
+        value = root.outerHTML;
+    } else {
+        value = root.innerText !== undefined ? root.innerText : root.textContent;
+    }
+    var key = 'slickwd-' + Date.now() + '-' + Math.random();
+    window.__slickwdStreams = window.__slickwdStreams || {};
+    window.__slickwdStreams[key] = value;
+    return [key, value.length];
+    """
+
+    STREAM_CHUNK_JS = """
+    var value = window.__slickwdStreams[arguments[0]];
+    var end = Math.min(arguments[1] + arguments[2], value.length);
+    // never end a chunk between the two halves of a surrogate pair, they wouldn't make valid text on their own
+    var last = value.charCodeAt(end - 1);
+    if (end < value.length && last >= 0xD800 && last <= 0xDBFF) {
+        end += 1;
+    }
+    return [value.substring(arguments[1], end), end];
+    """
+
+    STREAM_END_JS = """
+    if (window.__slickwdStreams) {
+        delete window.__slickwdStreams[arguments[0]];
+    }
+    """
+
+    GET_STORAGE_JS = """
+    var copy = function(storage) {
+        var retval = {};
+        for (var i = 0; i < storage.length; i++) {
+            var key = storage.key(i);
+            retval[key] = storage.getItem(key);
+        }
+        return retval;
+    };
+    return [window.location.origin, copy(window.localStorage), copy(window.sessionStorage)];
+    """
+
+    SET_STORAGE_JS = """
+    var fill = function(storage, values) {
+        for (var key in values) {
+            if (values.hasOwnProperty(key)) {
+                storage.setItem(key, values[key]);
+            }
+        }
+    };
+    fill(window.localStorage, arguments[0]);
+    fill(window.sessionStorage, arguments[1]);
+    """
+
+    PERFORMANCE_JS = """
+    var perf = window.performance;
+    if (!perf || !perf.getEntriesByType) {
+        return null;
+    }
+    var state = window.__slickwdPerformance;
+    if (!state) {
+        state = window.__slickwdPerformance = {resourceIndex: 0, longTasks: [], navigation: false, paints: {}};
+        try {
+            new PerformanceObserver(function(list) {
+                list.getEntries().forEach(function(entry) { state.longTasks.push(entry.duration); });
+            }).observe({type: 'longtask', buffered: true});
+        } catch (e) {}
+    }
+    var metrics = {};
+    // the navigation and paints belong to the document, they are only recorded in the first sample taken after
+    // the page finished loading (the state goes away with the document)
+    var navigation = perf.getEntriesByType('navigation')[0];
+    if (state.navigation) {
+        // already recorded for this document
+    } else if (navigation && navigation.loadEventEnd) {
+        state.navigation = true;
+        metrics['navigation.response_start'] = navigation.responseStart;
+        metrics['navigation.dom_interactive'] = navigation.domInteractive;
+        metrics['navigation.dom_content_loaded'] = navigation.domContentLoadedEventEnd;
+        metrics['navigation.load'] = navigation.loadEventEnd;
+        metrics['navigation.transfer_size'] = navigation.transferSize;
+    } else if (!navigation && perf.timing && perf.timing.loadEventEnd) {
+        var timing = perf.timing;
+        state.navigation = true;
+        metrics['navigation.response_start'] = timing.responseStart - timing.navigationStart;
+        metrics['navigation.dom_interactive'] = timing.domInteractive - timing.navigationStart;
+        metrics['navigation.dom_content_loaded'] = timing.domContentLoadedEventEnd - timing.navigationStart;
+        metrics['navigation.load'] = timing.loadEventEnd - timing.navigationStart;
+    }
+    perf.getEntriesByType('paint').forEach(function(entry) {
+        if (!state.paints[entry.name]) {
+            state.paints[entry.name] = true;
+            metrics['paint.' + entry.name] = entry.startTime;
+        }
+    });
+    var resources = perf.getEntriesByType('resource').slice(state.resourceIndex);
+    state.resourceIndex += resources.length;
+    var transferSize = 0, start = null, end = null;
+    resources.forEach(function(entry) {
+        transferSize += entry.transferSize || 0;
+        start = start === null ? entry.startTime : Math.min(start, entry.startTime);
+        end = end === null ? entry.responseEnd : Math.max(end, entry.responseEnd);
+    });
+    metrics['resources.count'] = resources.length;
+    metrics['resources.transfer_size'] = transferSize;
+    metrics['resources.duration'] = start === null ? 0 : end - start;
+    metrics['long_tasks.count'] = state.longTasks.length;
+    metrics['long_tasks.total'] = state.longTasks.reduce(function(total, duration) { return total + duration; }, 0);
+    state.longTasks = [];
+    return metrics;
+    """
+
+    EXTRACT_ROWS_JS = """
+    var rows = arguments[0];
+    var columns = arguments[1];
+    // each step is a list of alternative [how, expression] finders, looked for inside the element of the step
+    // before (the row for the first one)
+    var find = function(row, steps) {
+        var element = row;
+        for (var i = 0; i < steps.length && element !== null; i++) {
+            var found = null;
+            for (var j = 0; j < steps[i].length && found === null; j++) {
+                if (steps[i][j][0] === 'xpath') {
+                    found = document.evaluate(steps[i][j][1], element, null, XPathResult.FIRST_ORDERED_NODE_TYPE,
+                                              null).singleNodeValue;
+                } else {
+                    found = element.querySelector(steps[i][j][1]);
+                }
+            }
+            element = found;
+        }
+        return element;
+    };
+    var value = function(element, attribute) {
+        if (attribute === null) {
+            var text = element.innerText !== undefined ? element.innerText : element.textContent;
+            return text === null ? null : text.trim();
+        }
+        var property = element[attribute];
+        if (property !== undefined && property !== null && typeof property !== 'object' && typeof property !== 'function') {
+            return property;
+        }
+        return element.getAttribute(attribute);
+    };
+    var results = [];
+    for (var i = 0; i < rows.length; i++) {
+        var record = {};
+        for (var j = 0; j < columns.length; j++) {
+            var element = find(rows[i], columns[j][1]);
+            record[columns[j][0]] = element === null ? null : value(element, columns[j][2]);
+        }
+        results.push(record);
+    }
+    return results;
+    """
+
+    ELEMENT_RECT_JS = """
+    arguments[0].scrollIntoView({block: 'nearest', inline: 'nearest'});
+    var rect = arguments[0].getBoundingClientRect();
+    return [rect.left, rect.top, rect.width, rect.height, window.devicePixelRatio || 1];
+    """
+
+    standby = None
+    """
+    The :class:`.WarmStandby` new browsers take a started driver from (see :meth:`.WarmStandby.install`), None to
+    always start a new one.
+    """
+
+    def __init__(self, browser_type, remote_url=None, default_timeout=30, command_executor=None):
+        """
+        Create a new browser session.  The only required parameter *browser_type* can be
+        an instance of the *BrowserType* enum, a dictionary (like those from webdriver's desired_capabilities),
+        or a string identifying the name of the browser (must correspond to a name in the *BrowserType* enum).
+
+        If you use a remote_url, it should point to a selenium remote server.  Commands are sent with a
+        :class:`.PooledRemoteConnection` (keep alive connections shared by every browser using the same hub) unless you
+        provide your own command_executor.
+
+        If a :class:`.WarmStandby` is installed, the browser is one of its spares when one is ready.
+        """
+        self.default_timeout = default_timeout
+        self.angular_mode = False
+        self.snapshot_mode = False
+        self._snapshot_browser = None
+        self.performance_store = None
+        self.current_page_name = None
+        self._pending_performance = []
+        self._current_tab = None
+        self._scroll_directions = {}
+        self._background = None
+        self.debug_log = None
+        """The :class:`.DebugLog` from :meth:`.enable_debug_log`, None if it isn't enabled"""
+        self._dump_failed_actions = False
+        self._element_screenshots = None
+        self.budget = None
+        """The :class:`.TimeBudget` every wait draws from (see :meth:`.time_budget`), None for no budget"""
+        self._wait_state = threading.local()
+
+        # tame the huge logs from webdriver
+        wdlogger = logging.getLogger('selenium.webdriver')
+        wdlogger.setLevel(logging.WARNING)
 
         self.logger = logging.getLogger("slickwd.Browser")
         browser_name = browser_type
         if isinstance(browser_type, BrowserType):
             browser_name = browser_type.name
         elif isinstance(browser_type, dict) and 'browserName' in browser_type:
-            browser_name = browser_type[browser_name]
+            browser_name = browser_type['browserName']
         self.logger.debug(
-            "New browser instance requested with browser_type={} and remote_url={}".format(repr(browser_name),
-                                                                                           repr(remote_url)))
+            "New browser instance requested with browser_type=%r and remote_url=%r", browser_name, remote_url)
         if isinstance(browser_type, str):
             try:
                 browser_type = BrowserType[browser_type.upper()]
@@ -668,10 +2018,7 @@ class Browser(object):
 
             self.remote_url = remote_url
             self.browser_type = browser_type
-            self.logger.info("Creating a new browser (locally connected) of type {}".format(browser_type.name.lower()))
-            self.wd_instance = browser_type.value[1]()
-            ''':type: appium.webdriver.Remote'''
-            self.wd_instance.set_script_timeout(15)
+            self.logger.info("Creating a new browser (locally connected) of type %s", browser_type.name.lower())
         else:
             if isinstance(browser_type, BrowserType):
                 browser_type = browser_type.value[0]
@@ -684,15 +2031,138 @@ class Browser(object):
             self.remote_url = remote_url
             self.browser_type = browser_type
             self.logger.info(
-                "Creating a new browser (through remote connection \"{}\") with desired capabilities of {}".format(
-                    remote_url, repr(browser_type)))
-            if 'platformName' in browser_type and browser_type['platformName'] in ['Android', 'iOS']:
-                self.wd_instance = appium.webdriver.Remote(remote_url, browser_type)
-                ''':type: appium.webdriver.Remote'''
-            else:
-                self.wd_instance = webdriver.Remote(remote_url, browser_type)
-                ''':type: appium.webdriver.Remote'''
-                self.wd_instance.set_script_timeout(10)
+                "Creating a new browser (through remote connection \"%s\") with desired capabilities of %r",
+                remote_url, browser_type)
+        self.wd_instance = None
+        ''':type: appium.webdriver.Remote'''
+        if Browser.standby is not None and command_executor is None and \
+                browser_type not in (BrowserType.FAKE, BrowserType.FAKE_MOBILE):
+            self.wd_instance = Browser.standby.take(browser_type, remote_url)
+            if self.wd_instance is not None:
+                self.logger.debug("Using a spare browser from the warm standby.")
+        if self.wd_instance is None:
+            self.wd_instance = Browser._start_driver(browser_type, remote_url, command_executor)
+        if hasattr(self.wd_instance, 'command_executor'):
+            self.wd_instance.command_executor = SerializedConnection(self.wd_instance.command_executor)
+        if hasattr(self.wd_instance, 'error_handler') and \
+                not isinstance(self.wd_instance.error_handler, CommandErrorHandler):
+            self.wd_instance.error_handler = CommandErrorHandler(self.wd_instance.error_handler)
+
+    @classmethod
+    def _start_driver(cls, browser_type, remote_url, command_executor=None):
+        """
+        Internal method, launch the driver (and browser) for a BrowserType (local) or desired capabilities (remote).
+        """
+        if remote_url is None:
+            wd_instance = browser_type.value[1]()
+            wd_instance.set_script_timeout(15)
+            return wd_instance
+        if command_executor is None:
+            command_executor = PooledRemoteConnection(remote_url)
+        if 'platformName' in browser_type and browser_type['platformName'] in ['Android', 'iOS']:
+            return appium.webdriver.Remote(command_executor, browser_type)
+        wd_instance = webdriver.Remote(command_executor, browser_type)
+        wd_instance.set_script_timeout(10)
+        return wd_instance
+
+    def start_recording(self, filename, log=True):
+        """
+        Record every webdriver command this browser sends (with parameters, response and timing) to a trace file, see
+        :class:`.CommandRecorder`.  The trace can be replayed later without a browser using :meth:`.replay`.
+
+        :param filename: the trace file, new commands are appended to it
+        :type filename: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: the recorder, its *counts* attribute has the number of times each command was sent
+        :rtype: :class:`.CommandRecorder`
+        """
+        if not hasattr(self.wd_instance, 'command_executor'):
+            raise WebDriverException("This browser doesn't send webdriver commands, so they can't be recorded.")
+        if isinstance(self.wd_instance.command_executor, CommandRecorder):
+            self.stop_recording(log)
+        if log:
+            self.logger.info("Recording webdriver commands to %s", filename)
+        self.wd_instance.command_executor = CommandRecorder(self.wd_instance.command_executor, filename,
+                                                            self.wd_instance.session_id,
+                                                            self.wd_instance.capabilities, self.wd_instance.w3c)
+        return self.wd_instance.command_executor
+
+    def stop_recording(self, log=True):
+        """
+        Stop recording webdriver commands (see :meth:`.start_recording`).
+
+        :return: the recorder that was used, or None if the browser wasn't recording
+        :rtype: :class:`.CommandRecorder`
+        """
+        recorder = getattr(self.wd_instance, 'command_executor', None)
+        if not isinstance(recorder, CommandRecorder):
+            return None
+        self.wd_instance.command_executor = recorder.command_executor
+        recorder.close()
+        if log:
+            self.logger.info("Stopped recording webdriver commands to %s", recorder.filename)
+        return recorder
+
+    @classmethod
+    def replay(cls, filename, realtime=False, strict=False, default_timeout=30):
+        """
+        Create a Browser that answers every command from a trace recorded with :meth:`.start_recording`, without a
+        browser or a grid.  Run the same test code against it to profile slickwd's own overhead, or to see how a change
+        to the find or wait logic changes the number of commands sent (see the *stats* of
+        *browser.wd_instance.command_executor*, a :class:`.ReplayConnection`).
+
+        :param filename: the trace file
+        :type filename: str
+        :param realtime: If True each command takes as long as it did when it was recorded
+        :type realtime: bool
+        :param strict: If True commands that aren't in the trace raise a WebDriverException
+        :type strict: bool
+        :rtype: :class:`.Browser`
+        """
+        connection = ReplayConnection(filename, realtime, strict)
+        browser = cls(connection.session['capabilities'], remote_url="replay:{}".format(filename),
+                      default_timeout=default_timeout, command_executor=connection)
+        connection.starting = False
+        return browser
+
+    def run_script(self, script, *args):
+        """
+        Run javascript in the page, like *wd_instance.execute_script*, but big scripts are only sent to the browser
+        once per page (see :class:`.PinnedScripts`).  Use this for scripts you run over and over.
+
+        :param script: the javascript to run
+        :type script: str
+        :return: whatever the script returns
+        """
+        return PinnedScripts.execute(self.wd_instance, script, *args)
+
+    def run_async_script(self, script, *args):
+        """
+        Run asynchronous javascript in the page, like *wd_instance.execute_async_script*, but big scripts are only
+        sent to the browser once per page (see :class:`.PinnedScripts`).
+
+        :param script: the javascript to run, the callback is the last argument
+        :type script: str
+        :return: whatever the script passes to the callback
+        """
+        return PinnedScripts.execute_async(self.wd_instance, script, *args)
+
+    def get_connection_stats(self):
+        """
+        Get the connection reuse statistics for the hub this browser is connected to, see
+        :meth:`.PooledRemoteConnection.get_pool_stats`.
+
+        :return: a dict with requests, connections and reused keys, or None if the browser isn't using a
+                 :class:`.PooledRemoteConnection`
+        :rtype: dict
+        """
+        executor = getattr(self.wd_instance, 'command_executor', None)
+        while isinstance(executor, (SerializedConnection, CommandRecorder)):
+            executor = executor.command_executor
+        if not isinstance(executor, PooledRemoteConnection):
+            return None
+        return PooledRemoteConnection.get_pool_stats(executor.hub).get(executor.hub)
 
     def quit(self, log=True):
         """
@@ -703,21 +2173,295 @@ class Browser(object):
         """
         if log:
             self.logger.info("Calling quit on browser instance.")
+        if self._background is not None:
+            self._background.shutdown(wait=False)
+            self._background = None
+        if self.debug_log is not None:
+            # stop collecting, but keep the records so a failure in teardown can still be dumped
+            self.debug_log.detach()
         self.wd_instance.quit()
         return self
 
+    def enable_debug_log(self, capacity=10000, directory=".", dump_on_error=True, log=True):
+        """
+        Keep this browser's log records (every level) in a ring buffer, without writing them anywhere, so that the
+        details leading up to a failure can be dumped to a file with :meth:`.dump_debug_log` when (and only when)
+        something fails.  Your logs stay at the level they were set to, and other browsers aren't affected.  The
+        records can still be dumped after :meth:`.quit`.  See :class:`.DebugLog`.
+
+        :param capacity: the most records to keep, older ones are dropped
+        :type capacity: int
+        :param directory: where to write the dumped records
+        :type directory: str
+        :param dump_on_error: dump the records when a wait or action (like *click* or *wait_for_page*) raises, use
+                              False if you dump them yourself when a test fails
+        :type dump_on_error: bool
+        :param log: Whether or not to log
+        :type log: bool
+        :rtype: :class:`.DebugLog`
+        """
+        if self.debug_log is not None:
+            self.debug_log.detach()
+        self.debug_log = DebugLog(capacity, directory, self).attach()
+        self._dump_failed_actions = dump_on_error
+        if log:
+            self.logger.debug("Keeping the last %s log records in memory.", capacity)
+        return self.debug_log
+
+    def disable_debug_log(self):
+        """
+        Stop keeping log records (see :meth:`.enable_debug_log`), the records kept so far are dropped.
+        """
+        if self.debug_log is not None:
+            self.debug_log.detach()
+            self.debug_log = None
+
+    def dump_debug_log(self, reason=None, log=True):
+        """
+        Write the log records kept by :meth:`.enable_debug_log` to a file and empty the buffer.  Call it when a test
+        fails, or use :meth:`.dump_debug_log_on_error`.
+
+        :param reason: what failed (a test name for example), used in the file name
+        :type reason: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: the file written, None if the debug log isn't enabled or is empty
+        :rtype: str
+        """
+        if self.debug_log is None:
+            return None
+        filename = self.debug_log.dump(reason)
+        if log and filename is not None:
+            self.logger.warning("Wrote the debug log to %s", filename)
+        return filename
+
+    @contextmanager
+    def dump_debug_log_on_error(self, reason=None):
+        """
+        Dump the debug log (see :meth:`.dump_debug_log`) if anything in the with block raises::
+
+            with browser.dump_debug_log_on_error("login"):
+                browser.click(LoginPage.Submit_Button)
+                browser.wait_for_page(HomePage)
+
+        The exception is raised as usual after the log is written.
+        """
+        try:
+            yield self
+        except BaseException:
+            self.dump_debug_log(reason)
+            raise
+
+    def run_in_background(self, action, *args, **kwargs):
+        """
+        Queue a function to run on this browser's background thread, for work like taking screenshots or draining
+        logs while a test runs::
+
+            browser.run_in_background(lambda b: b.wd_instance.save_screenshot("before-login.png"))
+
+        Background functions run one at a time in the order they were queued.  The webdriver commands they send wait
+        while the test's own commands are running or waiting (see :class:`.SerializedConnection`), so they only use
+        the time the browser would otherwise sit idle.  The Browser is safe to use from several threads at once, but
+        only commands are serialized, so don't have two threads changing the page (clicking, typing, navigating) at
+        the same time.
+
+        :param action: the function to call, with the browser as the first argument
+        :return: a future for the value the function returns (or the exception it raises)
+        :rtype: concurrent.futures.Future
+        """
+        if self._background is None:
+            self._background = ThreadPoolExecutor(max_workers=1)
+        return self._background.submit(self._run_background, action, args, kwargs)
+
+    def _run_background(self, action, args, kwargs):
+        executor = _serialized_connection(self.wd_instance)
+        if executor is None:
+            return action(self, *args, **kwargs)
+        with executor.background():
+            return action(self, *args, **kwargs)
+
+    def locked(self):
+        """
+        Keep other threads from sending commands to this browser while this thread sends several commands that belong
+        together, like switching tabs and then using the tab::
+
+            with browser.locked():
+                browser.switch_to_tab(report_tab)
+                total = browser.get_text(ReportsPage.Total)
+
+        It can be nested.  Keep what is done inside short, every other thread waits for it.
+
+        :return: a context manager
+        """
+        return _command_lock(self.wd_instance)
+
     def go_to(self, url, log=True, test_for_angular=False):
         """Navigate the browser to the url provided"""
         if log:
-            self.logger.debug("Navigating to url {}.".format(repr(url)))
+            self.logger.debug("Navigating to url %r.", url)
         self.wd_instance.get(url)
+        WebElementLocator.page_changed(self.wd_instance)
         if test_for_angular:
-            self.angular_mode = self.wd_instance.execute_async_script(Browser.ANGULAR_EXISTS_JS)[0]
+            self.angular_mode = PinnedScripts.install_async(self.wd_instance, Browser.ANGULAR_EXISTS_JS)[0]
         else:
             self.angular_mode = False
+        self._capture_performance("go_to", navigated=True)
         return self
 
-    def wait_for_page(self, page, timeout=None, log=True):
+    def enable_performance_capture(self, store=None):
+        """
+        Collect browser side performance data (navigation timing, resource timing, paint and long task entries) after
+        every *go_to*, *click* and *wait_for_page*.  Samples taken after go_to and click are attributed to the page
+        found by the next wait_for_page (or first_page_found), which is the page the action led to.  Percentiles per
+        page are available from the store.
+
+        :param store: where to keep the samples, default is a new in memory :class:`.PerformanceStore`
+        :type store: :class:`.PerformanceStore`
+        :return: the store
+        :rtype: :class:`.PerformanceStore`
+        """
+        self.performance_store = store if store is not None else PerformanceStore()
+        return self.performance_store
+
+    def disable_performance_capture(self):
+        """
+        Stop collecting performance data, any samples waiting for a page name are stored without one.
+        """
+        self._flush_performance(None)
+        self.performance_store = None
+
+    def _capture_performance(self, action, navigated=False):
+        """
+        Internal method, take a performance sample if capture is enabled.  navigated is True when no script has run
+        on the page yet.
+        """
+        if self.performance_store is None:
+            return
+        try:
+            if navigated:
+                metrics = PinnedScripts.install(self.wd_instance, Browser.PERFORMANCE_JS)
+            else:
+                metrics = PinnedScripts.execute(self.wd_instance, Browser.PERFORMANCE_JS)
+        except WebDriverException as e:
+            self.logger.debug("Unable to capture performance data after %s: %s", action, e)
+            return
+        if metrics is None:
+            return
+        sample = {'page': None, 'action': action, 'url': self.wd_instance.current_url, 'time': time.time(),
+                  'metrics': metrics}
+        if action == "wait_for_page":
+            sample['page'] = self.current_page_name
+            self._flush_performance(self.current_page_name)
+            self.performance_store.add(sample)
+        else:
+            self._pending_performance.append(sample)
+
+    def _flush_performance(self, page_name):
+        """
+        Internal method, store the samples that were waiting to find out which page they belong to.
+        """
+        pending, self._pending_performance = self._pending_performance, []
+        for sample in pending:
+            sample['page'] = page_name
+            if self.performance_store is not None:
+                self.performance_store.add(sample)
+
+    def snapshot(self, log=True):
+        """
+        Take a snapshot of the current page: the page source is downloaded once and parsed locally into a
+        :class:`.FakeWebDriver` (requires lxml and cssselect).  The returned Browser answers *exists*, *get_text*, etc.
+        from the snapshot without talking to the real browser, so checking many locators costs one round trip.
+
+        The snapshot only has what is in the page source: no shadow roots, no frames, and no styles from stylesheets
+        (so *is_displayed* only knows about inline styles).  Calling snapshot again reuses the same snapshot Browser.
+
+        For appium sessions the page source xml is indexed by an :class:`.AppiumSourceDriver` instead (requires lxml),
+        locators it can't answer from the source are looked up on the device.  Elements from the snapshot can be read
+        but not acted on, use this browser to tap or type.
+
+        :param log: Whether or not to log
+        :type log: bool
+        :return: a Browser using the snapshot, with a default_timeout of 0
+        :rtype: :class:`.Browser`
+        """
+        mobile = isinstance(self.wd_instance, (appium.webdriver.Remote, AppiumSourceDriver))
+        if self._snapshot_browser is None:
+            self._snapshot_browser = Browser(BrowserType.FAKE_MOBILE if mobile else BrowserType.FAKE,
+                                             default_timeout=0)
+            self._snapshot_browser.logger = self.logger
+            if self.debug_log is not None:
+                self.debug_log.add_browser(self._snapshot_browser)
+        source = self.wd_instance.page_source
+        if mobile:
+            self._snapshot_browser.wd_instance.live = self.wd_instance
+            self._snapshot_browser.wd_instance.load_source(source)
+        else:
+            self._snapshot_browser.wd_instance.load_html(source, self.wd_instance.current_url)
+        if log:
+            self.logger.debug("Took a snapshot of the current page (%s characters).", len(source))
+        return self._snapshot_browser
+
+    def _budget_timeout(self, timeout, action, target=None):
+        """
+        Internal method, the timeout a wait should use: the default timeout if timeout is None, cut down to what is
+        left of the time budget if there is one.  Only the first call inside the outermost :func:`._budgeted` wait
+        is charged to the budget.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        if self.budget is None:
+            return timeout
+        state = self._wait_state
+        depth = getattr(state, 'depth', 0)
+        charge = not depth or not state.charged
+        if depth:
+            state.charged = True
+        return self.budget.spend(action, target, timeout, charge)
+
+    def _budget_ran_out(self):
+        """
+        Internal method, called when a wait fails: raises :class:`.TimeBudgetExceeded` if the time budget has run out.
+        """
+        if self.budget is not None and not self.budget.remaining:
+            raise self.budget.exceeded("during")
+
+    @contextmanager
+    def time_budget(self, seconds, name=None, log=True):
+        """
+        Limit the total time the waits in the with block can take.  Every wait (finding elements, waiting for pages,
+        clicks, ...) gets at most what is left of the budget, and once it has run out the next wait raises
+        :class:`.TimeBudgetExceeded` (with a report of where the time went) instead of waiting out its own timeout::
+
+            with browser.time_budget(60, "test_login") as budget:
+                browser.wait_for_page(LoginPage)
+                ...
+            print(budget.report())
+
+        A budget inside another one can't be longer than what is left of the outer one.
+
+        :param seconds: the length of the budget
+        :type seconds: int or float
+        :param name: what the budget is for (usually the test name)
+        :type name: str
+        :param log: Whether or not to log the report when the budget runs out
+        :type log: bool
+        :rtype: :class:`.TimeBudget`
+        """
+        outer = self.budget
+        if outer is not None:
+            outer.spend("time_budget", name, 0)
+        self.budget = TimeBudget(min(seconds, outer.remaining) if outer is not None else seconds, name)
+        try:
+            yield self.budget
+        except TimeBudgetExceeded as e:
+            if log and e.budget is self.budget:
+                self.logger.warning("%s", e)
+            raise
+        finally:
+            self.budget = outer
+
+    @_budgeted
+    def wait_for_page(self, page, timeout=None, log=True, snapshot=None):
         """
         Wait for a page class (container) to be present.
         This will cause that the page's *is_current_page* method to be called until it returns true or a timeout
@@ -729,6 +2473,9 @@ class Browser(object):
         :type timeout: int or float (use float for sub-second precision)
         :param log: Should the activities of this method be logged, default is True
         :type log: bool
+        :param snapshot: If True, is_current_page is checked against a :meth:`.snapshot` of the page taken each time
+                         through the loop, instead of the live browser.  Default is the *snapshot_mode* attribute.
+        :type snapshot: bool
         :return: this instance for chaining of methods
         :rtype: :class:`.Browser`
         """
@@ -740,32 +2487,37 @@ class Browser(object):
             page_instance = page()
         assert isinstance(page_instance, Container)
 
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "wait_for_page", page)
 
         if log:
             self.logger.debug(
-                "Waiting for up to {:.2f} seconds for page {} to be the current page.".format(float(timeout),
-                                                                                              page_instance.get_name()))
+                "Waiting for up to %.2f seconds for page %s to be the current page.", float(timeout),
+            page_instance.get_name())
+
+        if snapshot is None:
+            snapshot = self.snapshot_mode
 
         timer = Timer(timeout)
         while not timer.is_past_timeout():
-            if page_instance.is_current_page(self):
+            if page_instance.is_current_page(self.snapshot(log=False) if snapshot else self):
                 break
             time.sleep(0.25)  # sleep a quarter of a second
         else:
             # The timer.is_past_timeout() returned true and that kicked us out of the loop
             if log:
                 self.logger.warn(
-                    "Waited {:.2f} seconds for page {} to exist and it never returned true from is_current_page.".format(
-                        float(timeout), page_instance.get_name()))
+                    "Waited %.2f seconds for page %s to exist and it never returned true from is_current_page.",
+                    float(timeout), page_instance.get_name())
             raise WebDriverException(
                 "Waited {:.2f} seconds for page {} to exist and it never returned true from is_current_page.".format(
                     float(timeout), page_instance.get_name()))
         self.logger.debug(
-            "Found page {} after {:.2f} seconds.".format(page_instance.get_name(), time.time() - timer.start))
+            "Found page %s after %.2f seconds.", page_instance.get_name(), time.time() - timer.start)
+        self.current_page_name = page_instance.get_name()
+        self._capture_performance("wait_for_page")
         return self
 
+    @_budgeted
     def exists(self, locator, timeout=None, log=True):
         """
         Check to see if an element exists on a page.  You can control how long to wait, and if the method should do
@@ -779,11 +2531,15 @@ class Browser(object):
         :type log: bool
         :return: True if an element was found in the time specified
         :rtype: bool
+        :raises TimeBudgetExceeded: instead of returning False, if the :meth:`.time_budget` has run out
         """
-        if timeout is None:
-            timeout = self.default_timeout
-        return locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode) is not None
+        timeout = self._budget_timeout(timeout, "exists", locator)
+        if locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode) is None:
+            self._budget_ran_out()
+            return False
+        return True
 
+    @_budgeted
     def is_displayed(self, locator, timeout=None, log=True):
         """
         Check to see if an element is displayed on a page.  You can control how long to wait, and if the method should do
@@ -797,16 +2553,17 @@ class Browser(object):
         :type log: bool
         :return: True if an element was found in the time specified
         :rtype: bool
+        :raises TimeBudgetExceeded: if the element isn't found and the :meth:`.time_budget` has run out
         """
-        if timeout is None:
-            timeout = self.default_timeout
-        self.logger.info("Checking if element: {} is displayed".format(locator.describe()))
+        timeout = self._budget_timeout(timeout, "is_displayed", locator)
+        self.logger.info("Checking if element: %s is displayed", locator.describe())
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if element is None:
             raise WebDriverException(
                 "Unable to find element {} after waiting for {} seconds".format(locator.describe(), timeout))
         return element.is_displayed()
 
+    @_budgeted
     def is_enabled(self, locator, timeout=None, log=True):
         """
         Check to see if an element is enabled.  You can control how long to wait, and if the method should do
@@ -820,16 +2577,17 @@ class Browser(object):
         :type log: bool
         :return: True if an element was enabled
         :rtype: bool
+        :raises TimeBudgetExceeded: if the element isn't found and the :meth:`.time_budget` has run out
         """
-        if timeout is None:
-            timeout = self.default_timeout
-        self.logger.info("Checking if element: {} is enabled".format(locator.describe()))
+        timeout = self._budget_timeout(timeout, "is_enabled", locator)
+        self.logger.info("Checking if element: %s is enabled", locator.describe())
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if element is None:
             raise WebDriverException(
                 "Unable to find element {} after waiting for {} seconds".format(locator.describe(), timeout))
         return element.is_enabled()
 
+    @_budgeted
     def is_selected(self, locator, timeout=None, log=True):
         """
         Check to see if an element is selected.  You can control how long to wait, and if the method should do
@@ -843,16 +2601,17 @@ class Browser(object):
         :type log: bool
         :return: True if an element was selected
         :rtype: bool
+        :raises TimeBudgetExceeded: if the element isn't found and the :meth:`.time_budget` has run out
         """
-        if timeout is None:
-            timeout = self.default_timeout
-        self.logger.info("Checking if element: {} is selected".format(locator.describe()))
+        timeout = self._budget_timeout(timeout, "is_selected", locator)
+        self.logger.info("Checking if element: %s is selected", locator.describe())
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if element is None:
             raise WebDriverException(
                 "Unable to find element {} after waiting for {} seconds".format(locator.describe(), timeout))
         return element.is_selected()
 
+    @_budgeted
     def wait_for_not_exist(self, locator, timeout=None, log=True):
         """
         Wait for an element not to exist on a page.  You can control how long to wait, and if the method should do
@@ -865,16 +2624,16 @@ class Browser(object):
         :param log: Whether or not to log details of the look for the element (default is True)
         :type log: bool
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "wait_for_not_exist", locator)
         timer = Timer(timeout)
         while not timer.is_past_timeout():
             if locator.find_element_matching(self.wd_instance, 0, log, self.angular_mode) is None:
                 self.logger.info(
-                    "Element {} no longer exists.  wait_for_not_exist has completed.".format(locator.describe()))
+                    "Element %s no longer exists.  wait_for_not_exist has completed.", locator.describe())
                 return
             else:
                 time.sleep(.25)
+        self._budget_ran_out()
         raise Exception(
             "Element {} still existed after waiting for {:.2f} seconds".format(locator.describe(), float(timeout)))
 
@@ -890,12 +2649,12 @@ class Browser(object):
         #else:
         element.click()
 
+    @_budgeted
     def _internal_click(self, locator, timeout, log, signal=False):
         """
         A private internal method for finding an element and clicking it.  The raw element is returned.
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "click", locator)
         timer = Timer(timeout)
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if element is None:
@@ -911,13 +2670,14 @@ class Browser(object):
             time.sleep(.25)
             element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if log:
-            self.logger.debug("Clicking on element {}".format(locator.describe()))
+            self.logger.debug("Clicking on element %s", locator.describe())
         if signal:
             dispatcher.send(signal=Browser.SIGNAL_BEFORE_CLICK, sender=self, locator=locator)
 
         self._internal_raw_click(element)
         return element
 
+    @_budgeted
     def _internal_wait_for_changes_to_stop(self, locator, locate_timeout=None, change_timeout=10, log=True):
         """
         Internal method, do not call unless you know what you are doing.  This method waits for changes to an element
@@ -929,18 +2689,19 @@ class Browser(object):
         :param log:
         :return:
         """
-        if locate_timeout is None:
-            locate_timeout = self.default_timeout
+        locate_timeout = self._budget_timeout(locate_timeout, "wait_for_changes_to_stop", locator)
         element = locator.find_element_matching(self.wd_instance, locate_timeout, log, self.angular_mode)
         if log:
-            self.logger.debug("Performing checks to make sure that {} is done changing.".format(locator.describe()))
+            self.logger.debug("Performing checks to make sure that %s is done changing.", locator.describe())
         last_number_of_sub_elements = len(element.find_elements_by_xpath('.//*'))
         last_text = element.text
         timer = Timer(change_timeout)
         number_of_times_with_no_changes = 0
         while not timer.is_past_timeout():
             time.sleep(.1)
-            element = locator.find_element_matching(self.wd_instance, self.default_timeout, False, self.angular_mode)
+            element = locator.find_element_matching(self.wd_instance,
+                                                    self._budget_timeout(None, "wait_for_changes_to_stop", locator),
+                                                    False, self.angular_mode)
             if element is not None:
                 current_number_of_sub_elements = len(element.find_elements_by_xpath('.//*'))
                 current_text = element.text
@@ -954,8 +2715,8 @@ class Browser(object):
                 last_text = current_text
         else:
             if log:
-                self.logger.warn("Waited 10 seconds for {} to stop changing, but it seems to still be changing".format(
-                    locator.describe()))
+                self.logger.warn("Waited 10 seconds for %s to stop changing, but it seems to still be changing",
+                                 locator.describe())
         return element
 
     def click(self, locator, timeout=None, log=True):
@@ -972,8 +2733,10 @@ class Browser(object):
         :rtype: :class:`.Browser`
         """
         self._internal_click(locator, timeout, log, signal=True)
+        self._capture_performance("click")
         return self
 
+    @_budgeted
     def move_to_and_click(self, locator, timeout=None, log=True):
         """
         Move to an element (mouse) and then click it.
@@ -986,15 +2749,15 @@ class Browser(object):
         :return: The reference to this Browser instance.
         :rtype: :class:`.Browser`
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "move_to_and_click", locator)
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         action = ActionChains(self.wd_instance)
         if log:
-            self.logger.info("Moving to element {} and clicking it.".format(locator.describe()))
+            self.logger.info("Moving to element %s and clicking it.", locator.describe())
         action.move_to_element(element).click(element).perform()
         return self
 
+    @_budgeted
     def set_checkbox_state(self, locator, checked=None, timeout=None, log=True):
         """
         Sets the state of a checkbox input type regardless of the current state.  You can control how long to wait, and if the method should do
@@ -1009,8 +2772,7 @@ class Browser(object):
         :param log: Whether or not to log details of the look for the element (default is True)
         :type log: bool
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "set_checkbox_state", locator)
         timer = Timer(timeout)
         while not timer.is_past_timeout():
             element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
@@ -1021,6 +2783,7 @@ class Browser(object):
                 self._internal_click(locator, timeout=1, log=log)
         return self
 
+    @_budgeted
     def get_checkbox_state(self, locator, timeout=None, log=True):
         """
         Gets the state of a checkbox input type.  You can control how long to wait, and if the method should do
@@ -1034,8 +2797,7 @@ class Browser(object):
         :type log: bool
         :rtype bool
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "get_checkbox_state", locator)
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         return element.is_selected()
 
@@ -1054,6 +2816,7 @@ class Browser(object):
             raise WebDriverException("Unable to find element {} not found.".format(locator.name))
         return self
 
+    @_budgeted
     def type(self, locator, keys, timeout=None, log=True, clear=True, click=True):
         """
         Send key strokes to an element.  Mostly used for input elements of type text.
@@ -1071,15 +2834,14 @@ class Browser(object):
         :return: The reference to this Browser instance.
         :rtype: :class:`.Browser`
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "type", locator)
         element = None
         if click:
             element = self._internal_click(locator, timeout, log, signal=True)
         else:
             element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if clear:
-            self.logger.debug("Clearing the value of {} before typing.".format(locator.describe()))
+            self.logger.debug("Clearing the value of %s before typing.", locator.describe())
             element.clear()
         element.send_keys(keys)
         return self
@@ -1096,6 +2858,195 @@ class Browser(object):
         if element is not None:
             return element.text
 
+    @_budgeted
+    def _internal_root_element(self, locator, timeout, log):
+        """
+        Internal method, find the element a script should start from.  None (the whole document) is returned if
+        there is no locator.
+        """
+        if locator is None:
+            return None
+        timeout = self._budget_timeout(timeout, "root_element", locator)
+        element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
+        if element is None:
+            raise WebDriverException(
+                "Unable to find element {} after waiting for {:.2f} seconds".format(locator.describe(), float(timeout)))
+        return element
+
+    def get_digest(self, locator=None, structure=False, timeout=None, log=True):
+        """
+        Get a short digest (hash) of the text of the page, or of an element on the page.  The digest is computed in
+        the browser so only a few bytes come back, no matter how big the page is.  This is useful to see if something
+        changed, or to compare two pages, without downloading their text.
+
+        :param locator: the element to compute the digest of, default is the whole page
+        :type locator: :class:`.WebElementLocator`
+        :param structure: If True the digest is of the element structure (tag names and nesting) instead of the text
+        :type structure: bool
+        :param timeout: The amount of time (in seconds) to look for the element before throwing a not found exception
+        :type timeout: int or float (float for sub-second precision)
+        :param log: Whether or not to log details of the look for the element (default is True)
+        :type log: bool
+        :return: the digest, which is only useful for comparing to other digests
+        :rtype: str
+        """
+        element = self._internal_root_element(locator, timeout, log)
+        digest = PinnedScripts.execute(self.wd_instance, Browser.DIGEST_JS, element, structure)
+        if log:
+            self.logger.debug("Digest of %s is %s", "page" if locator is None else locator.describe(), digest)
+        return digest
+
+    @_budgeted
+    def wait_for_change(self, digest, locator=None, structure=False, timeout=None, log=True):
+        """
+        Wait for the digest of the page (or an element) to be different from the one passed in.  Get the starting
+        digest from :meth:`.get_digest` before doing the action that should change the page.
+
+        :param digest: the digest from before the change
+        :type digest: str
+        :param locator: the element to compute the digest of, default is the whole page
+        :type locator: :class:`.WebElementLocator`
+        :param structure: If True the digest is of the element structure (tag names and nesting) instead of the text
+        :type structure: bool
+        :param timeout: The amount of time (in seconds) to wait before throwing an exception
+        :type timeout: int or float (float for sub-second precision)
+        :param log: Whether or not to log details of the wait (default is True)
+        :type log: bool
+        :return: the new digest
+        :rtype: str
+        """
+        timeout = self._budget_timeout(timeout, "wait_for_change", locator)
+        name = "page" if locator is None else locator.describe()
+        if log:
+            self.logger.debug("Waiting for up to %.2f seconds for %s to change.", float(timeout), name)
+        timer = Timer(timeout)
+        while True:
+            try:
+                current = self.get_digest(locator, structure, timeout=0, log=False)
+                if current != digest:
+                    if log:
+                        self.logger.debug("%s changed after %.2f seconds.", name, time.time() - timer.start)
+                    return current
+            except TimeBudgetExceeded:
+                raise
+            except WebDriverException:
+                pass
+            if timer.is_past_timeout():
+                break
+            time.sleep(.25)
+        raise WebDriverException("Waited {:.2f} seconds for {} to change, but it didn't.".format(float(timeout), name))
+
+    def contains_text(self, text, locator=None, timeout=None, log=True):
+        """
+        Check if the page (or an element on the page) contains some text.  The check happens inside the browser so
+        the text of the page is never downloaded.
+
+        :param text: the text to look for
+        :type text: str
+        :param locator: the element to look in, default is the whole page
+        :type locator: :class:`.WebElementLocator`
+        :param timeout: The amount of time (in seconds) to look for the element before throwing a not found exception
+        :type timeout: int or float (float for sub-second precision)
+        :param log: Whether or not to log details of the look for the element (default is True)
+        :type log: bool
+        :return: True if the text was found
+        :rtype: bool
+        """
+        element = self._internal_root_element(locator, timeout, log)
+        retval = PinnedScripts.execute(self.wd_instance, Browser.CONTAINS_TEXT_JS, element, text)
+        if log:
+            self.logger.debug("%s %s text %r", "Page" if locator is None else locator.describe(),
+                              "contains" if retval else "does not contain", text)
+        return retval
+
+    def iter_page_text(self, locator=None, source=False, chunk_size=262144, timeout=None, log=True):
+        """
+        Get the text of the page (or an element) in chunks, instead of one giant string.  The text is captured once
+        in the browser, then pulled over one chunk per script call, so memory use stays at about chunk_size no
+        matter how big the page is.
+
+        :param locator: the element to get the text of, default is the whole page
+        :type locator: :class:`.WebElementLocator`
+        :param source: If True the html source (outerHTML) is returned instead of the text
+        :type source: bool
+        :param chunk_size: the maximum number of characters in each chunk (as javascript counts them, a character
+                           outside the basic multilingual plane counts twice and is never split between chunks)
+        :type chunk_size: int
+        :param timeout: The amount of time (in seconds) to look for the element before throwing a not found exception
+        :type timeout: int or float (float for sub-second precision)
+        :param log: Whether or not to log details of the look for the element (default is True)
+        :type log: bool
+        :return: a generator yielding strings of at most chunk_size characters
+        """
+        element = self._internal_root_element(locator, timeout, log)
+        key, length = PinnedScripts.execute(self.wd_instance, Browser.STREAM_START_JS, element, source)
+        if log:
+            self.logger.debug("Streaming %s characters of %s %s in chunks of %s.", length,
+                              "page" if locator is None else locator.describe(), "source" if source else "text",
+                              chunk_size)
+        try:
+            start = 0
+            while start < length:
+                chunk, start = PinnedScripts.execute(self.wd_instance, Browser.STREAM_CHUNK_JS, key, start, chunk_size)
+                yield chunk
+        finally:
+            try:
+                PinnedScripts.execute(self.wd_instance, Browser.STREAM_END_JS, key)
+            except WebDriverException:
+                pass
+
+    def iter_page_source(self, locator=None, chunk_size=262144, timeout=None, log=True):
+        """
+        Get the html source of the page (or an element) in chunks.  This is the same as calling
+        :meth:`.iter_page_text` with source=True.  The source is the document's outerHTML, which is what the browser
+        has now (not what was downloaded), and doesn't include the doctype.
+
+        :return: a generator yielding strings of at most chunk_size characters
+        """
+        return self.iter_page_text(locator, True, chunk_size, timeout, log)
+
+    def save_page_text(self, filename, locator=None, source=False, chunk_size=262144, timeout=None, log=True):
+        """
+        Write the text (or html source) of the page, or an element, to a file one chunk at a time.  See
+        :meth:`.iter_page_text` for the other parameters.
+
+        :param filename: the path of the file to write (utf-8)
+        :type filename: str
+        :return: the number of characters written
+        :rtype: int
+        """
+        written = 0
+        with io.open(filename, 'w', encoding='utf-8') as output:
+            for chunk in self.iter_page_text(locator, source, chunk_size, timeout, log):
+                output.write(chunk)
+                written += len(chunk)
+        if log:
+            self.logger.debug("Wrote %s characters to %s", written, filename)
+        return written
+
+    def find_in_page_text(self, text, locator=None, source=False, chunk_size=262144, timeout=None, log=True):
+        """
+        Search the text (or html source) of the page, or an element, one chunk at a time.  Stops pulling chunks as
+        soon as the text is found.  See :meth:`.iter_page_text` for the other parameters.  If all you need is a yes or
+        no answer, :meth:`.contains_text` is faster.
+
+        :param text: the text to look for
+        :type text: str
+        :return: the position of the first occurrence of text, or -1 if it wasn't found
+        :rtype: int
+        """
+        overlap = ""
+        offset = 0
+        for chunk in self.iter_page_text(locator, source, chunk_size, timeout, log):
+            window = overlap + chunk
+            index = window.find(text)
+            if index != -1:
+                return offset - len(overlap) + index
+            offset += len(chunk)
+            overlap = window[-(len(text) - 1):] if len(text) > 1 else ""
+        return -1
+
+    @_budgeted
     def get_text(self, locator, timeout=None, log=True):
         """
         Get the text of an element on the page.
@@ -1109,17 +3060,17 @@ class Browser(object):
         :return: the text of the element on success, exception raised on inability to find the element
         :rtype: str
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "get_text", locator)
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if element is None:
             raise WebDriverException(
                 "Unable to find element {} after waiting for {:.2f} seconds".format(locator.describe(), float(timeout)))
         text = element.text
         if log:
-            self.logger.debug("Found element {}, returning text: {}".format(locator.describe(), text))
+            self.logger.debug("Found element %s, returning text: %s", locator.describe(), text)
         return text
 
+    @_budgeted
     def get_attribute_value(self, locator, attribute_name, timeout=None, log=True):
         """
         Get the value of an html element's attribute.
@@ -1135,8 +3086,7 @@ class Browser(object):
         :return: the text of the element on success, exception raised on inability to find the element
         :rtype: str
         """
-        if timeout is None:
-            timeout = self.default_timeout
+        timeout = self._budget_timeout(timeout, "get_attribute_value", locator)
         element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
         if element is None:
             raise WebDriverException(
@@ -1144,14 +3094,148 @@ class Browser(object):
         value = element.get_attribute(attribute_name)
         if log:
             self.logger.debug(
-                "Found element {}, attribute {} has value: {}".format(locator.describe(), attribute_name, value))
+                "Found element %s, attribute %s has value: %s", locator.describe(), attribute_name, value)
         return value
 
-    def first_page_found(self, page_classes, timeout=None, log=True):
+    def _extraction_columns(self, columns, row_locator):
         """
-        Look for the first page class that returns true, and return it.  This is useful when you are trying to detect
-        if a particular flow is happening.  Rather than waiting for one page class, this goes through a list each time
-        and as soon as one returns true, it returns that element.
+        Internal method, turn the columns passed to :meth:`.extract_rows` into [name, steps, attribute] lists that
+        EXTRACT_ROWS_JS understands.
+        """
+        if isinstance(columns, dict):
+            columns = columns.items()
+        # locators the rows are found within are outside the row, a column found within one of them is only
+        # looked for in the row
+        row_parents = []
+        parent = row_locator
+        while parent is not None:
+            row_parents.append(parent)
+            parent = parent.within
+        retval = []
+        for name, column in columns:
+            attribute = None
+            if isinstance(column, tuple):
+                column, attribute = column
+            elif isinstance(column, _string_types):
+                column, attribute = None, column
+            steps = []
+            while isinstance(column, WebElementLocator) and not any([column is row for row in row_parents]):
+                steps.insert(0, column.finder.script_finders())
+                column = column.within
+            if isinstance(column, Find):
+                steps.insert(0, column.script_finders())
+            elif column is not None and not isinstance(column, WebElementLocator):
+                raise WebDriverException("Column {} should be a Find, a WebElementLocator, an attribute name, a "
+                                         "(Find, attribute name) tuple or None, not {}".format(repr(name),
+                                                                                              repr(column)))
+            retval.append([name, steps, attribute])
+        return retval
+
+    def iter_extracted_rows(self, row_locator, columns, next_page=None, max_pages=None, timeout=None, log=True):
+        """
+        Extract structured data from a list or table, one page at a time.  Each row found by row_locator is turned
+        into a dict in a single script call per page, instead of a round trip for every cell.  See
+        :meth:`.extract_rows` for how to specify columns.
+
+        If next_page is provided, it is clicked after each page is extracted and the next page is extracted once the
+        list has changed (see :meth:`.wait_for_change`, the digest is of the element the rows are found *within*, or
+        of the whole page).  This stops when next_page is no longer displayed and enabled, clicking it doesn't change
+        the list within the timeout, a page has no rows, or max_pages is reached.
+
+        :param row_locator: the locator that finds every row
+        :type row_locator: :class:`.WebElementLocator`
+        :param columns: a dict (or list of pairs) of column name to column specification
+        :param next_page: the locator of a "next" button or link, if the data is paginated
+        :type next_page: :class:`.WebElementLocator`
+        :param max_pages: the maximum number of pages to extract (default is all of them)
+        :type max_pages: int
+        :param timeout: The amount of time (in seconds) to wait for rows to show up
+        :type timeout: int or float (float for sub-second precision)
+        :param log: Whether or not to log details of the extraction (default is True)
+        :type log: bool
+        :return: a generator yielding a list of dicts for each page
+        """
+        timeout = self._budget_timeout(timeout, "iter_extracted_rows", row_locator)
+        script_columns = self._extraction_columns(columns, row_locator)
+        page_number = 0
+        while max_pages is None or page_number < max_pages:
+            rows = row_locator.find_all_elements_matching(self.wd_instance, timeout, log, self.angular_mode)
+            if not rows:
+                return
+            page = PinnedScripts.execute(self.wd_instance, Browser.EXTRACT_ROWS_JS, rows, script_columns)
+            page_number += 1
+            if log:
+                self.logger.debug("Extracted %s rows from page %s of %s", len(page), page_number,
+                                  row_locator.describe())
+            yield page
+            if next_page is None:
+                return
+            next_element = next_page.find_element_matching(self.wd_instance, 0, log, self.angular_mode)
+            if next_element is None or not (next_element.is_displayed() and next_element.is_enabled()):
+                return
+            digest = self.get_digest(row_locator.within, timeout=0, log=False)
+            if log:
+                self.logger.debug("Clicking on %s to get the next page of rows.", next_page.describe())
+            self._internal_raw_click(next_element)
+            try:
+                self.wait_for_change(digest, row_locator.within, timeout=timeout, log=False)
+            except TimeBudgetExceeded:
+                raise
+            except WebDriverException:
+                if log:
+                    self.logger.debug("The next page of %s didn't load, done after %s pages.",
+                                      row_locator.describe(), page_number)
+                return
+
+    def extract_rows(self, row_locator, columns, next_page=None, max_pages=None, timeout=None, log=True):
+        """
+        Extract structured data from a list or table as a list of dicts, one dict per row.  All the cells of a page
+        are read in one script call.
+
+        Each column specification can be:
+
+        * a :class:`.Find` or :class:`.WebElementLocator` (css selector, xpath, id, name, class name or tag name),
+          the value is the text of the first matching element inside the row.  With Or the first finder that
+          matches is used.  If the locator is *within* another locator, that one is looked for inside the row first
+          (unless it is the row locator, or one the rows are found within)
+        * a string, the value is that attribute of the row element
+        * a tuple of (:class:`.Find`, attribute name), the value is the attribute of the first matching element
+        * None, the value is the text of the row itself
+
+        Xpath expressions are evaluated with the row as the context node, so start them with "." to stay inside the
+        row.  Cells that can't be found are None.  Example::
+
+            rows = browser.extract_rows(ResultsPage.Row, {
+                "name": Find.by_css_selector("td.name"),
+                "link": (Find.by_tag_name("a"), "href"),
+                "id": "data-id"
+            }, next_page=ResultsPage.Next_Button)
+
+        :param row_locator: the locator that finds every row
+        :type row_locator: :class:`.WebElementLocator`
+        :param columns: a dict (or list of pairs) of column name to column specification
+        :param next_page: the locator of a "next" button or link, if the data is paginated
+        :type next_page: :class:`.WebElementLocator`
+        :param max_pages: the maximum number of pages to extract (default is all of them)
+        :type max_pages: int
+        :param timeout: The amount of time (in seconds) to wait for rows to show up
+        :type timeout: int or float (float for sub-second precision)
+        :param log: Whether or not to log details of the extraction (default is True)
+        :type log: bool
+        :return: every row from every page
+        :rtype: list of dict
+        """
+        retval = []
+        for page in self.iter_extracted_rows(row_locator, columns, next_page, max_pages, timeout, log):
+            retval.extend(page)
+        return retval
+
+    @_budgeted
+    def first_page_found(self, page_classes, timeout=None, log=True, snapshot=None):
+        """
+        Look for the first page class that returns true, and return it.  This is useful when you are trying to detect
+        if a particular flow is happening.  Rather than waiting for one page class, this goes through a list each time
+        and as soon as one returns true, it returns that element.
 
         :param page_classes: The list of page classes or page class instances.  Whatever you pass in here is what will
                              be returned if found.
@@ -1159,6 +3243,9 @@ class Browser(object):
         :type timeout: int or float (float for sub-second precision)
         :param log: Whether or not to log details of the look for the element (default is True)
         :type log: bool
+        :param snapshot: If True, every page class is checked against one :meth:`.snapshot` of the page each time
+                         through the loop, instead of the live browser.  Default is the *snapshot_mode* attribute.
+        :type snapshot: bool
         :return: A page class from the list passed in (if found), None otherwise
         """
         page_list = []
@@ -1173,24 +3260,28 @@ class Browser(object):
             page_names.append(page_list_val['instance'].get_name())
             page_list.append(page_list_val)
         if log:
-            self.logger.debug("Waiting for one of the pages [{}] to be found.".format(','.join(page_names)))
-        if timeout is None:
-            timeout = self.default_timeout
+            self.logger.debug("Waiting for one of the pages [%s] to be found.", ','.join(page_names))
+        timeout = self._budget_timeout(timeout, "first_page_found", page_classes)
+        if snapshot is None:
+            snapshot = self.snapshot_mode
         timer = Timer(timeout)
         while not timer.is_past_timeout():
+            browser = self.snapshot(log=False) if snapshot else self
             for page in page_list:
-                if page['instance'].is_current_page(self):
+                if page['instance'].is_current_page(browser):
                     if log:
-                        self.logger.info("Found page {} after {:.2f} seconds.".format(page['instance'].get_name(),
-                                                                                      time.time() - timer.start))
+                        self.logger.info("Found page %s after %.2f seconds.", page['instance'].get_name(),
+                                         time.time() - timer.start)
+                    self.current_page_name = page['instance'].get_name()
+                    self._capture_performance("wait_for_page")
                     return page['retval']
             time.sleep(0.25)  # sleep a quarter of a second
         else:
             # The timer.is_past_timeout() returned true and that kicked us out of the loop
             if log:
                 self.logger.warn(
-                    "Waited {:.2f} seconds for one of the pages [{}] to return true from is_current_page, but that never happend.".format(
-                        float(timeout), ','.join(page_names)))
+                    "Waited %.2f seconds for one of the pages [%s] to return true from is_current_page, but that never happend.",
+                    float(timeout), ','.join(page_names))
             return None
 
     def get_url(self, log=True):
@@ -1206,7 +3297,7 @@ class Browser(object):
             self.logger.debug("Getting current URL of browser.")
         retval = self.wd_instance.current_url
         if log:
-            self.logger.debug("Current URL of browser is {}".format(retval))
+            self.logger.debug("Current URL of browser is %s", retval)
         return retval
 
     def get_title(self, log=True):
@@ -1222,9 +3313,220 @@ class Browser(object):
             self.logger.debug("Getting title of current page.")
         retval = self.wd_instance.title
         if log:
-            self.logger.debug("Title of current page is {}".format(retval))
+            self.logger.debug("Title of current page is %s", retval)
         return retval
 
+    @property
+    def current_tab(self):
+        """
+        The window handle of the tab the browser is working in.  This is remembered so that switching to the tab
+        that is already current doesn't cost a round trip.  If you switch windows using *wd_instance* directly, call
+        :meth:`.switch_to_tab` (or set this to None) so it can be updated.
+
+        :rtype: str
+        """
+        if self._current_tab is None:
+            self._current_tab = self.wd_instance.current_window_handle
+        return self._current_tab
+
+    @current_tab.setter
+    def current_tab(self, handle):
+        self._current_tab = handle
+
+    def get_tabs(self):
+        """
+        Get the window handles of every tab (and window) of this browser session.
+
+        :rtype: list of str
+        """
+        return self.wd_instance.window_handles
+
+    def open_tab(self, url=None, switch=True, log=True):
+        """
+        Open a new tab in this browser session.  Tabs are much cheaper than starting another browser.
+
+        :param url: the url to load in the new tab, default is a blank page
+        :type url: str
+        :param switch: should the browser switch to the new tab
+        :type switch: bool
+        :param log: Whether or not to log
+        :type log: bool
+        :return: the window handle of the new tab
+        :rtype: str
+        """
+        # another thread's new tab would look like this one
+        with self.locked():
+            before = set(self.wd_instance.window_handles)
+            self.wd_instance.execute_script("window.open(arguments[0], '_blank');", url or "about:blank")
+            handles = [handle for handle in self.wd_instance.window_handles if handle not in before]
+            if not handles:
+                raise WebDriverException("Unable to open a new tab, the browser may be blocking popups.")
+            if log:
+                self.logger.debug("Opened new tab %s with url %r", handles[0], url)
+            if switch:
+                self.switch_to_tab(handles[0], log)
+        return handles[0]
+
+    def switch_to_tab(self, handle, log=True):
+        """
+        Make the browser work in another tab.  Nothing is sent to the browser if it is already working in that tab.
+
+        :param handle: the window handle of the tab
+        :type handle: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: The reference to this Browser instance.
+        :rtype: :class:`.Browser`
+        """
+        if handle != self.current_tab:
+            if log:
+                self.logger.debug("Switching to tab %s", handle)
+            self.wd_instance.switch_to.window(handle)
+            self._current_tab = handle
+            WebElementLocator.page_changed(self.wd_instance)
+        return self
+
+    def close_tab(self, handle=None, switch_to=None, log=True):
+        """
+        Close a tab.  If the tab the browser is working in is closed, the browser switches to switch_to, or the first
+        remaining tab.  Closing another tab leaves the browser working in the tab it was in (switch_to is ignored).
+
+        :param handle: the window handle of the tab to close, default is the current tab
+        :type handle: str
+        :param switch_to: the window handle of the tab to work in afterwards
+        :type switch_to: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: The reference to this Browser instance.
+        :rtype: :class:`.Browser`
+        """
+        with self.locked():
+            previous = self.current_tab
+            if handle is None:
+                handle = previous
+            self.switch_to_tab(handle, log)
+            if log:
+                self.logger.debug("Closing tab %s", handle)
+            self.wd_instance.close()
+            self._current_tab = None
+            if handle != previous:
+                self.wd_instance.switch_to.window(previous)
+                self._current_tab = previous
+                WebElementLocator.page_changed(self.wd_instance)
+                return self
+            remaining = self.wd_instance.window_handles
+            if switch_to is None and remaining:
+                switch_to = remaining[0]
+            if switch_to is not None:
+                # the closed tab was current, so always switch (switch_to_tab would ask the browser for the closed tab)
+                self.wd_instance.switch_to.window(switch_to)
+                self._current_tab = switch_to
+                WebElementLocator.page_changed(self.wd_instance)
+            return self
+
+    def _condition_met(self, condition):
+        """
+        Internal method, check (once) if something a tab task yielded is ready.
+        """
+        if condition is None:
+            return True
+        if isinstance(condition, WebElementLocator):
+            return self.exists(condition, timeout=0, log=False)
+        if isinstance(condition, Container):
+            return condition.is_current_page(self)
+        if inspect.isclass(condition) and issubclass(condition, Container):
+            return condition().is_current_page(self)
+        return condition(self)
+
+    @_budgeted
+    def run_in_tabs(self, tasks, timeout=None, log=True):
+        """
+        Run several tasks at the same time, each in its own tab of this browser session.  While one tab is waiting on
+        the application, the browser works in another.
+
+        Each task is a (url, function) pair.  The function is called with this browser, and must be a generator that
+        yields whatever it needs to wait for: a page class (or instance), a :class:`.WebElementLocator`, or a
+        function that takes the browser and returns True when ready.  The tab is always switched back before the task
+        continues, so the task can use the browser normally between yields::
+
+            def check_report(browser):
+                yield ReportsPage
+                browser.click(ReportsPage.Refresh_Button)
+                yield ReportsPage.Results_Table
+                totals.append(browser.get_text(ReportsPage.Total))
+
+            totals = []
+            results = browser.run_in_tabs([(REPORT_1_URL, check_report), (REPORT_2_URL, check_report)])
+
+        On Python 3 a task can also return a value (``return browser.get_text(ReportsPage.Total)``), which ends up in
+        the value of its result.  Python 2 does not allow return with a value in a generator, so there the value is
+        always None.
+
+        If something a task yielded isn't ready within the timeout, a WebDriverException is raised inside the task.
+        Each task's tab is closed when it is done.
+
+        :param tasks: list of (url, generator function) pairs
+        :param timeout: the max time (in seconds) to wait for each thing a task yields
+        :type timeout: int or float (use float for sub-second precision)
+        :param log: Whether or not to log
+        :type log: bool
+        :return: a result for each task in the same order, value is what the generator returned (Python 3 only)
+        :rtype: list of :class:`.BrowserResult`
+        """
+        timeout = self._budget_timeout(timeout, "run_in_tabs")
+        original_tab = self.current_tab
+        running = []
+        results = []
+        for index, (url, task) in enumerate(tasks):
+            results.append(BrowserResult(self))
+            handle = self.open_tab(url, switch=True, log=log)
+            running.append({'index': index, 'handle': handle, 'generator': task(self), 'start': time.time(),
+                            'send': None, 'condition': None, 'timer': None})
+        try:
+            while running:
+                progressed = False
+                for state in list(running):
+                    # the tab has to stay current until the task's step is done
+                    with self.locked():
+                        self.switch_to_tab(state['handle'], log=False)
+                        result = results[state['index']]
+                        try:
+                            if state['timer'] is not None:
+                                if self._condition_met(state['condition']):
+                                    state['timer'] = None
+                                elif state['timer'].is_past_timeout():
+                                    state['timer'] = None
+                                    state['condition'] = state['generator'].throw(WebDriverException(
+                                        "Waited {:.2f} seconds in tab {} for {}, but it was never ready.".format(
+                                            float(timeout), state['handle'], repr(state['condition']))))
+                                    state['timer'] = Timer(timeout)
+                                    continue
+                                else:
+                                    continue
+                            progressed = True
+                            state['condition'] = next(state['generator'])
+                            state['timer'] = Timer(timeout)
+                        except StopIteration as e:
+                            result.value = getattr(e, 'value', None)
+                        except TimeBudgetExceeded:
+                            raise
+                        except Exception as e:
+                            result.exception = e
+                        else:
+                            continue
+                        result.duration = time.time() - state['start']
+                        running.remove(state)
+                        self.close_tab(state['handle'], switch_to=original_tab, log=log)
+                if not progressed:
+                    time.sleep(.1)
+        finally:
+            for state in running:
+                try:
+                    self.close_tab(state['handle'], switch_to=original_tab, log=log)
+                except WebDriverException:
+                    pass
+        return results
+
     def select_option_by_text(self, locator, option_text, timeout=None, log=True):
         """
         Select an option of a select element by partial or complete text.
@@ -1242,15 +3544,103 @@ class Browser(object):
         """
         if log:
             self.logger.debug(
-                'Selecting option by text "{}" from select element {}'.format(option_text, locator.describe()))
+                'Selecting option by text "%s" from select element %s', option_text, locator.describe())
         element = self._internal_wait_for_changes_to_stop(locator, timeout, log)
         select = Select(element)
         select.select_by_visible_text(option_text)
         return self
 
+    @_budgeted
+    def screenshot(self, locator=None, to=None, region=None, timeout=None, log=True):
+        """
+        Take a screenshot of the page, one element or a region of the page, as png.  For an element the driver's
+        element screenshot is used, if the driver doesn't have one (or it fails) the page screenshot is cropped to
+        the element's bounding box (which needs Pillow, like cropping to a region does).
+
+        The png is decoded from webdriver's base64 straight into the file or buffer, without making extra copies::
+
+            browser.screenshot(SearchPage.Results_Div, to="results.png")
+
+        :param locator: the element to take a screenshot of, default is the whole page
+        :type locator: :class:`.WebElementLocator`
+        :param to: a file name, or anything with a write method (a file, io.BytesIO), default is to return the png
+        :param region: the (x, y, width, height) of the part of the page, or of the element, to keep (in screenshot
+                       pixels)
+        :type region: (int, int, int, int)
+        :param timeout: The amount of time (in seconds) to look for the element before failing
+        :type timeout: int or float (use float for sub-second precision)
+        :param log: Whether or not to log
+        :type log: bool
+        :return: the png bytes if to is None, otherwise the number of bytes written
+        """
+        timeout = self._budget_timeout(timeout, "screenshot", locator)
+        png = None
+        if locator is not None:
+            element = locator.find_element_matching(self.wd_instance, timeout, log, self.angular_mode)
+            if element is None:
+                raise WebDriverException("Unable to find element {} after waiting for {:.2f} seconds".format(
+                    locator.describe(), float(timeout)))
+            if log:
+                self.logger.debug("Taking a screenshot of element %s.", locator.describe())
+            if self._element_screenshots is not False:
+                try:
+                    png = binascii.a2b_base64(element.screenshot_as_base64)
+                    self._element_screenshots = True
+                except WebDriverException as e:
+                    # only a driver that doesn't have the command (see CommandErrorHandler) gives up on element
+                    # screenshots for good, any other failure tries again next time
+                    if isinstance(e, UnknownMethodException):
+                        self._element_screenshots = False
+                    self.logger.debug("Unable to take an element screenshot (%s), cropping the page screenshot.",
+                                      str(e).strip())
+        elif log:
+            self.logger.debug("Taking a screenshot of the page.")
+        if png is None:
+            png = binascii.a2b_base64(self.wd_instance.get_screenshot_as_base64())
+            if locator is not None:
+                region = self._element_region(element, png, region)
+        if region is not None:
+            if Image is None:
+                raise WebDriverException("Cropping a screenshot requires Pillow, install it with pip.")
+            x, y, width, height = [int(round(value)) for value in region]
+            cropped = io.BytesIO()
+            Image.open(io.BytesIO(png)).crop((x, y, x + width, y + height)).save(cropped, 'PNG')
+            png = cropped.getvalue()
+        if to is None:
+            return png
+        if hasattr(to, 'write'):
+            to.write(png)
+        else:
+            with io.open(to, 'wb') as output:
+                output.write(png)
+        return len(png)
+
+    def _element_region(self, element, png, region=None):
+        """
+        Internal method, the region of the page screenshot (png) an element is in, in screenshot pixels.  region is
+        a part of the element (like the region of an element screenshot) to narrow it down to.
+        """
+        try:
+            left, top, width, height, ratio = self.wd_instance.execute_script(Browser.ELEMENT_RECT_JS, element)
+        except WebDriverException:
+            # no javascript (a native app): the element's location is in the same units as the window size, which
+            # are points on iOS, so scale them by how much wider the screenshot is
+            if Image is None:
+                raise WebDriverException("Cropping a screenshot requires Pillow, install it with pip.")
+            location, size = element.location, element.size
+            left, top, width, height = location['x'], location['y'], size['width'], size['height']
+            ratio = Image.open(io.BytesIO(png)).size[0] / float(self.wd_instance.get_window_size()['width'])
+        left, top, width, height = left * ratio, top * ratio, width * ratio, height * ratio
+        if region is not None:
+            x, y = max(region[0], 0), max(region[1], 0)
+            left, top = left + x, top + y
+            width, height = max(min(region[2], width - x), 0), max(min(region[3], height - y), 0)
+        return left, top, width, height
+
     def screenshot_as_byte(self):
         """
-        Take a screenshot of the browser, and return it as a png byte array.
+        Take a screenshot of the browser, and return it as a png byte array.  To take a screenshot of one element,
+        or write it straight to a file, use :meth:`.screenshot`.
         :rtype: byte[]
         """
         return self.wd_instance.get_screenshot_as_png()
@@ -1264,11 +3654,181 @@ class Browser(object):
         if log:
             self.logger.debug("Refreshing browser page.")
         self.wd_instance.refresh()
+        WebElementLocator.page_changed(self.wd_instance)
+        return self
+
+    def get_session_state(self, log=True):
+        """
+        Capture the cookies, localStorage and sessionStorage of the current page's origin.  The result can be given
+        to :meth:`.set_session_state` (in this or another browser) to skip a login flow.
+
+        :param log: Whether or not to log
+        :type log: bool
+        :return: a json serializable dict of the session state
+        :rtype: dict
+        """
+        origin, local_storage, session_storage = PinnedScripts.execute(self.wd_instance, Browser.GET_STORAGE_JS)
+        state = {
+            'url': self.wd_instance.current_url,
+            'origin': origin,
+            'cookies': self.wd_instance.get_cookies(),
+            'local_storage': local_storage,
+            'session_storage': session_storage,
+            'saved': time.time()
+        }
+        if log:
+            self.logger.debug("Captured session state of %s: %s cookies, %s localStorage and %s sessionStorage items.",
+                              origin, len(state['cookies']), len(local_storage), len(session_storage))
+        return state
+
+    def set_session_state(self, state, url=None, log=True):
+        """
+        Apply session state captured by :meth:`.get_session_state`.  The browser navigates to the origin of the state
+        (if it isn't already there), sets the cookies and storage, then goes to url (default is the url the state was
+        captured from) so the page loads with the restored session.
+
+        :param state: the session state to apply
+        :type state: dict
+        :param url: the url to go to after applying the state
+        :type url: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: The reference to this Browser instance.
+        :rtype: :class:`.Browser`
+        """
+        if log:
+            self.logger.debug("Restoring session state of %s", state['origin'])
+        navigated = self.wd_instance.execute_script("return window.location.origin;") != state['origin']
+        if navigated:
+            self.wd_instance.get(state['origin'])
+            WebElementLocator.page_changed(self.wd_instance)
+        now = time.time()
+        for cookie in state['cookies']:
+            if 'expiry' in cookie and cookie['expiry'] < now:
+                continue
+            self.wd_instance.add_cookie(cookie)
+        (PinnedScripts.install if navigated else PinnedScripts.execute)(
+            self.wd_instance, Browser.SET_STORAGE_JS, state['local_storage'], state['session_storage'])
+        return self.go_to(url if url is not None else state['url'], log)
+
+    @classmethod
+    def session_state_file(cls, user, environment="default", directory=None):
+        """
+        The file used by :meth:`.save_session_state` and :meth:`.restore_session_state` for a user and environment.
+
+        :param directory: the directory to keep session state files in, default is a slickwd-session-state
+                          directory of the current user in the system temp directory
+        :type directory: str
+        :rtype: str
+        """
+        if directory is None:
+            directory = os.path.join(tempfile.gettempdir(), "slickwd-session-state-{}".format(
+                os.getuid() if hasattr(os, 'getuid') else getpass.getuser()))
+        key = hashlib.sha1("{}\n{}".format(user, environment).encode('utf-8')).hexdigest()
+        return os.path.join(directory, "{}.json".format(key))
+
+    def save_session_state(self, user, environment="default", directory=None, log=True):
+        """
+        Capture the session state (see :meth:`.get_session_state`) and save it to disk for a user and environment.
+        Call this after logging in, then later tests can call :meth:`.restore_session_state` instead of logging in.
+        The file contains session cookies, so it is only readable by the current user.
+
+        :param user: the user that is logged in
+        :type user: str
+        :param environment: the environment (or anything else that should keep sessions apart)
+        :type environment: str
+        :param directory: the directory to keep session state files in
+        :type directory: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: The reference to this Browser instance.
+        :rtype: :class:`.Browser`
+        """
+        state = self.get_session_state(log)
+        shared = directory is None
+        filename = Browser.session_state_file(user, environment, directory)
+        directory = os.path.dirname(filename)
+        try:
+            os.makedirs(directory, 0o700)
+        except OSError as e:
+            # another worker may have just made it
+            if e.errno != errno.EEXIST:
+                raise
+        if shared and hasattr(os, 'getuid') and os.stat(directory).st_uid != os.getuid():
+            raise WebDriverException("The session state directory {} belongs to another user".format(directory))
+        # write a new file (mkstemp makes it readable by the current user only) and move it over the old one, so
+        # other workers never read half a file and an existing file's permissions don't carry over
+        handle, temporary = tempfile.mkstemp(".tmp", "", directory)
+        try:
+            with os.fdopen(handle, 'w') as state_file:
+                json.dump(state, state_file)
+            if hasattr(os, 'replace'):
+                os.replace(temporary, filename)
+            else:
+                os.rename(temporary, filename)
+        except BaseException:
+            os.remove(temporary)
+            raise
+        if log:
+            self.logger.info("Saved session state for user %r in environment %r to %s", user, environment, filename)
         return self
 
+    def restore_session_state(self, user, environment="default", max_age=3600, url=None, directory=None, log=True):
+        """
+        Restore a session state saved by :meth:`.save_session_state`.  If there is no saved state for the user and
+        environment, or it is older than max_age, nothing is done and False is returned so the test can log in the
+        normal way (and save the state afterwards)::
+
+            if not browser.restore_session_state("admin", "staging", url=START_URL):
+                login_as_admin(browser)
+                browser.save_session_state("admin", "staging")
+
+        :param user: the user that was logged in
+        :type user: str
+        :param environment: the environment the state was saved for
+        :type environment: str
+        :param max_age: the maximum age (in seconds) of a saved state that will be used, None for no limit
+        :type max_age: int or float
+        :param url: the url to go to after restoring, default is the url the state was saved from
+        :type url: str
+        :param directory: the directory to keep session state files in
+        :type directory: str
+        :param log: Whether or not to log
+        :type log: bool
+        :return: True if the session state was restored
+        :rtype: bool
+        """
+        filename = Browser.session_state_file(user, environment, directory)
+        try:
+            with io.open(filename, 'r', encoding='utf-8') as state_file:
+                state = json.load(state_file)
+        except (IOError, ValueError):
+            if log:
+                self.logger.debug("No saved session state for user %r in environment %r", user, environment)
+            return False
+        if max_age is not None and time.time() - state['saved'] > max_age:
+            if log:
+                self.logger.debug("Saved session state for user %r in environment %r is too old", user, environment)
+            return False
+        self.set_session_state(state, url, log)
+        return True
+
+    def gesture(self):
+        """
+        Start building a touch gesture (for mobile).  Taps, long presses, swipes and pinches are added to the gesture
+        and sent to the device as a single W3C actions command when :meth:`.Gesture.perform` is called, instead of a
+        round trip for each one::
+
+            browser.gesture().tap(Page.Menu_Button).swipe((500, 1500), (500, 300)).tap((200, 400)).perform()
+
+        :rtype: :class:`.Gesture`
+        """
+        return Gesture(self)
+
     def tap(self, positions, log=True):
         """
-        Tap (for mobile browsers) on each of the positions passed in
+        Tap (for mobile browsers) on each of the positions passed in.  To combine taps with swipes, long presses or
+        pinches in one command, use :meth:`.gesture`.
         :param positions: A list of x, y coordinate tuples to tap.  If you want more than one coordinate, group each
                           coordinate in a tuple of their own.  Example: [(100, 200), (300, 400)].
         :type positions: [(int, int)]
@@ -1276,85 +3836,2349 @@ class Browser(object):
         :rtype: :class:`.Browser`
         """
         if log:
-            self.logger.debug("Performing a mobile tap at positions: {}".format(repr(positions)))
+            self.logger.debug("Performing a mobile tap at positions: %r", positions)
         self.wd_instance.tap(positions)
         return self
 
-    def android_scroll_to_element(self, element_text, log=True):
+    def _android_list(self, snapshot, scrollable):
         """
-        Scroll to element with element_text in the text property
-        :param element_text:
-        :return:
+        Internal method, the list to swipe in, from a snapshot: the scrollable locator, or the first scrollable
+        element (the whole screen if there isn't one).  Returns the (x, y, width, height) of the list and a UiSelector
+        for it (used to scroll sessions that can't send W3C gestures).
+        """
+        if scrollable is not None:
+            element = scrollable.find_element_matching(snapshot.wd_instance, 0, False)
+            if element is None:
+                raise WebDriverException("Unable to find the list {} to scroll".format(scrollable.describe()))
+            resource_id = element.get_attribute('resource-id')
+            selector = 'new UiSelector().resourceId({})'.format(_uiselector_literal(resource_id)) if resource_id \
+                else 'new UiSelector().scrollable(true).instance(0)'
+            return (element.location['x'], element.location['y'], element.size['width'], element.size['height']), \
+                selector
+        root = snapshot.wd_instance.root
+        nodes = root.xpath("//*[@scrollable='true']") or list(root)
+        if not nodes:
+            raise WebDriverException("There is nothing on the screen to scroll")
+        return AppiumSourceDriver.node_rect(nodes[0]), 'new UiSelector().scrollable(true).instance(0)'
+
+    def _android_swipe_list(self, rect, selector, direction):
+        """
+        Internal method, swipe a list (from :meth:`._android_list`) most of a page in direction ("down" moves further
+        down the list).  Json wire protocol sessions can't send W3C gestures, so they scroll with UiScrollable.
+        """
+        if not getattr(self.wd_instance, 'w3c', False):
+            # the scroll happens while the selector is evaluated, there is never an element to find
+            self.wd_instance.find_elements_by_android_uiautomator('new UiScrollable({}).{}()'.format(
+                selector, 'scrollForward' if direction == 'down' else 'scrollBackward'))
+            return
+        x, y, width, height = rect
+        top, bottom = (x + width // 2, y + height // 5), (x + width // 2, y + height * 4 // 5)
+        self.gesture().swipe(bottom if direction == 'down' else top, top if direction == 'down' else bottom,
+                             duration=0.4).perform()
+
+    @_budgeted
+    def android_scroll_to_element(self, element_text, log=True, scrollable=None, max_swipes=30):
+        """
+        Scroll an android list until an element is on the screen, and return it.  Each swipe is checked against a
+        :meth:`.snapshot` of the screen instead of asking the device about every locator, and scrolling starts from
+        where the list is now (UiScrollable.scrollIntoView goes back to the top first).  The direction the last
+        element was found in is remembered for each list, so checking the items of a long list in order keeps going
+        the same way.  When the list stops moving the direction is reversed, once.
+
+        Json wire protocol sessions can't send W3C gestures: finding an element by text in the first scrollable list
+        uses UiScrollable.scrollIntoView as before, anything else is scrolled with UiScrollable a page at a time.
+
+        To collect many items of a list in one pass, use :meth:`.android_scroll_collect`.
+
+        :param element_text: The text of the element to scroll to, or a locator for it
+        :type element_text: str or :class:`.WebElementLocator`
+        :param log: Whether or not to log
+        :type log: bool
+        :param scrollable: The list to scroll, default is the first scrollable element on the screen
+        :type scrollable: :class:`.WebElementLocator`
+        :param max_swipes: The most swipes to make before giving up
+        :type max_swipes: int
+        :return: the raw webdriver element
+        """
+        if not isinstance(element_text, WebElementLocator):
+            if scrollable is None and not getattr(self.wd_instance, 'w3c', False):
+                if log:
+                    self.logger.debug("Scrolling to element with text property: %s", element_text)
+                return self.wd_instance.find_element_by_android_uiautomator(
+                    'new UiScrollable(new UiSelector().scrollable(true).instance(0)).scrollIntoView('
+                    'new UiSelector().text({}).instance(0))'.format(_uiselector_literal(element_text)))
+            element = WebElementLocator("text {}".format(element_text),
+                                        Find(By.XPATH, "//*[@text={}]".format(_xpath_literal(element_text))))
+        else:
+            element = element_text
+        if log:
+            self.logger.debug("Scrolling to element %s", element.describe())
+        key = scrollable.describe() if scrollable is not None else None
+        direction = self._scroll_directions.get(key, 'down')
+        reversed_once = False
+        previous = None
+        rect = selector = None
+        for swipe in range(max_swipes + 1):
+            self._budget_timeout(0, "android_scroll_to_element", element)
+            snapshot = self.snapshot(log=False)
+            if snapshot.exists(element, timeout=0, log=False):
+                self._scroll_directions[key] = direction
+                if log:
+                    self.logger.info("Found element %s after %s swipes.", element.describe(), swipe)
+                timeout = self._budget_timeout(None, "android_scroll_to_element", element)
+                found = element.find_element_matching(self.wd_instance, timeout, False, self.angular_mode)
+                if found is None:
+                    self._budget_ran_out()
+                    raise WebDriverException("Element {} was on the screen, but the device couldn't find it after "
+                                             "waiting for {:.2f} seconds.".format(element.describe(), float(timeout)))
+                return found
+            source = snapshot.wd_instance.page_source
+            if source == previous:
+                if reversed_once:
+                    break
+                direction, reversed_once = ('up' if direction == 'down' else 'down'), True
+            previous = source
+            if rect is None:
+                rect, selector = self._android_list(snapshot, scrollable)
+            self._android_swipe_list(rect, selector, direction)
+        raise WebDriverException("Unable to find element {} after scrolling the list.".format(element.describe()))
+
+    @_budgeted
+    def android_scroll_collect(self, locator, predicate=None, key=None, scrollable=None, max_swipes=50, log=True):
+        """
+        Scroll down an android list once, from where it is now to the end, collecting every item matching locator::
+
+            names = browser.android_scroll_collect(ContactsScreen.Contact_Name,
+                                                   predicate=lambda element: element.text.startswith("A"))
+
+        Each screen is checked with a :meth:`.snapshot`, so the elements passed to predicate and key are page source
+        elements (:class:`.AppiumSourceElement`) that can be read but not acted on.  The items at the top of a screen
+        that were at the bottom of the screen before the swipe are only collected once, items with the same value
+        elsewhere in the list are all collected.
+
+        :param locator: The items to collect
+        :type locator: :class:`.WebElementLocator`
+        :param predicate: called with each item, return False to leave it out (default is to keep every item)
+        :param key: called with each item, the value to collect (default is its text)
+        :param scrollable: The list to scroll, default is the first scrollable element on the screen
+        :type scrollable: :class:`.WebElementLocator`
+        :param max_swipes: The most swipes to make before stopping
+        :type max_swipes: int
+        :param log: Whether or not to log
+        :type log: bool
+        :return: the collected values, in the order they are in the list
+        :rtype: list
         """
+        if key is None:
+            def key(element):
+                return element.text
+        if log:
+            self.logger.debug("Scrolling down the list collecting elements %s", locator.describe())
+        collected = []
+        last_screen = []
+        previous = None
+        rect = selector = None
+        for swipe in range(max_swipes + 1):
+            self._budget_timeout(0, "android_scroll_collect", locator)
+            snapshot = self.snapshot(log=False)
+            screen = [(key(element), predicate is None or predicate(element))
+                      for element in locator.find_all_elements_matching(snapshot.wd_instance, 0, False)]
+            # the longest run at the end of the last screen that starts this one is still on the screen
+            overlap = 0
+            for length in range(min(len(last_screen), len(screen)), 0, -1):
+                if last_screen[-length:] == screen[:length]:
+                    overlap = length
+                    break
+            collected.extend([value for value, keep in screen[overlap:] if keep])
+            last_screen = screen
+            source = snapshot.wd_instance.page_source
+            if source == previous:
+                break
+            previous = source
+            if rect is None:
+                rect, selector = self._android_list(snapshot, scrollable)
+            self._android_swipe_list(rect, selector, 'down')
+        self._scroll_directions[scrollable.describe() if scrollable is not None else None] = 'down'
         if log:
-            self.logger.debug("Scrolling to element with text property: {}".format(element_text))
-        self.wd_instance.find_element_by_android_uiautomator('new UiScrollable(new UiSelector().scrollable(true).instance(0)).scrollIntoView(new UiSelector().text("{}").instance(0))'.format(element_text))
+            self.logger.info("Collected %s elements %s after %s swipes.", len(collected), locator.describe(), swipe)
+        return collected
 
 
-class Container(object):
+class Gesture(object):
     """
-    A generic container for structuring multiple *WebElementLocator* into groupings that help programmers find the right
-    shared definition.
+    A sequence of touch actions sent to a mobile device in one W3C actions command.  Get one from
+    :meth:`.Browser.gesture`.
+
+    Each target can be a (x, y) tuple of screen coordinates, or a :class:`.WebElementLocator`.  For a locator the
+    element is found when the action is added, and the device works out the coordinates (the center of the element
+    plus the offset) when the gesture is performed, so no extra round trip is needed to get the element's location.
+    Durations are in seconds.
     """
 
-    @property
-    def browser(self):
+    ELEMENT_KEY = "element-6066-11e4-a52e-4f735466cecf"
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.fingers = [[], []]
+
+    def _move(self, target, offset=(0, 0), duration=0.0):
+        move = {'type': 'pointerMove', 'duration': int(duration * 1000)}
+        if isinstance(target, WebElementLocator):
+            timeout = self.browser._budget_timeout(None, "gesture", target)
+            element = target.find_element_matching(self.browser.wd_instance, timeout, True, self.browser.angular_mode)
+            if element is None:
+                self.browser._budget_ran_out()
+                raise WebDriverException("Unable to find element {} after waiting for {:.2f} seconds".format(
+                    target.describe(), float(timeout)))
+            move.update({'origin': {Gesture.ELEMENT_KEY: element.id}, 'x': int(offset[0]), 'y': int(offset[1])})
+        else:
+            move.update({'origin': 'viewport', 'x': int(target[0] + offset[0]), 'y': int(target[1] + offset[1])})
+        return move
+
+    def _add(self, *finger_actions):
         """
-        The slickwd Browser instance.
-        :return: The Browser instance of itself or it's parent.
-        :rtype: Browser
+        Add actions for one or more fingers, starting after everything already in the gesture and at the same time
+        as each other.  Fingers that aren't used pause.
         """
-        if hasattr(self, '_browser'):
-            return self._browser
-        elif hasattr(self, 'parent') and self.parent is not None:
-            return self.parent.browser
-        else:
-            return None
+        length = max([len(actions) for actions in self.fingers])
+        for actions in self.fingers:
+            actions.extend([{'type': 'pause', 'duration': 0}] * (length - len(actions)))
+        for finger, actions in enumerate(finger_actions):
+            self.fingers[finger].extend(actions)
+        return self
 
-    @browser.setter
-    def browser(self, new_instance):
+    def tap(self, target, offset=(0, 0)):
         """
-        Set the browser instance
-        :param new_instance: the new instance of browser to set
-        :type new_instance: :class:`.Browser`
+        Tap once on target.
+
+        :rtype: :class:`.Gesture`
         """
-        self._browser = new_instance
+        return self._add([self._move(target, offset), {'type': 'pointerDown', 'button': 0},
+                          {'type': 'pause', 'duration': 50}, {'type': 'pointerUp', 'button': 0}])
 
-    def get_name(self):
+    def long_press(self, target, duration=1.0, offset=(0, 0)):
         """
-        Get the full name of this page.  If using nested :doc:`page-classes` this will get the full *dotted* name
-        of the page class.
+        Press on target and hold for duration seconds.
 
-        :return: A string containing the best guess at the page class name.
+        :rtype: :class:`.Gesture`
         """
-        if hasattr(self, "parent") and hasattr(self, "container_name") and self.parent is not None:
-            return "{}.{}".format(self.parent.get_name(), self.container_name)
-        elif hasattr(self, "container_name"):
-            return self.container_name
-        else:
-            name = self.__class__.__name__
-            if name.endswith("Page"):
-                name = name[:-4]
-            return name
+        return self._add([self._move(target, offset), {'type': 'pointerDown', 'button': 0},
+                          {'type': 'pause', 'duration': int(duration * 1000)}, {'type': 'pointerUp', 'button': 0}])
 
-    def is_current_page(self, browser):
+    def swipe(self, start, end, duration=0.5, start_offset=(0, 0), end_offset=(0, 0)):
         """
-        You should override this method in a subclass of Container.  This method is used to see if what is in the
-        browser currently matches one or more elements of this class.  This method should be quick (timeout 0 for all
-        your calls).  It may get called a lot, so you may want to turn off logging for any browser methods called
-        (log=False parameter).
+        Press on start, move to end over duration seconds, and let go.
 
-        :param browser: A :class:`.Browser` instance to use in detecting if this is the current page.
-        :return: True if the current page matches what is in the browser, False otherwise.
+        :rtype: :class:`.Gesture`
         """
-        raise NotImplementedError("is_current_page was not implemented on class: {}".format(self.__class__.__name__))
+        return self._add([self._move(start, start_offset), {'type': 'pointerDown', 'button': 0},
+                          self._move(end, end_offset, duration), {'type': 'pointerUp', 'button': 0}])
 
-    def __setattr__(self, key, value):
-        # this magic is for naming and setting of parent -> child relationships
-        if key != "parent":
-            if isinstance(value, Container):
-                value.parent = self
-                value.container_name = key
-            if isinstance(value, WebElementLocator):
-                value.parent = self
-        return super(Container, self).__setattr__(key, value)
+    def pinch(self, center, start_distance, end_distance, duration=0.5):
+        """
+        Two fingers, centered on center, start start_distance pixels apart (horizontally) and move until they are
+        end_distance apart.  Use a smaller end_distance to pinch (zoom out), a bigger one to spread (zoom in).
+
+        :rtype: :class:`.Gesture`
+        """
+        fingers = []
+        for direction in (-1, 1):
+            fingers.append([self._move(center, (direction * start_distance / 2, 0)),
+                            {'type': 'pointerDown', 'button': 0},
+                            self._move(center, (direction * end_distance / 2, 0), duration),
+                            {'type': 'pointerUp', 'button': 0}])
+        return self._add(*fingers)
+
+    def pause(self, duration):
+        """
+        Wait duration seconds before the next action.
+
+        :rtype: :class:`.Gesture`
+        """
+        return self._add([{'type': 'pause', 'duration': int(duration * 1000)}])
+
+    def get_actions(self):
+        """
+        The W3C actions payload for this gesture (only fingers that do something are included).
+
+        :rtype: list of dict
+        """
+        return [{'type': 'pointer', 'id': "finger{}".format(finger + 1), 'parameters': {'pointerType': 'touch'},
+                 'actions': actions}
+                for finger, actions in enumerate(self.fingers)
+                if any([action['type'] != 'pause' for action in actions])]
+
+    def perform(self, log=True):
+        """
+        Send the whole gesture to the device in one command.
+
+        :return: The reference to the Browser instance.
+        :rtype: :class:`.Browser`
+        """
+        if not getattr(self.browser.wd_instance, 'w3c', False):
+            raise WebDriverException("Gestures need a W3C session, this session uses the older json wire protocol.")
+        actions = self.get_actions()
+        if log:
+            self.browser.logger.debug("Performing a gesture of %s actions",
+                                      sum([len(source['actions']) for source in actions]))
+        self.browser.wd_instance.execute(Command.W3C_ACTIONS, {'actions': actions})
+        return self.browser
+
+
+class DebugLog(logging.Handler):
+    """
+    A bounded in-memory buffer of a browser's log records (every level, including DEBUG), for running with quiet logs
+    but still having the details when something fails.  Records are kept as they are, the messages aren't formatted
+    until the buffer is dumped, and only the newest *capacity* records are kept.  Use
+    :meth:`.Browser.enable_debug_log` rather than creating one yourself.
+
+    While a DebugLog is attached, its browser (and the locators looking in that browser) log to loggers of their own,
+    which keep every record here and only pass the records the slickwd loggers would have logged (WARNING and up by
+    default) on to your handlers.  The levels of the slickwd loggers aren't changed, so other browsers (the rest of a
+    :class:`.BrowserGroup` for example) log as usual, or to their own DebugLog.  A DebugLog without a browser is a
+    plain handler on the slickwd logger, it keeps what slickwd logs at the level it is set to.
+    """
+
+    drivers = weakref.WeakKeyDictionary()
+    """The attached DebugLog of each driver, used by :class:`.WebElementLocator` to pick its logger"""
+
+    _lock = threading.Lock()
+
+    class _Forward(logging.Handler):
+        """Pass the records a slickwd logger would have logged anyway on to that logger's handlers."""
+
+        def __init__(self, target):
+            logging.Handler.__init__(self)
+            self.target = target
+
+        def handle(self, record):
+            if self.target.isEnabledFor(record.levelno):
+                self.target.handle(record)
+            return True
+
+    def __init__(self, capacity=10000, directory=".", browser=None):
+        """
+        :param capacity: the most records to keep, older ones are dropped
+        :type capacity: int
+        :param directory: where :meth:`.dump` writes files
+        :type directory: str
+        :param browser: keep the records of this browser, default is to keep what the slickwd logger logs
+        :type browser: :class:`.Browser`
+        """
+        logging.Handler.__init__(self, logging.DEBUG)
+        self.records = deque(maxlen=capacity)
+        self.directory = directory
+        self.browser = browser
+        self.attached = False
+        self.loggers = {}
+        self.dumped = []
+        """The files written by :meth:`.dump`"""
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def clear(self):
+        self.records.clear()
+
+    def get_logger(self, name):
+        """
+        The logger that keeps the records of the slickwd logger called *name* here.  It isn't registered with
+        :mod:`logging`, so it goes away with this DebugLog.
+
+        :param name: the name of a slickwd logger, like "slickwd.Browser"
+        :type name: str
+        :rtype: :class:`logging.Logger`
+        """
+        logger = self.loggers.get(name)
+        if logger is None:
+            logger = logging.Logger(name, logging.DEBUG)
+            logger.propagate = False
+            logger.addHandler(self)
+            logger.addHandler(DebugLog._Forward(logging.getLogger(name)))
+            logger = self.loggers.setdefault(name, logger)
+        return logger
+
+    def add_browser(self, browser):
+        """
+        Keep the records of browser (a browser like the :meth:`.Browser.snapshot` one, working for this DebugLog's
+        browser) here too, if this DebugLog is attached.
+        """
+        if self.attached:
+            browser.logger = self.get_logger("slickwd.Browser")
+            DebugLog.drivers[browser.wd_instance] = self
+
+    def attach(self):
+        """
+        Start keeping log records.
+
+        :rtype: :class:`.DebugLog`
+        """
+        with DebugLog._lock:
+            if self.attached:
+                return self
+            self.attached = True
+            if self.browser is None:
+                logging.getLogger("slickwd").addHandler(self)
+                return self
+            for browser in (self.browser, self.browser._snapshot_browser):
+                if browser is not None:
+                    self.add_browser(browser)
+        return self
+
+    def detach(self):
+        """
+        Stop keeping log records, the browser logs to the usual slickwd loggers again.
+        """
+        with DebugLog._lock:
+            if not self.attached:
+                return
+            self.attached = False
+            if self.browser is None:
+                logging.getLogger("slickwd").removeHandler(self)
+                return
+            for browser in (self.browser, self.browser._snapshot_browser):
+                if browser is not None:
+                    browser.logger = logging.getLogger("slickwd.Browser")
+                    if DebugLog.drivers.get(browser.wd_instance) is self:
+                        del DebugLog.drivers[browser.wd_instance]
+
+    def dump(self, reason=None):
+        """
+        Write the buffered records to a new file in the directory, one json object per line (time, level, logger,
+        thread, message and exception), oldest first, and empty the buffer.
+
+        :param reason: what failed, used in the file name
+        :type reason: str
+        :return: the file written, or None if there weren't any records
+        :rtype: str
+        """
+        records = list(self.records)
+        self.records.clear()
+        if not records:
+            return None
+        name = "slickwd-debug-{}-{}".format(time.strftime("%Y%m%d-%H%M%S"), os.getpid())
+        if reason:
+            name += "-" + re.sub(r'[^A-Za-z0-9_.-]+', '_', reason)[-80:]
+        filename = os.path.join(self.directory, name + ".jsonl")
+        with io.open(filename, 'w', encoding='utf-8') as output:
+            for record in records:
+                entry = {'time': round(record.created, 3), 'level': record.levelname, 'logger': record.name,
+                         'thread': record.threadName, 'message': record.getMessage()}
+                if record.exc_info:
+                    entry['exception'] = "".join(traceback.format_exception(*record.exc_info))
+                output.write(u"{}\n".format(json.dumps(entry, sort_keys=True)))
+        self.dumped.append(filename)
+        return filename
+
+
+class WarmStandby(object):
+    """
+    Keeps spare browsers started in the background, so that creating a :class:`.Browser` doesn't have to wait for
+    the driver and browser to launch.  While one test runs, the browser for the next test is already starting::
+
+        standby = WarmStandby(spares=1).install()
+        browser = Browser(BrowserType.CHROME)    # the first one starts as usual, a spare starts behind it
+        browser.quit()
+        browser = Browser(BrowserType.CHROME)    # handed out right away
+        standby.shutdown()
+
+    Spares are kept for each browser type (local browsers) or set of desired capabilities and remote_url.  A kind of
+    browser is kept once it has been asked for, or ahead of time with :meth:`.keep`.  A spare that has been waiting
+    longer than max_idle seconds (a grid might have timed the session out) or that doesn't answer when it is handed
+    out is quit and replaced.  Browsers created with a custom command_executor never use spares.  The spares left
+    when the process exits are quit, if :meth:`.shutdown` wasn't called before.
+    """
+
+    # standbys that haven't been shut down, only weakly referenced so an abandoned standby can still be collected
+    _running = weakref.WeakSet()
+
+    def __init__(self, spares=1, max_idle=120, max_workers=None):
+        """
+        :param spares: how many started browsers to keep waiting for each kind of browser
+        :type spares: int
+        :param max_idle: seconds a spare can wait before it is quit and replaced, None to keep them forever
+        :type max_idle: int or float
+        :param max_workers: the most browsers to start at the same time, default is spares
+        :type max_workers: int
+        """
+        self.spares = spares
+        self.max_idle = max_idle
+        self.logger = logging.getLogger("slickwd.WarmStandby")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or max(spares, 1))
+        self.stats = {'taken': 0, 'missed': 0, 'started': 0, 'failed': 0, 'discarded': 0}
+        """counts of spares handed out, requests there was no spare for, spares started, failed to start and quit"""
+        self._lock = threading.Lock()
+        self._kinds = {}
+        self._ready = {}
+        self._starting = {}
+        self._stopped = False
+        WarmStandby._running.add(self)
+
+    @classmethod
+    def _key(cls, browser_type, remote_url):
+        if remote_url is None:
+            return browser_type.name, None
+        return json.dumps(browser_type, sort_keys=True, default=str), remote_url
+
+    def install(self):
+        """
+        Make every new :class:`.Browser` take its driver from this standby.
+
+        :rtype: :class:`.WarmStandby`
+        """
+        Browser.standby = self
+        return self
+
+    def keep(self, browser_type, remote_url=None):
+        """
+        Start keeping spares of a kind of browser, before the first one is asked for.  The parameters are the same as
+        :class:`.Browser`.
+
+        :rtype: :class:`.WarmStandby`
+        """
+        if isinstance(browser_type, str):
+            browser_type = BrowserType[browser_type.upper()]
+        if remote_url is not None and isinstance(browser_type, BrowserType):
+            browser_type = browser_type.value[0]
+        with self._lock:
+            self._kinds.setdefault(WarmStandby._key(browser_type, remote_url), (browser_type, remote_url))
+        self._refill()
+        return self
+
+    def take(self, browser_type, remote_url=None):
+        """
+        Hand out a started driver for a kind of browser (the driver, not a Browser, :class:`.Browser` calls this for
+        you), and start another one to replace it.
+
+        :return: a started webdriver, or None if there isn't a spare ready
+        """
+        key = WarmStandby._key(browser_type, remote_url)
+        wd_instance = None
+        while True:
+            with self._lock:
+                self._kinds.setdefault(key, (browser_type, remote_url))
+                ready = self._ready.get(key, [])
+                spare = ready.pop(0) if ready else None
+            if spare is None:
+                break
+            if self._usable(spare):
+                wd_instance = spare[0]
+                break
+            self._discard(spare[0])
+        with self._lock:
+            self.stats['taken' if wd_instance is not None else 'missed'] += 1
+        self._refill()
+        return wd_instance
+
+    def _usable(self, spare):
+        wd_instance, started = spare
+        if self.max_idle is not None and time.time() - started > self.max_idle:
+            return False
+        try:
+            if isinstance(wd_instance, appium.webdriver.Remote):
+                wd_instance.current_context
+            else:
+                wd_instance.current_window_handle
+            return True
+        except Exception:
+            return False
+
+    def _discard(self, wd_instance):
+        with self._lock:
+            self.stats['discarded'] += 1
+        try:
+            wd_instance.quit()
+        except Exception:
+            pass
+
+    def _refill(self):
+        """Start enough browsers in the background to bring every kind of browser back up to its spares."""
+        with self._lock:
+            if self._stopped:
+                return
+            needed = []
+            for key, kind in self._kinds.items():
+                missing = self.spares - len(self._ready.get(key, [])) - self._starting.get(key, 0)
+                self._starting[key] = self._starting.get(key, 0) + max(missing, 0)
+                needed.extend([(key, kind)] * missing)
+        for key, kind in needed:
+            self.executor.submit(self._start, key, kind)
+
+    def _start(self, key, kind):
+        wd_instance = None
+        try:
+            if not self._stopped:
+                wd_instance = Browser._start_driver(kind[0], kind[1])
+        except Exception as e:
+            self.logger.warning("Unable to start a spare browser %s: %s", key[0], e)
+            with self._lock:
+                self.stats['failed'] += 1
+        with self._lock:
+            self._starting[key] -= 1
+            if wd_instance is not None:
+                self.stats['started'] += 1
+            keep = wd_instance is not None and not self._stopped
+            if keep:
+                self._ready.setdefault(key, []).append((wd_instance, time.time()))
+        if wd_instance is not None and not keep:
+            self._discard(wd_instance)
+
+    def expire(self):
+        """
+        Quit spares that have been waiting longer than max_idle, and start replacements.  Spares are also checked
+        when they are handed out, call this to keep a grid from holding on to idle sessions.
+        """
+        with self._lock:
+            expired = []
+            for key, ready in self._ready.items():
+                expired.extend([spare for spare in ready if self.max_idle is not None and
+                                time.time() - spare[1] > self.max_idle])
+                ready[:] = [spare for spare in ready if spare not in expired]
+        for wd_instance, started in expired:
+            self._discard(wd_instance)
+        self._refill()
+
+    def shutdown(self):
+        """
+        Stop starting browsers, quit every spare, and stop new Browsers from using this standby.  This is called
+        when the process exits, calling it again does nothing.
+        """
+        WarmStandby._running.discard(self)
+        with self._lock:
+            self._stopped = True
+        self.executor.shutdown(wait=True)
+        with self._lock:
+            spares = [spare for ready in self._ready.values() for spare in ready]
+            self._ready.clear()
+        for wd_instance, started in spares:
+            self._discard(wd_instance)
+        if Browser.standby is self:
+            Browser.standby = None
+
+    @classmethod
+    def _shutdown_all(cls):
+        """Internal method, shut down the standbys still running when the process exits."""
+        for standby in list(cls._running):
+            standby.shutdown()
+
+
+# idle spares would otherwise be left running (and holding grid sessions) when the process exits
+atexit.register(WarmStandby._shutdown_all)
+
+
+class ScreenshotDiff(object):
+    """
+    The result of comparing a screenshot to its baseline, from :class:`.VisualComparison`.
+    """
+
+    def __init__(self, name, different_pixels, total_pixels, max_difference, passed, size_mismatch=False,
+                 diff_mask=None):
+        self.name = name
+        """The name of the baseline (usually the page name)"""
+        self.different_pixels = different_pixels
+        """How many pixels (not counting masked ones) differ by more than the tolerance"""
+        self.total_pixels = total_pixels
+        """How many pixels were compared (not counting masked ones)"""
+        self.max_difference = max_difference
+        """The biggest difference found, between 0.0 and 1.0"""
+        self.passed = passed
+        """True if the screenshot matches the baseline closely enough"""
+        self.size_mismatch = size_mismatch
+        """True if the screenshot and baseline aren't the same size (they are not compared)"""
+        self.diff_mask = diff_mask
+        """A numpy array of booleans, True for each pixel that differs (None if the sizes didn't match)"""
+
+    @property
+    def ratio(self):
+        """The fraction of the compared pixels that differ."""
+        return float(self.different_pixels) / self.total_pixels if self.total_pixels else 0.0
+
+    def __repr__(self):
+        if self.size_mismatch:
+            return "ScreenshotDiff({}: size mismatch)".format(self.name)
+        return "ScreenshotDiff({}: {} of {} pixels differ, max difference {:.3f}, {})".format(
+            self.name, self.different_pixels, self.total_pixels, self.max_difference,
+            "passed" if self.passed else "failed")
+
+
+_pool_baselines = {}
+"""The baselines decoded by a process pool worker of :class:`.VisualComparison`, by (file name, modification time)"""
+
+
+def _compare_images(name, actual, baseline, mask, tolerance, max_diff_ratio, perceptual):
+    """
+    Compare two screenshots (png bytes, a file name or an RGB numpy array), this is a module function so that
+    :class:`.VisualComparison` can run it in a process pool.  A baseline given as a file name is only decoded once
+    by each process.
+    """
+    actual = VisualComparison.decode(actual)
+    if isinstance(baseline, _string_types):
+        key = (baseline, os.path.getmtime(baseline))
+        if key not in _pool_baselines:
+            _pool_baselines[key] = VisualComparison.decode(baseline)
+        baseline = _pool_baselines[key]
+    else:
+        baseline = VisualComparison.decode(baseline)
+    if actual.shape != baseline.shape:
+        return ScreenshotDiff(name, actual.shape[0] * actual.shape[1], actual.shape[0] * actual.shape[1], 1.0, False,
+                              size_mismatch=True)
+    actual = actual.astype(numpy.float32)
+    baseline = baseline.astype(numpy.float32)
+    if perceptual:
+        # the YIQ color space difference used by pixelmatch, it weighs brightness the way people see it
+        delta = actual - baseline
+        y = delta.dot(numpy.array([0.29889531, 0.58662247, 0.11448223], dtype=numpy.float32))
+        i = delta.dot(numpy.array([0.59597799, -0.27417610, -0.32180189], dtype=numpy.float32))
+        q = delta.dot(numpy.array([0.21147017, -0.52261711, 0.31114694], dtype=numpy.float32))
+        difference = (0.5053 * y * y + 0.299 * i * i + 0.1957 * q * q) / 35215.0
+    else:
+        difference = numpy.abs(actual - baseline).max(axis=2) / 255.0
+    if mask is not None:
+        difference[mask] = 0.0
+    different = difference > tolerance
+    total = difference.size - (int(numpy.count_nonzero(mask)) if mask is not None else 0)
+    different_pixels = int(numpy.count_nonzero(different))
+    passed = different_pixels <= max_diff_ratio * total
+    return ScreenshotDiff(name, different_pixels, total, float(difference.max()) if difference.size else 0.0, passed,
+                          diff_mask=different)
+
+
+class VisualComparison(object):
+    """
+    Compares screenshots against baseline images, to catch visual regressions.  Images are decoded into numpy arrays
+    and compared all at once (requires numpy and Pillow, ``pip install slick-webdriver[visual]``)::
+
+        visual = VisualComparison("baselines", tolerance=0.02, max_diff_ratio=0.001)
+        browser.wait_for_page(Google.Home)
+        result = visual.check(browser, ignore=[Google.Home.Doodle])
+        assert result.passed, result
+
+    Baselines are png files named after the page (the page class name from :meth:`.Browser.wait_for_page`, or the
+    name you give) in the baseline directory.  If a baseline doesn't exist yet the screenshot becomes the baseline.
+    Baselines are decoded once and cached.
+
+    The difference between two pixels is between 0.0 and 1.0: the biggest difference of the red, green and blue
+    values, or with perceptual=True a difference weighted the way people see color (so small shifts in anti-aliasing
+    matter less than a change in brightness).  Pixels that differ by more than tolerance count as different, and
+    the check passes if no more than max_diff_ratio of the pixels are different.  Parts of the page that change on
+    their own (ads, clocks) can be left out by passing the locators to ignore.
+
+    To compare many screenshots at once use :meth:`.compare_many`, which uses a process pool if processes is given.
+    """
+
+    def __init__(self, baseline_dir, tolerance=0.0, max_diff_ratio=0.0, perceptual=False, processes=None):
+        """
+        :param baseline_dir: the directory baselines are kept in
+        :type baseline_dir: str
+        :param tolerance: how different (0.0 to 1.0) a pixel can be before it counts as different
+        :type tolerance: float
+        :param max_diff_ratio: the fraction of pixels that can be different for a check to pass
+        :type max_diff_ratio: float
+        :param perceptual: compare perceived color differences instead of the raw red, green and blue values
+        :type perceptual: bool
+        :param processes: the number of processes :meth:`.compare_many` uses, None to compare in this process
+        :type processes: int
+        """
+        if numpy is None or Image is None:
+            raise WebDriverException("Visual comparison requires numpy and Pillow, install them with pip.")
+        self.baseline_dir = baseline_dir
+        self.tolerance = tolerance
+        self.max_diff_ratio = max_diff_ratio
+        self.perceptual = perceptual
+        self.processes = processes
+        self.logger = logging.getLogger("slickwd.VisualComparison")
+        self._baselines = {}
+        self._pool = None
+
+    @classmethod
+    def decode(cls, image):
+        """
+        Decode a png into an array of RGB values (height x width x 3).
+
+        :param image: png bytes, a file name, a file like object, or an already decoded array
+        :return: the image as a numpy array of uint8
+        """
+        if numpy is not None and isinstance(image, numpy.ndarray):
+            return image
+        if isinstance(image, bytes):
+            image = io.BytesIO(image)
+        decoded = Image.open(image)
+        return numpy.asarray(decoded.convert('RGB') if decoded.mode != 'RGB' else decoded)
+
+    @classmethod
+    def scale(cls, browser, width):
+        """
+        How many screenshot pixels there are per css pixel (or per point on iOS): the screenshot width divided by
+        the width of the window's viewport.  This is the device pixel ratio on a high density display.
+
+        :param browser: the browser the screenshot is of
+        :type browser: :class:`.Browser`
+        :param width: the width of the screenshot
+        :type width: int
+        :rtype: float
+        """
+        try:
+            viewport = browser.wd_instance.execute_script("return window.innerWidth;")
+        except WebDriverException:
+            # a native app has no javascript, its window size is in the units element locations are in
+            viewport = browser.wd_instance.get_window_size()['width']
+        return float(width) / viewport if viewport else 1.0
+
+    @classmethod
+    def mask(cls, browser, locators, shape, scale=None):
+        """
+        Make a mask (True means ignore) covering every element found by the locators.  The bounding boxes come from
+        webdriver in css pixels, they are multiplied by scale to get screenshot pixels.
+
+        :param browser: the browser the elements are in
+        :type browser: :class:`.Browser`
+        :param locators: the elements to cover
+        :type locators: list of :class:`.WebElementLocator`
+        :param shape: the (height, width) of the screenshot
+        :param scale: screenshot pixels per css pixel, default is to work it out with :meth:`.scale`
+        :type scale: float
+        :return: a numpy array of booleans, or None if nothing is masked
+        """
+        if not locators:
+            return None
+        if scale is None:
+            scale = VisualComparison.scale(browser, shape[1])
+        mask = numpy.zeros(shape[:2], dtype=bool)
+        for locator in locators:
+            for element in locator.find_all_elements_matching(browser.wd_instance, 0, False):
+                rect = element.rect if getattr(browser.wd_instance, 'w3c', False) else \
+                    dict(element.location, **element.size)
+                left, top = int(rect['x'] * scale), int(rect['y'] * scale)
+                right, bottom = int((rect['x'] + rect['width']) * scale + 0.5), \
+                    int((rect['y'] + rect['height']) * scale + 0.5)
+                mask[max(top, 0):max(bottom, 0), max(left, 0):max(right, 0)] = True
+        return mask
+
+    def baseline_file(self, name):
+        return os.path.join(self.baseline_dir, "{}.png".format(re.sub(r'[^A-Za-z0-9_.-]+', '_', name)))
+
+    def get_baseline(self, name):
+        """
+        The decoded baseline for a name, read from the baseline directory the first time.
+
+        :return: a numpy array, or None if there isn't a baseline
+        """
+        if name not in self._baselines:
+            filename = self.baseline_file(name)
+            self._baselines[name] = VisualComparison.decode(filename) if os.path.exists(filename) else None
+        return self._baselines[name]
+
+    def save_baseline(self, name, png):
+        """
+        Make png (bytes) the baseline for name.
+        """
+        if not os.path.isdir(self.baseline_dir):
+            os.makedirs(self.baseline_dir)
+        with io.open(self.baseline_file(name), 'wb') as output:
+            output.write(png)
+        self._baselines[name] = VisualComparison.decode(png)
+
+    def compare(self, actual, baseline, mask=None, name=None):
+        """
+        Compare a screenshot to a baseline.
+
+        :param actual: the screenshot (png bytes, file name or decoded array)
+        :param baseline: the baseline (png bytes, file name or decoded array)
+        :param mask: a numpy array of booleans the size of the images, True for pixels to ignore
+        :param name: the name to put on the result
+        :type name: str
+        :rtype: :class:`.ScreenshotDiff`
+        """
+        return _compare_images(name, actual, baseline, mask, self.tolerance, self.max_diff_ratio, self.perceptual)
+
+    def check(self, browser, name=None, ignore=None, scale=None, update=False, log=True):
+        """
+        Take a screenshot and compare it to the baseline for the page.  If there is no baseline (or update is True)
+        the screenshot is saved as the baseline, and the check passes.
+
+        :param browser: the browser to take the screenshot of
+        :type browser: :class:`.Browser`
+        :param name: the name of the baseline, default is the current page (see :meth:`.Browser.wait_for_page`)
+        :type name: str
+        :param ignore: elements to leave out of the comparison
+        :type ignore: list of :class:`.WebElementLocator`
+        :param scale: screenshot pixels per css pixel, for the ignore masks, default is to work it out (see
+                      :meth:`.scale`)
+        :type scale: float
+        :param update: replace the baseline with this screenshot
+        :type update: bool
+        :param log: Whether or not to log
+        :type log: bool
+        :rtype: :class:`.ScreenshotDiff`
+        """
+        name = name or browser.current_page_name
+        if name is None:
+            raise WebDriverException("Give the check a name, or wait for a page first so it can be named after it.")
+        png = browser.screenshot_as_byte()
+        if update or self.get_baseline(name) is None:
+            self.save_baseline(name, png)
+            if log:
+                self.logger.info("Saved a new baseline for %s.", name)
+            actual = self._baselines[name]
+            return ScreenshotDiff(name, 0, actual.shape[0] * actual.shape[1], 0.0, True)
+        actual = VisualComparison.decode(png)
+        result = self.compare(actual, self.get_baseline(name), VisualComparison.mask(browser, ignore, actual.shape,
+                                                                                     scale), name)
+        if log:
+            if result.passed:
+                self.logger.debug("%r", result)
+            else:
+                self.logger.warning("%r", result)
+        return result
+
+    def compare_many(self, screenshots):
+        """
+        Compare many screenshots to their baselines at once, in a process pool if processes was given.  The pool's
+        processes are kept between calls, and each one decodes a baseline only the first time it uses it.
+
+        :param screenshots: (name, screenshot) or (name, screenshot, mask) tuples, the screenshots can be png bytes or
+                            file names
+        :return: a result for each screenshot, in the same order
+        :rtype: list of :class:`.ScreenshotDiff`
+        """
+        jobs = []
+        for screenshot in screenshots:
+            name, actual, mask = (tuple(screenshot) + (None,))[:3]
+            baseline = self.baseline_file(name)
+            if self.processes is None:
+                baseline = self.get_baseline(name)
+            if baseline is None or (isinstance(baseline, _string_types) and not os.path.exists(baseline)):
+                raise WebDriverException("There is no baseline for {}.".format(name))
+            jobs.append((name, actual, baseline, mask, self.tolerance, self.max_diff_ratio, self.perceptual))
+        if self.processes is None:
+            return [_compare_images(*job) for job in jobs]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.processes)
+        futures = [self._pool.submit(_compare_images, *job) for job in jobs]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """
+        Shut down the process pool, if one was started.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+class BrowserResult(object):
+    """
+    The outcome of running an action on one browser of a :class:`.BrowserGroup`.
+    """
+
+    def __init__(self, browser, value=None, exception=None, duration=0.0):
+        self.browser = browser
+        """The :class:`.Browser` the action was run on (None for a browser that failed to start)"""
+        self.value = value
+        """What the action returned (None if it raised an exception)"""
+        self.exception = exception
+        """The exception the action raised, or None"""
+        self.duration = duration
+        """How long (in seconds) the action took"""
+
+    @property
+    def succeeded(self):
+        """True if the action didn't raise an exception"""
+        return self.exception is None
+
+    def __repr__(self):
+        return "BrowserResult(browser={}, value={}, exception={}, duration={:.2f})".format(
+            repr(self.browser.browser_type if self.browser is not None else None), repr(self.value),
+            repr(self.exception), self.duration)
+
+
+class BrowserGroupError(WebDriverException):
+    """
+    Raised by :class:`.BrowserGroup` when an action fails on one or more of the browsers.  The results for every
+    browser (including the ones that succeeded) are in the *results* attribute.
+    """
+
+    def __init__(self, msg, results):
+        super(BrowserGroupError, self).__init__(msg)
+        self.results = results
+        """list of :class:`.BrowserResult`, one for each browser in the group"""
+
+
+class BrowserGroup(object):
+    """
+    A group of :class:`.Browser` instances that are driven together.  Any Browser method called on the group is run
+    on every browser at the same time (using a thread pool), so a cross browser run takes about as long as the
+    slowest browser instead of the sum of all of them.
+
+    Calling a Browser method on the group returns a list of :class:`.BrowserResult`, one for each browser in the same
+    order as the browsers.  If the method raised an exception on any browser a :class:`.BrowserGroupError` is raised
+    after all the browsers are done.
+
+    Example Use::
+
+        from slickwd import BrowserGroup, BrowserType
+
+        group = BrowserGroup.create([BrowserType.CHROME, BrowserType.FIREFOX])
+        group.go_to("http://www.google.com")
+        group.wait_for_page(Google.Home)
+        group.type(Google.Home.Search_Query_Text_Field, "slickqa")
+        group.quit()
+
+    To run a whole page class flow on each browser, use :meth:`.run` with a function that takes a browser.
+    """
+
+    def __init__(self, browsers, max_workers=None):
+        """
+        :param browsers: the browsers to drive
+        :type browsers: list of :class:`.Browser`
+        :param max_workers: the maximum number of browsers to drive at the same time, default is all of them
+        :type max_workers: int
+        """
+        self.browsers = list(browsers)
+        self.logger = logging.getLogger("slickwd.BrowserGroup")
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or max(len(self.browsers), 1))
+
+    @classmethod
+    def create(cls, browser_types, remote_url=None, default_timeout=30, max_workers=None):
+        """
+        Start a browser for each browser type at the same time, and return a group of them.  The parameters are the
+        same as :class:`.Browser`.  If any browser fails to start, the ones that did start are quit and a
+        :class:`.BrowserGroupError` is raised, with a result for each browser type (the ones that failed to start
+        have no browser and the exception).
+
+        :param browser_types: a list of browser types (anything :class:`.Browser` accepts)
+        :rtype: :class:`.BrowserGroup`
+        """
+        browser_types = list(browser_types)
+        if not browser_types:
+            raise BrowserGroupError("A browser group needs at least one browser type.", [])
+
+        def start(browser_type):
+            started = time.time()
+            try:
+                browser = Browser(browser_type, remote_url, default_timeout)
+                return BrowserResult(browser, value=browser, duration=time.time() - started)
+            except Exception as e:
+                return BrowserResult(None, exception=e, duration=time.time() - started)
+        with ThreadPoolExecutor(max_workers=max_workers or len(browser_types)) as executor:
+            results = list(executor.map(start, browser_types))
+        failures = [(browser_type, result) for browser_type, result in zip(browser_types, results)
+                    if not result.succeeded]
+        if failures:
+            for result in results:
+                if result.succeeded:
+                    try:
+                        result.browser.quit()
+                    except WebDriverException:
+                        pass
+            raise BrowserGroupError("Unable to start {} of {} browsers: {}".format(
+                len(failures), len(browser_types), "; ".join(["{}: {}".format(
+                    getattr(browser_type, 'name', browser_type), str(result.exception).strip())
+                    for browser_type, result in failures])), results)
+        return cls([result.browser for result in results], max_workers)
+
+    def _timed_call(self, browser, action, args, kwargs):
+        start = time.time()
+        try:
+            value = action(browser, *args, **kwargs)
+            return BrowserResult(browser, value=value, duration=time.time() - start)
+        except Exception as e:
+            return BrowserResult(browser, exception=e, duration=time.time() - start)
+
+    def run(self, action, *args, **kwargs):
+        """
+        Run a function on every browser at the same time.  The function is called with the browser as the first
+        argument, followed by any other arguments passed to run.
+
+        :param action: the function to call for each browser
+        :return: a result for each browser
+        :rtype: list of :class:`.BrowserResult`
+        """
+        futures = [self.executor.submit(self._timed_call, browser, action, args, kwargs) for browser in self.browsers]
+        results = [future.result() for future in futures]
+        failures = [result for result in results if not result.succeeded]
+        if failures:
+            raise BrowserGroupError("{} of {} browsers failed: {}".format(
+                len(failures), len(results), "; ".join([repr(result) for result in failures])), results)
+        return results
+
+    def __getattr__(self, name):
+        # only plain instance methods, not classmethods and staticmethods (like session_state_file) or attributes
+        method = None
+        for cls in inspect.getmro(Browser):
+            if name in vars(cls):
+                method = vars(cls)[name]
+                break
+        if not inspect.isfunction(method) or name.startswith('_'):
+            raise AttributeError("{} has no attribute {}".format(self.__class__.__name__, name))
+
+        def group_method(*args, **kwargs):
+            self.logger.debug("Calling %s on %s browsers.", name, len(self.browsers))
+            return self.run(method, *args, **kwargs)
+        return group_method
+
+    def quit(self, log=True):
+        """
+        Quit every browser in the group (even if some fail to quit) and shut down the thread pool.
+
+        :return: a result for each browser
+        :rtype: list of :class:`.BrowserResult`
+        """
+        try:
+            return self.run(Browser.quit, log)
+        finally:
+            self.executor.shutdown()
+
+
+class Container(object):
+    """
+    A generic container for structuring multiple *WebElementLocator* into groupings that help programmers find the right
+    shared definition.
+    """
+
+    @property
+    def browser(self):
+        """
+        The slickwd Browser instance.
+        :return: The Browser instance of itself or it's parent.
+        :rtype: Browser
+        """
+        if hasattr(self, '_browser'):
+            return self._browser
+        elif hasattr(self, 'parent') and self.parent is not None:
+            return self.parent.browser
+        else:
+            return None
+
+    @browser.setter
+    def browser(self, new_instance):
+        """
+        Set the browser instance
+        :param new_instance: the new instance of browser to set
+        :type new_instance: :class:`.Browser`
+        """
+        self._browser = new_instance
+
+    def get_name(self):
+        """
+        Get the full name of this page.  If using nested :doc:`page-classes` this will get the full *dotted* name
+        of the page class.
+
+        :return: A string containing the best guess at the page class name.
+        """
+        if hasattr(self, "parent") and hasattr(self, "container_name") and self.parent is not None:
+            return "{}.{}".format(self.parent.get_name(), self.container_name)
+        elif hasattr(self, "container_name"):
+            return self.container_name
+        else:
+            name = self.__class__.__name__
+            if name.endswith("Page"):
+                name = name[:-4]
+            return name
+
+    def is_current_page(self, browser):
+        """
+        You should override this method in a subclass of Container.  This method is used to see if what is in the
+        browser currently matches one or more elements of this class.  This method should be quick (timeout 0 for all
+        your calls).  It may get called a lot, so you may want to turn off logging for any browser methods called
+        (log=False parameter).
+
+        :param browser: A :class:`.Browser` instance to use in detecting if this is the current page.
+        :return: True if the current page matches what is in the browser, False otherwise.
+        """
+        raise NotImplementedError("is_current_page was not implemented on class: {}".format(self.__class__.__name__))
+
+    def __setattr__(self, key, value):
+        # this magic is for naming and setting of parent -> child relationships
+        if key != "parent":
+            if isinstance(value, Container):
+                value.parent = self
+                value.container_name = key
+            if isinstance(value, WebElementLocator):
+                value.parent = self
+        return super(Container, self).__setattr__(key, value)
+
+
+class FakeWebElement(object):
+    """
+    An element of a page loaded into a :class:`.FakeWebDriver`.  It has the parts of the selenium WebElement api that
+    slickwd uses.  Elements go stale (StaleElementReferenceException) when their tab loads another page, just like
+    they do in a real browser.
+    """
+
+    def __init__(self, driver, window, node):
+        self.parent = driver
+        self._window = window
+        self._generation = window.generation
+        self._node = node
+
+    def _check(self):
+        if self._window.closed or self._window.generation != self._generation:
+            raise StaleElementReferenceException("Element {} is no longer attached to the page".format(self._node.tag))
+        return self._node
+
+    def __eq__(self, other):
+        return isinstance(other, FakeWebElement) and other._node is self._node
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self._node)
+
+    @property
+    def id(self):
+        return str(id(self._node))
+
+    @property
+    def tag_name(self):
+        return self._check().tag
+
+    @property
+    def text(self):
+        return FakeWebDriver.visible_text(self._check())
+
+    def get_attribute(self, name):
+        node = self._check()
+        if name in FakeWebDriver.BOOLEAN_ATTRIBUTES:
+            return "true" if node.get(name) is not None else None
+        if name == 'value' and node.tag == 'textarea':
+            return node.get('value', node.text_content())
+        if name == 'value' and node.tag == 'option' and node.get('value') is None:
+            return node.text_content().strip()
+        if name == 'value' and node.tag == 'select':
+            options = [option for option in node.iter('option') if option.get('selected') is not None] or \
+                list(node.iter('option'))
+            return FakeWebElement(self.parent, self._window, options[0]).get_attribute('value') if options else None
+        if name in ('innerText', 'textContent'):
+            return FakeWebDriver.visible_text(node) if name == 'innerText' else node.text_content()
+        if name in ('href', 'src') and node.get(name) is not None:
+            return urljoin(self._window.url, node.get(name))
+        return node.get(name)
+
+    def get_property(self, name):
+        return self.get_attribute(name)
+
+    @property
+    def screenshot_as_base64(self):
+        return self.parent.get_screenshot_as_png()
+
+    def is_displayed(self):
+        return FakeWebDriver.is_node_displayed(self._check())
+
+    def is_enabled(self):
+        return self._check().get('disabled') is None
+
+    def is_selected(self):
+        node = self._check()
+        return node.get('checked') is not None or node.get('selected') is not None
+
+    def clear(self):
+        node = self._check()
+        node.set('value', '')
+
+    def send_keys(self, *value):
+        node = self._check()
+        # drop the special keys (Keys.ENTER and friends), they live in the unicode private use area
+        text = u"".join([v if isinstance(v, _string_types) else u"{}".format(v) for v in value])
+        typed = u"".join([c for c in text if not u'\ue000' <= c <= u'\uf8ff'])
+        node.set('value', (self.get_attribute('value') or '') + typed)
+
+    def click(self):
+        node = self._check()
+        if node.get('disabled') is not None:
+            return
+        input_type = (node.get('type') or '').lower()
+        if node.tag == 'input' and input_type == 'checkbox':
+            if node.get('checked') is None:
+                node.set('checked', 'checked')
+            else:
+                del node.attrib['checked']
+        elif node.tag == 'input' and input_type == 'radio':
+            for radio in node.getroottree().getroot().iter('input'):
+                if radio.get('name') == node.get('name') and radio.get('checked') is not None:
+                    del radio.attrib['checked']
+            node.set('checked', 'checked')
+        elif node.tag == 'option':
+            select = next(node.iterancestors('select'), None)
+            if select is not None and select.get('multiple') is None:
+                for option in select.iter('option'):
+                    if option.get('selected') is not None:
+                        del option.attrib['selected']
+            node.set('selected', 'selected')
+        elif node.tag == 'a' and node.get('href') is not None:
+            url = urljoin(self._window.url, node.get('href'))
+            if self.parent.can_load(url):
+                self.parent.get(url)
+
+    def find_element(self, by=By.ID, value=None):
+        return self.parent._first(self.parent._find(by, value, self._window, self._check()), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.parent._find(by, value, self._window, self._check())
+
+    def find_elements_by_xpath(self, xpath):
+        return self.find_elements(By.XPATH, xpath)
+
+
+class FakeWebDriver(object):
+    """
+    An in-process stand in for a selenium webdriver, that works on html parsed with `lxml <http://lxml.de>`_ (and
+    `cssselect <https://pypi.python.org/pypi/cssselect>`_ for css selectors) instead of a real browser.  Use it
+    (through :attr:`.BrowserType.FAKE`) to test page classes and locators in milliseconds, without a browser::
+
+        browser = Browser(BrowserType.FAKE)
+        browser.wd_instance.add_page("http://example.com/login", LOGIN_HTML)
+        browser.go_to("http://example.com/login")
+        assert LoginPage().is_current_page(browser)
+
+    Pages are loaded with :meth:`.add_page` (then navigated to), :meth:`.load_html`, or from file:// urls.  All the
+    webdriver locator strategies work, as do text, attributes, clicks (checkboxes, radio buttons, options and links
+    to known pages), typing, cookies, tabs and the scripts slickwd itself runs.  Page javascript is never run, other
+    scripts raise WebDriverException.  Mobile locators, screenshots and ActionChains are not supported.
+    """
+
+    BOOLEAN_ATTRIBUTES = frozenset(['checked', 'selected', 'disabled', 'multiple', 'readonly', 'required', 'hidden'])
+    NOT_DISPLAYED_TAGS = frozenset(['head', 'script', 'style', 'title', 'meta', 'link', 'template', 'noscript'])
+    BLOCK_TAGS = frozenset(['address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset',
+                            'figcaption', 'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+                            'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul', 'body',
+                            'html', 'option', 'select', 'caption', 'tbody', 'thead', 'tfoot'])
+
+    class _Window(object):
+        def __init__(self, handle):
+            self.handle = handle
+            self.url = "about:blank"
+            self.root = None
+            self.generation = 0
+            self.index = None
+            self.closed = False
+            self.local_storage = {}
+            self.session_storage = {}
+
+    class _SwitchTo(object):
+        def __init__(self, driver):
+            self._driver = driver
+
+        def window(self, handle):
+            if handle not in self._driver._windows:
+                raise WebDriverException("No tab with handle {}".format(handle))
+            self._driver._current = self._driver._windows[handle]
+
+    def __init__(self, pages=None):
+        """
+        :param pages: urls and the html to return when the browser goes to them
+        :type pages: dict of str to str
+        """
+        if lxml_html is None or cssselect is None:
+            raise WebDriverException("The fake browser requires lxml and cssselect, install them with pip.")
+        self.pages = dict(pages or {})
+        self.w3c = False
+        self.supports_pinned_scripts = False
+        self.switch_to = FakeWebDriver._SwitchTo(self)
+        self._cookies = []
+        self._local_storage = {}
+        self._streams = {}
+        self._handle_count = 0
+        self._windows = OrderedDict()
+        self._current = self._new_window()
+        self.load_html("")
+
+    def _new_window(self):
+        self._handle_count += 1
+        window = FakeWebDriver._Window("fake-tab-{}".format(self._handle_count))
+        self._windows[window.handle] = window
+        return window
+
+    def _window(self):
+        if self._current is None or self._current.closed:
+            raise WebDriverException("The current tab has been closed, switch to another tab.")
+        return self._current
+
+    def add_page(self, url, html):
+        """
+        Register the html that should be loaded when the browser goes to url.
+
+        :rtype: :class:`.FakeWebDriver`
+        """
+        self.pages[url] = html
+        return self
+
+    def load_html(self, html, url="about:blank"):
+        """
+        Replace the page in the current tab with html, as if the browser had loaded url.
+
+        :rtype: :class:`.FakeWebDriver`
+        """
+        window = self._window()
+        origin = self._origin(window)
+        window.root = lxml_html.document_fromstring(html) if html.strip() else lxml_html.document_fromstring(
+            "<html><head></head><body></body></html>")
+        window.url = url
+        window.generation += 1
+        if self._origin(window) != origin:
+            # like a browser tab, sessionStorage survives navigating within an origin
+            window.session_storage = {}
+        return self
+
+    def can_load(self, url):
+        return url in self.pages or url.startswith("file://") or url == "about:blank"
+
+    # -- the parts of the webdriver api slickwd uses --
+
+    def get(self, url):
+        if url in self.pages:
+            html = self.pages[url]
+        elif url.startswith("file://"):
+            with io.open(url2pathname(urlparse(url).path), 'r', encoding='utf-8') as page_file:
+                html = page_file.read()
+        elif url == "about:blank":
+            html = ""
+        else:
+            raise WebDriverException("The fake browser has no page for url {}, use add_page first.".format(url))
+        self.load_html(html, url)
+
+    def refresh(self):
+        if self.can_load(self._window().url):
+            self.get(self._window().url)
+
+    def quit(self):
+        for window in self._windows.values():
+            window.closed = True
+        self._windows.clear()
+        self._current = None
+
+    def close(self):
+        window = self._window()
+        window.closed = True
+        del self._windows[window.handle]
+        self._current = None
+
+    def set_script_timeout(self, time_to_wait):
+        pass
+
+    def implicitly_wait(self, time_to_wait):
+        pass
+
+    @property
+    def current_url(self):
+        return self._window().url
+
+    @property
+    def title(self):
+        title = self._window().root.find('.//title')
+        return title.text_content().strip() if title is not None else ""
+
+    @property
+    def page_source(self):
+        return lxml_html.tostring(self._window().root, encoding='unicode')
+
+    @property
+    def current_window_handle(self):
+        return self._window().handle
+
+    @property
+    def window_handles(self):
+        return list(self._windows.keys())
+
+    def get_cookies(self):
+        return [dict(cookie) for cookie in self._cookies]
+
+    def get_cookie(self, name):
+        for cookie in self._cookies:
+            if cookie['name'] == name:
+                return dict(cookie)
+
+    def add_cookie(self, cookie_dict):
+        self.delete_cookie(cookie_dict['name'])
+        self._cookies.append(dict(cookie_dict))
+
+    def delete_cookie(self, name):
+        self._cookies = [cookie for cookie in self._cookies if cookie['name'] != name]
+
+    def delete_all_cookies(self):
+        self._cookies = []
+
+    def get_screenshot_as_png(self):
+        raise WebDriverException("The fake browser can't take screenshots.")
+
+    def get_screenshot_as_base64(self):
+        return self.get_screenshot_as_png()
+
+    def execute(self, driver_command, params=None):
+        raise WebDriverException("The fake browser doesn't support the {} command.".format(driver_command))
+
+    def find_element(self, by=By.ID, value=None):
+        return self._first(self._find(by, value, self._window(), None), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(by, value, self._window(), None)
+
+    def find_element_by_tag_name(self, name):
+        return self.find_element(By.TAG_NAME, name)
+
+    def find_elements_by_xpath(self, xpath):
+        return self.find_elements(By.XPATH, xpath)
+
+    def execute_async_script(self, script, *args):
+        if script == Browser.ANGULAR_EXISTS_JS:
+            return [False, 'the fake browser does not run javascript']
+        if script == WebElementLocator.WAIT_FOR_ANGULAR_JS:
+            return None
+        return self.execute_script(script, *args)
+
+    def execute_script(self, script, *args):
+        window = self._window()
+        root = args[0]._check() if args and isinstance(args[0], FakeWebElement) else window.root
+        if script == WebElementLocator.SHADOW_PATH_JS:
+            parent = args[1]._check() if args[1] is not None else window.root
+            return self._shadow_path(window, args[0], parent)
+        elif script == Browser.EXTRACT_ROWS_JS:
+            return [self._extract_row(window, row._check(), args[1]) for row in args[0]]
+        elif script == Browser.DIGEST_JS:
+            return FakeWebDriver.digest(self._structure(root, 0) if args[1] else FakeWebDriver.visible_text(root))
+        elif script == Browser.CONTAINS_TEXT_JS:
+            return args[1] in FakeWebDriver.visible_text(root)
+        elif script == Browser.STREAM_START_JS:
+            value = lxml_html.tostring(root, encoding='unicode') if args[1] else FakeWebDriver.visible_text(root)
+            key = "slickwd-{}".format(len(self._streams) + 1)
+            self._streams[key] = value
+            return [key, len(value)]
+        elif script == Browser.STREAM_CHUNK_JS:
+            value = self._streams[args[0]]
+            return [value[args[1]:args[1] + args[2]], min(args[1] + args[2], len(value))]
+        elif script == Browser.STREAM_END_JS:
+            self._streams.pop(args[0], None)
+            return None
+        elif script == Browser.GET_STORAGE_JS:
+            return [self._origin(window), dict(self._local_storage.get(self._origin(window), {})),
+                    dict(window.session_storage)]
+        elif script == Browser.SET_STORAGE_JS:
+            self._local_storage.setdefault(self._origin(window), {}).update(args[0])
+            window.session_storage.update(args[1])
+            return None
+        elif script == Browser.PERFORMANCE_JS:
+            # there is no page load to measure
+            return None
+        elif script == "return window.location.origin;":
+            return self._origin(window)
+        elif script == "arguments[0].scrollIntoView(true);":
+            return None
+        elif script == "window.open(arguments[0], '_blank');":
+            current = self._current
+            self._current = self._new_window()
+            self.get(args[0])
+            self._current = current
+            return None
+        raise WebDriverException("The fake browser can't run page javascript: {}".format(script.strip()[:80]))
+
+    # -- helpers --
+
+    @classmethod
+    def is_node_hidden(cls, node):
+        """True if an lxml node (not counting its ancestors) wouldn't be rendered, only inline styles count."""
+        style = (node.get('style') or '').replace(' ', '').lower()
+        if node.tag == 'template':
+            # a declarative shadow root is rendered in place of its host's children
+            return node.get('shadowrootmode') is None and node.get('shadowroot') is None
+        return node.tag in cls.NOT_DISPLAYED_TAGS or node.get('hidden') is not None or 'display:none' in style or \
+            'visibility:hidden' in style or (node.tag == 'input' and (node.get('type') or '').lower() == 'hidden')
+
+    @classmethod
+    def is_node_displayed(cls, node):
+        """Best guess at whether a browser would render an lxml node, there is no css so only inline styles count."""
+        return not any([cls.is_node_hidden(current) for current in [node] + list(node.iterancestors())])
+
+    @classmethod
+    def visible_text(cls, node):
+        """Approximate what a browser's innerText would be for an lxml node."""
+        if not cls.is_node_displayed(node):
+            return ""
+        parts = []
+
+        def walk(current):
+            if isinstance(current.tag, str) and not cls.is_node_hidden(current):
+                block = current.tag in cls.BLOCK_TAGS
+                if block:
+                    parts.append("\n")
+                if current.tag == 'br':
+                    parts.append("\n")
+                if current.text:
+                    parts.append(current.text)
+                for child in current:
+                    walk(child)
+                    if child.tail:
+                        parts.append(child.tail)
+                if block or current.tag in ('td', 'th'):
+                    parts.append("\n" if block else " ")
+        walk(node)
+        lines = [re.sub(r'\s+', ' ', line).strip() for line in "".join(parts).split("\n")]
+        return "\n".join([line for line in lines if line])
+
+    @classmethod
+    def digest(cls, value):
+        """The same digest :attr:`.Browser.DIGEST_JS` computes in a real browser."""
+        def imul(a, b):
+            return (a * b) & 0xffffffff
+        # javascript strings are utf-16, so hash utf-16 code units like the browser does
+        data = bytearray(value.encode('utf-16-le'))
+        h1, h2 = 0xdeadbeef, 0x41c6ce57
+        for i in range(0, len(data), 2):
+            unit = data[i] | (data[i + 1] << 8)
+            h1 = imul(h1 ^ unit, 2654435761)
+            h2 = imul(h2 ^ unit, 1597334677)
+        h1 = imul(h1 ^ (h1 >> 16), 2246822507) ^ imul(h2 ^ (h2 >> 13), 3266489909)
+        h2 = imul(h2 ^ (h2 >> 16), 2246822507) ^ imul(h1 ^ (h1 >> 13), 3266489909)
+        return "{}:{:x}{:x}".format(len(data) // 2, h2, h1)
+
+    def _structure(self, node, depth):
+        return ";".join(["{}{}".format(depth, node.tag.upper())] +
+                        [self._structure(child, depth + 1) for child in node if isinstance(child.tag, str)])
+
+    def _origin(self, window):
+        parsed = urlparse(window.url)
+        return "{}://{}".format(parsed.scheme, parsed.netloc) if parsed.netloc else "null"
+
+    def _shadow_path(self, window, path, root):
+        roots = [root]
+        for selector in path[:-1]:
+            roots = [child for parent in roots for host in self._css(parent, selector) for child in host
+                     if child.tag == 'template' and (child.get('shadowrootmode') or child.get('shadowroot'))]
+        return [FakeWebElement(self, window, node) for parent in roots for node in self._css(parent, path[-1])]
+
+    def _extract_row(self, window, row, columns):
+        record = {}
+        for name, steps, attribute in columns:
+            nodes = [row]
+            for step in steps:
+                found = []
+                for how, expression in step:
+                    if how == 'xpath':
+                        found = [node for node in nodes[0].xpath(expression)
+                                 if isinstance(node, lxml_html.HtmlElement)]
+                    else:
+                        found = self._css(nodes[0], expression)
+                    if found:
+                        break
+                nodes = found
+                if not nodes:
+                    break
+            if not nodes:
+                record[name] = None
+            elif attribute is None:
+                record[name] = FakeWebDriver.visible_text(nodes[0])
+            else:
+                record[name] = FakeWebElement(self, window, nodes[0]).get_attribute(attribute)
+        return record
+
+    def _css(self, node, selector):
+        return [found for found in node.cssselect(selector) if found is not node]
+
+    def _first(self, elements, by, value):
+        if not elements:
+            raise NoSuchElementException("No element found by {}".format(Find.describe_single_finder(by, value)))
+        return elements[0]
+
+    def _index(self, window):
+        """
+        Index every element of the page in the window by id, name, class and tag, so that searches of the whole page
+        by those don't have to walk the document.  The index is rebuilt when the window loads another page.
+        """
+        if window.index is None or window.index[0] != window.generation:
+            index = {By.ID: {}, By.NAME: {}, By.CLASS_NAME: {}, By.TAG_NAME: {}}
+            for node in window.root.iter():
+                if not isinstance(node.tag, str):
+                    continue
+                index[By.TAG_NAME].setdefault(node.tag, []).append(node)
+                if node.get('id') is not None:
+                    index[By.ID].setdefault(node.get('id'), []).append(node)
+                if node.get('name') is not None:
+                    index[By.NAME].setdefault(node.get('name'), []).append(node)
+                for class_name in set((node.get('class') or '').split()):
+                    index[By.CLASS_NAME].setdefault(class_name, []).append(node)
+            window.index = (window.generation, index)
+        return window.index[1]
+
+    def _find(self, by, value, window, node):
+        if node is None and by in (By.ID, By.NAME, By.CLASS_NAME, By.TAG_NAME):
+            found = self._index(window)[by].get(value.lower() if by == By.TAG_NAME else value, [])
+            return [FakeWebElement(self, window, found_node) for found_node in found]
+        # searches from the document include the root (html) element, searches from an element don't include it
+        context = node if node is not None else window.root.getroottree()
+        prefix = ".//" if node is not None else "//"
+        if by == By.CSS_SELECTOR:
+            nodes = self._css(node, value) if node is not None else window.root.cssselect(value)
+        elif by == By.XPATH:
+            nodes = [found for found in context.xpath(value) if isinstance(found, lxml_html.HtmlElement)]
+        elif by == By.ID:
+            nodes = context.xpath(prefix + "*[@id=$value]", value=value)
+        elif by == By.NAME:
+            nodes = context.xpath(prefix + "*[@name=$value]", value=value)
+        elif by == By.CLASS_NAME:
+            nodes = context.xpath(prefix + "*[contains(concat(' ', normalize-space(@class), ' '), $value)]",
+                                  value=" {} ".format(value))
+        elif by == By.TAG_NAME:
+            nodes = context.xpath(prefix + "*[local-name()=$value]", value=value.lower())
+        elif by == By.LINK_TEXT:
+            nodes = [link for link in context.iter('a') if FakeWebDriver.visible_text(link) == value.strip()]
+        elif by == By.PARTIAL_LINK_TEXT:
+            nodes = [link for link in context.iter('a') if value in FakeWebDriver.visible_text(link)]
+        else:
+            raise WebDriverException("The fake browser doesn't support finding elements by {}".format(by))
+        return [FakeWebElement(self, window, found) for found in nodes]
+
+
+class AppiumSourceElement(object):
+    """
+    An element of the page source xml loaded into an :class:`.AppiumSourceDriver`.  Reading it (text, attributes,
+    displayed, enabled) never talks to the device.  It can't be acted on, find the element with the real Browser to
+    click or type into it.
+    """
+
+    def __init__(self, driver, generation, node):
+        self.parent = driver
+        self._generation = generation
+        self._node = node
+
+    def _check(self):
+        if self.parent._generation != self._generation:
+            raise StaleElementReferenceException("Element {} is no longer in the page source".format(self._node.tag))
+        return self._node
+
+    def __eq__(self, other):
+        return isinstance(other, AppiumSourceElement) and other._node is self._node
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return id(self._node)
+
+    @property
+    def id(self):
+        return str(id(self._node))
+
+    @property
+    def tag_name(self):
+        return self._check().tag
+
+    @property
+    def text(self):
+        return AppiumSourceDriver.node_text(self._check())
+
+    @property
+    def location(self):
+        node = self._check()
+        x, y, width, height = AppiumSourceDriver.node_rect(node)
+        return {'x': x, 'y': y}
+
+    @property
+    def size(self):
+        node = self._check()
+        x, y, width, height = AppiumSourceDriver.node_rect(node)
+        return {'width': width, 'height': height}
+
+    def get_attribute(self, name):
+        node = self._check()
+        if name in ('contentDescription', 'content-desc'):
+            return node.get('content-desc')
+        if name in ('resourceId', 'resource-id'):
+            return node.get('resource-id')
+        if name == 'className':
+            return node.get('class', node.tag)
+        return node.get(name)
+
+    def get_property(self, name):
+        return self.get_attribute(name)
+
+    def is_displayed(self):
+        node = self._check()
+        return node.get('displayed', node.get('visible', 'true')) == 'true'
+
+    def is_enabled(self):
+        return self._check().get('enabled', 'true') == 'true'
+
+    def is_selected(self):
+        node = self._check()
+        return 'true' in (node.get('selected'), node.get('checked'))
+
+    def _act(self, *args, **kwargs):
+        raise WebDriverException("Elements from the page source can't be acted on, find {} with the real "
+                                 "browser.".format(self._node.tag))
+
+    click = clear = send_keys = _act
+
+    def find_element(self, by=By.ID, value=None):
+        return self.parent._first(self.parent._find(by, value, self._check()), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.parent._find(by, value, self._check())
+
+
+class AppiumSourceDriver(object):
+    """
+    A stand in for an appium driver that answers locator queries from the page source xml of an app, parsed and
+    indexed locally with `lxml <http://lxml.de>`_.  Checking whether elements exist, or reading their text, is one
+    round trip to fetch the page source instead of one (or several) per locator.  :meth:`.Browser.snapshot` uses it for
+    mobile sessions, and :attr:`.BrowserType.FAKE_MOBILE` uses it to test page classes against captured page source::
+
+        browser = Browser(BrowserType.FAKE_MOBILE)
+        browser.wd_instance.load_source(LOGIN_SCREEN_XML)
+        assert LoginScreen().is_current_page(browser)
+
+    Accessibility id, id (resource-id), class name and xpath are answered from the source, as are the simple
+    UiSelector expressions (text, description, resourceId, className and their Contains/StartsWith/Matches forms,
+    instance, index and the boolean properties), iOS predicates that are comparisons joined with AND, and iOS class
+    chains using those predicates.  Anything else is sent to the live driver if there is one, otherwise it raises
+    InvalidSelectorException.
+    """
+
+    UI_SELECTOR_PATTERN = re.compile(r'\s*\.\s*(\w+)\s*\(\s*("(?:[^"\\]|\\.)*"|true|false|\d+)?\s*\)')
+    UI_SELECTOR_METHODS = {
+        'text': ('text', lambda actual, wanted: actual == wanted),
+        'textContains': ('text', lambda actual, wanted: wanted in actual),
+        'textStartsWith': ('text', lambda actual, wanted: actual.startswith(wanted)),
+        'textMatches': ('text', lambda actual, wanted: re.match(wanted + '$', actual, re.S) is not None),
+        'description': ('content-desc', lambda actual, wanted: actual == wanted),
+        'descriptionContains': ('content-desc', lambda actual, wanted: wanted in actual),
+        'descriptionStartsWith': ('content-desc', lambda actual, wanted: actual.startswith(wanted)),
+        'descriptionMatches': ('content-desc', lambda actual, wanted: re.match(wanted + '$', actual, re.S) is not None),
+        'resourceId': ('resource-id', lambda actual, wanted: actual == wanted),
+        'resourceIdMatches': ('resource-id', lambda actual, wanted: re.match(wanted + '$', actual) is not None),
+        'className': ('class', lambda actual, wanted: actual == wanted),
+        'classNameMatches': ('class', lambda actual, wanted: re.match(wanted + '$', actual) is not None),
+        'packageName': ('package', lambda actual, wanted: actual == wanted),
+        'index': ('index', lambda actual, wanted: actual == wanted),
+    }
+    UI_SELECTOR_BOOLEANS = frozenset(['checkable', 'checked', 'clickable', 'enabled', 'focusable', 'focused',
+                                      'longClickable', 'scrollable', 'selected'])
+    PREDICATE_PATTERN = re.compile(r'\s*(\w+)\s*(==|!=|CONTAINS|BEGINSWITH|ENDSWITH)(\[c\])?\s*'
+                                   r'(\'(?:[^\'\\]|\\.)*\'|"(?:[^"\\]|\\.)*"|\d+|true|false|TRUE|FALSE|YES|NO)\s*'
+                                   r'(?:AND|&&|$)', re.I)
+    PREDICATE_OPERATORS = {
+        '==': lambda actual, wanted: actual == wanted,
+        '!=': lambda actual, wanted: actual != wanted,
+        'CONTAINS': lambda actual, wanted: wanted in actual,
+        'BEGINSWITH': lambda actual, wanted: actual.startswith(wanted),
+        'ENDSWITH': lambda actual, wanted: actual.endswith(wanted),
+    }
+
+    def __init__(self, source=None, live=None):
+        """
+        :param source: page source xml to load
+        :type source: str
+        :param live: the real driver, used for locators that can't be answered from the page source
+        """
+        if lxml_etree is None:
+            raise WebDriverException("The page source index requires lxml, install it with pip.")
+        self.live = live
+        self.w3c = False
+        self.supports_pinned_scripts = False
+        self.root = None
+        self.index = None
+        self._generation = 0
+        self.load_source(source or "<hierarchy/>")
+
+    def load_source(self, source):
+        """
+        Replace the page source, and index every element by accessibility id, resource id, text and class.  Elements
+        found in the previous page source go stale.
+
+        :rtype: :class:`.AppiumSourceDriver`
+        """
+        if not isinstance(source, bytes):
+            source = source.encode('utf-8')
+        self.root = lxml_etree.fromstring(source, parser=lxml_etree.XMLParser(huge_tree=True, recover=True))
+        self._generation += 1
+        index = {MobileBy.ACCESSIBILITY_ID: {}, By.ID: {}, 'text': {}, By.CLASS_NAME: {}}
+        for node in self.root.iter():
+            if not isinstance(node.tag, str):
+                continue
+            index[By.CLASS_NAME].setdefault(node.get('class', node.tag), []).append(node)
+            if node.get('type') is not None and node.get('type') != node.tag:
+                index[By.CLASS_NAME].setdefault(node.get('type'), []).append(node)
+            accessibility_id = node.get('content-desc', node.get('name'))
+            if accessibility_id:
+                index[MobileBy.ACCESSIBILITY_ID].setdefault(accessibility_id, []).append(node)
+            # ids are resource ids on android, and the same as the accessibility id (name) on iOS
+            resource_id = node.get('resource-id', node.get('name'))
+            if resource_id:
+                index[By.ID].setdefault(resource_id, []).append(node)
+                # appium adds the app's package to ids without one, so index the short form as well
+                if ':id/' in resource_id:
+                    index[By.ID].setdefault(resource_id.split(':id/', 1)[1], []).append(node)
+            text = AppiumSourceDriver.node_text(node)
+            if text:
+                index['text'].setdefault(text, []).append(node)
+        self.index = index
+        return self
+
+    @classmethod
+    def node_text(cls, node):
+        """The text appium would return for a page source node: text on android, value or label on iOS."""
+        if node.get('text') is not None:
+            return node.get('text')
+        return node.get('value') or node.get('label') or ""
+
+    @classmethod
+    def node_rect(cls, node):
+        """The (x, y, width, height) of a page source node, from bounds on android or x/y/width/height on iOS."""
+        if node.get('bounds'):
+            left, top, right, bottom = [int(part) for part in re.findall(r'-?\d+', node.get('bounds'))[:4]]
+            return left, top, right - left, bottom - top
+        return tuple([int(float(node.get(name, 0))) for name in ('x', 'y', 'width', 'height')])
+
+    def find_by_text(self, text):
+        """
+        Find all the elements whose text (see :meth:`.node_text`) is exactly text, from the index.
+
+        :rtype: list of :class:`.AppiumSourceElement`
+        """
+        return [AppiumSourceElement(self, self._generation, node) for node in self.index['text'].get(text, [])]
+
+    # -- the parts of the webdriver api slickwd uses --
+
+    @property
+    def page_source(self):
+        return lxml_etree.tostring(self.root, encoding='unicode')
+
+    def set_script_timeout(self, time_to_wait):
+        pass
+
+    def implicitly_wait(self, time_to_wait):
+        pass
+
+    def quit(self):
+        pass
+
+    def find_element(self, by=By.ID, value=None):
+        return self._first(self._find(by, value, None), by, value)
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._find(by, value, None)
+
+    def execute_script(self, script, *args):
+        raise WebDriverException("Scripts can't be run against the page source.")
+
+    execute_async_script = execute_script
+
+    # -- helpers --
+
+    def _first(self, elements, by, value):
+        if not elements:
+            raise NoSuchElementException("No element found by {}".format(Find.describe_single_finder(by, value)))
+        return elements[0]
+
+    def _ui_selector(self, value):
+        """Parse a simple UiSelector into (attribute, test, wanted) checks and an instance, or None if it isn't one."""
+        value = value.strip().rstrip(';')
+        if not value.startswith("new UiSelector()"):
+            return None
+        rest, checks, instance, position = value[len("new UiSelector()"):], [], None, 0
+        while position < len(rest):
+            match = AppiumSourceDriver.UI_SELECTOR_PATTERN.match(rest, position)
+            if match is None or match.group(2) is None:
+                return None
+            method, argument = match.group(1), match.group(2)
+            if argument.startswith('"'):
+                argument = re.sub(r'\\(.)', r'\1', argument[1:-1])
+            if method == 'instance' and argument.isdigit():
+                instance = int(argument)
+            elif method in AppiumSourceDriver.UI_SELECTOR_BOOLEANS and argument in ('true', 'false'):
+                attribute = re.sub(r'([A-Z])', lambda upper: '-' + upper.group(1).lower(), method)
+                checks.append((attribute, AppiumSourceDriver.PREDICATE_OPERATORS['=='], argument))
+            elif method in AppiumSourceDriver.UI_SELECTOR_METHODS:
+                checks.append(AppiumSourceDriver.UI_SELECTOR_METHODS[method] + (argument,))
+            else:
+                return None
+            position = match.end()
+        return checks, instance
+
+    def _predicate(self, value):
+        """Parse an iOS predicate of comparisons joined with AND into (attribute, test, wanted) checks, or None."""
+        checks, position, value = [], 0, value.strip()
+        while position < len(value):
+            match = AppiumSourceDriver.PREDICATE_PATTERN.match(value, position)
+            if match is None:
+                return None
+            attribute, operator, case_insensitive, wanted = match.groups()
+            if wanted[0] in '\'"':
+                wanted = re.sub(r'\\(.)', r'\1', wanted[1:-1])
+            else:
+                wanted = {'yes': 'true', 'no': 'false', '1': 'true', '0': 'false'}.get(wanted.lower(), wanted.lower())
+            test = AppiumSourceDriver.PREDICATE_OPERATORS[operator.upper()]
+            if case_insensitive:
+                test = (lambda compare: lambda actual, expected: compare(actual.lower(), expected.lower()))(test)
+            checks.append((attribute if attribute != 'wdType' else 'type', test, wanted))
+            position = match.end()
+        return (checks, None) if checks else None
+
+    def _matching(self, nodes, checks, instance):
+        found = [node for node in nodes if all([test(node.get(attribute, node.tag if attribute in ('class', 'type')
+                                                                                else ''), wanted)
+                                                 for attribute, test, wanted in checks])]
+        if instance is not None:
+            return found[instance:instance + 1]
+        return found
+
+    def _class_chain(self, value, node):
+        """Find the nodes matching an iOS class chain made of types, predicates and indexes, None if it isn't one."""
+        if node is None:
+            node = next(self.root.iter('XCUIElementTypeApplication'), self.root)
+        contexts, descendants = [node], False
+        for step in re.findall(r'(?:[^/`]|`[^`]*`)+', value):
+            if step == '**':
+                descendants = True
+                continue
+            match = re.match(r'^(\*|\w+)((?:\[`[^`]*`\]|\[-?\d+\])*)$', step)
+            if match is None:
+                return None
+            element_type, filters = match.groups()
+            found, seen = [], set()
+            for context in contexts:
+                candidates = [candidate for candidate in (context.iterdescendants() if descendants else context)
+                              if isinstance(candidate.tag, str) and
+                              element_type in ('*', candidate.tag, candidate.get('type'))]
+                for predicate, index in re.findall(r'\[(?:`([^`]*)`|(-?\d+))\]', filters):
+                    if index:
+                        position = int(index) - 1 if int(index) > 0 else len(candidates) + int(index)
+                        candidates = candidates[position:position + 1] if 0 <= position < len(candidates) else []
+                        continue
+                    checks = self._predicate(predicate)
+                    if checks is None:
+                        return None
+                    candidates = self._matching(candidates, *checks)
+                found.extend([candidate for candidate in candidates if candidate not in seen])
+                seen.update(candidates)
+            contexts, descendants = found, False
+        return contexts
+
+    def _find(self, by, value, node):
+        checks = found = None
+        if by == MobileBy.ANDROID_UIAUTOMATOR:
+            checks = self._ui_selector(value)
+        elif by == MobileBy.IOS_PREDICATE:
+            checks = self._predicate(value)
+        elif by == MobileBy.IOS_CLASS_CHAIN:
+            found = self._class_chain(value, node)
+        if found is not None:
+            pass
+        elif node is None and by in (MobileBy.ACCESSIBILITY_ID, By.ID, By.CLASS_NAME):
+            found = self.index[by].get(value, [])
+        elif by in (MobileBy.ACCESSIBILITY_ID, By.ID, By.CLASS_NAME):
+            indexed = set(self.index[by].get(value, []))
+            found = [child for child in node.iterdescendants() if child in indexed]
+        elif by == By.XPATH:
+            context = node if node is not None else self.root.getroottree()
+            found = [match for match in context.xpath(value) if isinstance(match, lxml_etree._Element)]
+        elif checks is not None:
+            nodes = node.iterdescendants() if node is not None else self.root.iter()
+            found = self._matching([current for current in nodes if isinstance(current.tag, str)], *checks)
+        elif self.live is not None and node is None:
+            return self.live.find_elements(by, value)
+        else:
+            raise InvalidSelectorException("Finding elements by {} can't be answered from the page source".format(
+                Find.describe_single_finder(by, value)))
+        return [AppiumSourceElement(self, self._generation, found_node) for found_node in found]
+
+
+class RunResult(object):
+    """
+    The result of one test run by :func:`.run_tests`.
+    """
+
+    def __init__(self, test_id, status, duration, message=None):
+        self.test_id = test_id
+        """The id of the test, path::function_name"""
+        self.status = status
+        """One of "pass", "fail" (an assertion failed) or "error" (any other exception)"""
+        self.duration = duration
+        """How long (in seconds) the test took"""
+        self.message = message
+        """The traceback if the test didn't pass, otherwise None"""
+
+    def __repr__(self):
+        return "RunResult(test_id={}, status={}, duration={:.2f})".format(repr(self.test_id), repr(self.status),
+                                                                        self.duration)
+
+
+def _test_root(directory):
+    """
+    Internal function, the directory that has to be on sys.path to import test files in directory, and the package
+    name of directory ("" if it isn't in a package).
+    """
+    package = []
+    while os.path.isfile(os.path.join(directory, '__init__.py')):
+        directory, name = os.path.split(directory)
+        package.insert(0, name)
+    return directory, ".".join(package)
+
+
+def _load_test_module(path):
+    """
+    Load a test file as a module.  A test file in a package (a directory with an __init__.py) is imported by its
+    package name, so its neighbours (page modules and the like) are part of the package too and can't be mixed up
+    with another directory's modules of the same name.  Any other test file is named after its full path, so that
+    test files with the same name in different directories don't replace each other, and its neighbours are plain
+    top level modules (give test directories an __init__.py if their helper modules have the same names).  The
+    directories are kept on sys.path for the life of the process, since tests can import modules while they run.
+    """
+    path = os.path.abspath(path)
+    root, package = _test_root(os.path.dirname(path))
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    if package:
+        module = importlib.import_module("{}.{}".format(package, os.path.splitext(os.path.basename(path))[0]))
+        if os.path.splitext(os.path.abspath(module.__file__))[0] != os.path.splitext(path)[0]:
+            raise ImportError("Unable to load {}, the module {} was already loaded from {}".format(
+                path, module.__name__, module.__file__))
+        return module
+    name = "slickwd_test_{}_{}".format(hashlib.sha1(path.encode('utf-8')).hexdigest()[:12],
+                                       re.sub(r'\W', '_', os.path.splitext(os.path.basename(path))[0]))
+    if name in sys.modules:
+        return sys.modules[name]
+    try:
+        from importlib.util import spec_from_file_location, module_from_spec
+    except ImportError:
+        # python 2
+        import imp
+        return imp.load_source(name, path)
+    spec = spec_from_file_location(name, path)
+    module = module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def _takes_browser(function):
+    try:
+        parameters = list(inspect.signature(function).parameters)
+    except AttributeError:
+        parameters = inspect.getargspec(function).args
+    return len(parameters) > 0 and parameters[0] == 'browser'
+
+
+def discover_tests(paths, pattern="test*.py"):
+    """
+    Find the tests that :func:`.run_tests` can run.  A test is a module level function whose name starts with
+    *test* and whose first parameter is named *browser*.  The runner passes it a :class:`.Browser`, so the test just
+    uses its page classes::
+
+        def test_google_search(browser):
+            browser.go_to('http://www.google.com')
+            browser.wait_for_page(Google.Home)
+
+    :param paths: python files, or directories to search for files matching pattern
+    :type paths: list of str
+    :param pattern: the file name pattern of test modules in directories
+    :type pattern: str
+    :return: test ids (path::function_name) in the order they were found
+    :rtype: list of str
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, subdirectories, filenames in os.walk(path):
+                subdirectories.sort()
+                files.extend([os.path.join(directory, filename) for filename in sorted(filenames)
+                              if fnmatch.fnmatch(filename, pattern)])
+        else:
+            files.append(path)
+    retval = []
+    for filename in files:
+        module = _load_test_module(filename)
+        for name, value in inspect.getmembers(module, inspect.isfunction):
+            if name.startswith('test') and value.__module__ == module.__name__ and _takes_browser(value):
+                retval.append("{}::{}".format(os.path.relpath(filename), name))
+    return retval
+
+
+def load_durations(filename):
+    """
+    Load the test durations recorded by :func:`.run_tests`.  An empty dict is returned if there are none.
+
+    :rtype: dict of test id to seconds
+    """
+    try:
+        with io.open(filename, 'r', encoding='utf-8') as durations_file:
+            return json.load(durations_file)
+    except (IOError, ValueError):
+        return {}
+
+
+def shard_tests(test_ids, count, durations=None):
+    """
+    Split tests into shards that should take about the same amount of time, using the recorded durations of each
+    test (the longest tests are placed first, each on the shard with the least work so far).  Tests without a
+    recorded duration are assumed to take the average time.
+
+    :param test_ids: the tests to split up
+    :type test_ids: list of str
+    :param count: the number of shards
+    :type count: int
+    :param durations: the recorded duration of each test
+    :type durations: dict of test id to seconds
+    :return: count lists of test ids, some may be empty
+    :rtype: list of list of str
+    """
+    if durations is None:
+        durations = {}
+    known = [durations[test_id] for test_id in test_ids if test_id in durations]
+    default = sum(known) / len(known) if known else 1.0
+    ordered = sorted(test_ids, key=lambda test_id: durations.get(test_id, default), reverse=True)
+    shards = [[] for i in range(count)]
+    totals = [(0.0, i) for i in range(count)]
+    for test_id in ordered:
+        total, index = heapq.heappop(totals)
+        shards[index].append(test_id)
+        heapq.heappush(totals, (total + durations.get(test_id, default), index))
+    return shards
+
+
+def _run_shard(shard, browser_type, remote_url, default_timeout, results, debug_log_dir=None, time_budget=None):
+    """
+    The body of a worker process for :func:`.run_tests`.  One browser is used for every test in the shard, and a
+    None is put on the results queue when the shard is done.
+    """
+    try:
+        browser = Browser(browser_type, remote_url, default_timeout)
+        if debug_log_dir is not None:
+            browser.enable_debug_log(directory=debug_log_dir, dump_on_error=False, log=False)
+    except Exception:
+        message = "Unable to start browser:\n{}".format(traceback.format_exc())
+        for test_id in shard:
+            results.put((test_id, "error", 0.0, message))
+        results.put(None)
+        return
+    try:
+        for test_id in shard:
+            start = time.time()
+            status, message = "pass", None
+            if browser.debug_log is not None:
+                browser.debug_log.clear()
+            try:
+                path, name = test_id.rsplit("::", 1)
+                if time_budget is None:
+                    getattr(_load_test_module(path), name)(browser)
+                else:
+                    with browser.time_budget(time_budget, test_id, log=False):
+                        getattr(_load_test_module(path), name)(browser)
+            except AssertionError:
+                status, message = "fail", traceback.format_exc()
+            except Exception:
+                status, message = "error", traceback.format_exc()
+            if status != "pass" and browser.debug_log is not None:
+                filename = browser.dump_debug_log(test_id, log=False)
+                if filename is not None:
+                    message += "Debug log: {}\n".format(filename)
+            results.put((test_id, status, time.time() - start, message))
+    finally:
+        try:
+            browser.quit(log=False)
+        except Exception:
+            pass
+        results.put(None)
+
+
+def run_tests(test_ids, browser_type, remote_url=None, workers=None, durations_file=".slickwd-durations.json",
+              default_timeout=30, debug_log_dir=None, time_budget=None):
+    """
+    Run tests in parallel, in separate worker processes that each have their own :class:`.Browser`.  The tests are
+    split into one shard per worker using the durations recorded by earlier runs (see :func:`.shard_tests`), and
+    the durations file is updated when the run is done.
+
+    Results are yielded as soon as each test finishes.
+
+    :param test_ids: the tests to run, usually from :func:`.discover_tests`
+    :type test_ids: list of str
+    :param browser_type: the browser type for each worker (anything :class:`.Browser` accepts)
+    :param remote_url: the selenium server / grid url, if any
+    :type remote_url: str
+    :param workers: the number of worker processes, default is the number of cpus
+    :type workers: int
+    :param durations_file: where test durations are kept between runs, None to not use one
+    :type durations_file: str
+    :param default_timeout: the default_timeout of each worker's browser
+    :type default_timeout: int or float
+    :param debug_log_dir: if given, each worker keeps a debug log (see :meth:`.Browser.enable_debug_log`) and dumps
+                          it to this directory when a test fails
+    :type debug_log_dir: str
+    :param time_budget: if given, the most seconds each test's waits can take in total (see
+                        :meth:`.Browser.time_budget`), a test that runs out stops with an error at its next wait
+    :type time_budget: int or float
+    :return: a generator yielding a :class:`.RunResult` for each test
+    """
+    if workers is None:
+        workers = multiprocessing.cpu_count()
+    durations = load_durations(durations_file) if durations_file is not None else {}
+    shards = [shard for shard in shard_tests(test_ids, max(min(workers, len(test_ids)), 1), durations) if shard]
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_run_shard,
+                                         args=(shard, browser_type, remote_url, default_timeout, results,
+                                               debug_log_dir, time_budget))
+                 for shard in shards]
+    for process in processes:
+        process.start()
+    pending = set(test_ids)
+    finished = 0
+    try:
+        while finished < len(processes):
+            try:
+                result = results.get(timeout=1)
+            except Exception:
+                if not any([process.is_alive() for process in processes]) and results.empty():
+                    break
+                continue
+            if result is None:
+                finished += 1
+                continue
+            pending.discard(result[0])
+            durations[result[0]] = result[2]
+            yield RunResult(*result)
+        for test_id in sorted(pending):
+            yield RunResult(test_id, "error", 0.0, "The worker process running this test exited unexpectedly.")
+    finally:
+        for process in processes:
+            process.join(1)
+        if durations_file is not None:
+            with io.open(durations_file, 'w', encoding='utf-8') as output:
+                output.write(u"{}".format(json.dumps(durations, indent=2, sort_keys=True)))
+
+
+def main(argv=None):
+    """
+    Command line entry point of the test runner (installed as *slickwd-run*).  Use --help for the options.
+
+    :return: the exit code, 0 if every test passed
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="Run slickwd tests in parallel, one browser per worker.")
+    parser.add_argument("paths", nargs="+", help="test files or directories containing test files")
+    parser.add_argument("-b", "--browser", default="chrome", help="browser type name (default chrome)")
+    parser.add_argument("-r", "--remote-url", default=None, help="selenium server or grid url")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("-p", "--pattern", default="test*.py", help="test file name pattern (default test*.py)")
+    parser.add_argument("-d", "--durations", default=".slickwd-durations.json", help="test durations file")
+    parser.add_argument("-t", "--timeout", type=float, default=30, help="browser default timeout in seconds")
+    parser.add_argument("-l", "--debug-log", default=None, metavar="DIR",
+                        help="keep a debug log in memory and write it to DIR when a test fails")
+    parser.add_argument("--budget", type=float, default=None, metavar="SECONDS",
+                        help="the most time each test's waits can take in total")
+    options = parser.parse_args(argv)
+
+    test_ids = discover_tests(options.paths, options.pattern)
+    counts = {"pass": 0, "fail": 0, "error": 0}
+    start = time.time()
+    for result in run_tests(test_ids, options.browser, options.remote_url, options.workers, options.durations,
+                            options.timeout, options.debug_log, options.budget):
+        counts[result.status] += 1
+        print("{} {} ({:.2f}s)".format(result.status.upper(), result.test_id, result.duration))
+        if result.message:
+            print(result.message)
+    print("Ran {} tests in {:.2f}s: {} passed, {} failed, {} errors".format(
+        len(test_ids), time.time() - start, counts["pass"], counts["fail"], counts["error"]))
+    return 0 if counts["pass"] == len(test_ids) else 1
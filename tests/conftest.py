@@ -0,0 +1,78 @@
+import json
+import threading
+
+import pytest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    # python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+
+
+class FakeHub(ThreadingMixIn, HTTPServer):
+    """
+    Just enough of a selenium server for a remote Browser: a session can be created, the url can be set and read,
+    and everything else succeeds without doing anything.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ("127.0.0.1", 0), FakeHubHandler)
+        self.url = "about:blank"
+        self.requests = []
+
+    @property
+    def remote_url(self):
+        return "http://127.0.0.1:{}/wd/hub".format(self.server_address[1])
+
+
+class FakeHubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _respond(self, value):
+        data = json.dumps({"sessionId": "fake-session", "status": 0, "value": value}).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.requests.append(("POST", self.path))
+        if self.path.endswith("/session"):
+            self._respond({"browserName": "chrome"})
+            return
+        if self.path.endswith("/url"):
+            self.server.url = json.loads(body.decode('utf-8'))['url']
+        self._respond(None)
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        if self.path.endswith("/title"):
+            self._respond("Fake Title")
+        else:
+            self._respond(self.server.url)
+
+    def do_DELETE(self):
+        self.server.requests.append(("DELETE", self.path))
+        self._respond(None)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def hub():
+    server = FakeHub()
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,))
+    thread.daemon = True
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
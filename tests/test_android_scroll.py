@@ -0,0 +1,75 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from slickwd import AppiumSourceDriver, Browser, BrowserType, Find, WebElementLocator
+
+Row = WebElementLocator("Row", Find.by_id("com.example:id/row"))
+
+
+class ListDevice(AppiumSourceDriver):
+    """
+    A W3C device showing 5 rows of a 30 row list at a time, each swipe scrolls 4 rows.
+    """
+
+    def __init__(self):
+        AppiumSourceDriver.__init__(self)
+        self.w3c = True
+        self.position = 0
+        self.swipes = 0
+        self.render()
+
+    def render(self):
+        rows = "".join(['<android.widget.TextView class="android.widget.TextView" text="Row {}" '
+                        'resource-id="com.example:id/row" bounds="[0,{}][1080,{}]"/>'.format(
+                            row, (row - self.position) * 100, (row - self.position + 1) * 100)
+                        for row in range(self.position, min(self.position + 5, 30))])
+        self.load_source('<hierarchy><android.widget.ListView class="android.widget.ListView" scrollable="true" '
+                         'bounds="[0,0][1080,500]">{}</android.widget.ListView></hierarchy>'.format(rows))
+
+    def execute(self, command, params=None):
+        self.swipes += 1
+        actions = params['actions'][0]['actions']
+        down = actions[0]['y'] > actions[2]['y']
+        self.position = max(0, min(25, self.position + (4 if down else -4)))
+        self.render()
+        return {'value': None}
+
+
+def device_browser(device=None):
+    browser = Browser(BrowserType.FAKE_MOBILE, default_timeout=0)
+    browser.wd_instance = device or ListDevice()
+    return browser
+
+
+def test_scroll_to_element_keeps_going_from_where_the_list_is():
+    browser = device_browser()
+    assert browser.android_scroll_to_element("Row 12", log=False).text == "Row 12"
+    swipes = browser.wd_instance.swipes
+    assert browser.android_scroll_to_element("Row 14", log=False).text == "Row 14"
+    assert browser.wd_instance.swipes - swipes <= 1
+    assert browser.android_scroll_to_element("Row 2", log=False).text == "Row 2"
+
+
+def test_scroll_to_element_gives_up_at_both_ends():
+    browser = device_browser()
+    with pytest.raises(WebDriverException):
+        browser.android_scroll_to_element("Row 99", log=False)
+
+
+def test_scroll_to_element_raises_when_the_device_cannot_find_it():
+    class ForgetfulDevice(ListDevice):
+        def find_element(self, by=None, value=None):
+            raise WebDriverException("not found")
+
+        def find_elements(self, by=None, value=None):
+            return []
+    browser = device_browser(ForgetfulDevice())
+    with pytest.raises(WebDriverException) as raised:
+        browser.android_scroll_to_element("Row 1", log=False)
+    assert "was on the screen" in str(raised.value)
+
+
+def test_scroll_collect_collects_each_row_once():
+    browser = device_browser()
+    collected = browser.android_scroll_collect(Row, predicate=lambda element: element.text.endswith("0"), log=False)
+    assert collected == ["Row 0", "Row 10", "Row 20"]
@@ -0,0 +1,53 @@
+import pytest
+from selenium.common.exceptions import InvalidSelectorException, StaleElementReferenceException
+
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+ANDROID_SOURCE = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+  <android.widget.FrameLayout index="0" class="android.widget.FrameLayout" package="com.example" bounds="[0,0][1080,1920]"
+      displayed="true" enabled="true">
+    <android.widget.TextView index="0" class="android.widget.TextView" text="Welcome back" resource-id="com.example:id/title"
+        content-desc="" bounds="[0,100][1080,200]" displayed="true" enabled="true"/>
+    <android.widget.Button index="1" class="android.widget.Button" text="Log in" resource-id="com.example:id/login"
+        content-desc="login button" bounds="[40,1700][1040,1800]" displayed="true" enabled="false"/>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+Title = WebElementLocator("Title", Find.by_id("com.example:id/title"))
+Login = WebElementLocator("Login", Find.by_accessibility_id("login button"))
+Login_By_Text = WebElementLocator("Login", Find.by_android_uiautomator('new UiSelector().textStartsWith("Log")'))
+Buttons = WebElementLocator("Buttons", Find.by_class_name("android.widget.Button"))
+Missing = WebElementLocator("Missing", Find.by_android_uiautomator('new UiSelector().text("Sign up")'))
+
+
+def fake_mobile_browser():
+    browser = Browser(BrowserType.FAKE_MOBILE, default_timeout=0)
+    browser.wd_instance.load_source(ANDROID_SOURCE)
+    return browser
+
+
+def test_locators_are_answered_from_the_page_source():
+    browser = fake_mobile_browser()
+    assert browser.get_text(Title, log=False) == "Welcome back"
+    assert browser.get_text(Login_By_Text, log=False) == "Log in"
+    assert browser.exists(Login, timeout=0, log=False)
+    assert not browser.is_enabled(Login, timeout=0, log=False)
+    assert len(Buttons.find_all_elements_matching(browser.wd_instance, 0, False)) == 1
+    assert not browser.exists(Missing, timeout=0, log=False)
+
+
+def test_elements_go_stale_when_source_is_reloaded():
+    browser = fake_mobile_browser()
+    element = Title.find_element_matching(browser.wd_instance, 0, False)
+    assert element.size == {'width': 1080, 'height': 100}
+    browser.wd_instance.load_source(ANDROID_SOURCE)
+    assert Title.find_element_matching(browser.wd_instance, 0, False) is not element
+    with pytest.raises(StaleElementReferenceException):
+        element.text
+
+
+def test_unsupported_selectors_without_a_live_driver():
+    browser = fake_mobile_browser()
+    with pytest.raises(InvalidSelectorException):
+        browser.wd_instance.find_elements("-android uiautomator", 'new UiScrollable(new UiSelector()).scrollIntoView(0)')
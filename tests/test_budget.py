@@ -0,0 +1,90 @@
+import threading
+
+import pytest
+
+from slickwd import Browser, BrowserType, Container, Find, TimeBudgetExceeded, WebElementLocator
+
+Missing = WebElementLocator("Missing", Find.by_id("missing"))
+
+
+class HomePage(Container):
+    Title = WebElementLocator("Title", Find.by_id("title"))
+    Menu = WebElementLocator("Menu", Find.by_id("menu"))
+
+    def is_current_page(self, browser):
+        return browser.exists(self.Title, timeout=0, log=False) and browser.exists(self.Menu, timeout=0, log=False)
+
+
+class BackgroundCheckPage(Container):
+    Title = WebElementLocator("Title", Find.by_id("title"))
+
+    def is_current_page(self, browser):
+        # a wait on another thread isn't nested in this one, so it is charged on its own
+        thread = threading.Thread(target=browser.exists, args=(self.Title,), kwargs={'timeout': 0, 'log': False})
+        thread.start()
+        thread.join()
+        return True
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><h1 id='title'>Home</h1>"
+                                 "<a id='menu' href='/menu'>menu</a></body></html>")
+    browser.go_to("http://example.com/", log=False)
+    return browser
+
+
+def counts(budget):
+    return dict((key, count) for key, (count, seconds) in budget.spent.items() if count)
+
+
+def test_waits_inside_another_wait_are_charged_to_the_outer_one():
+    browser = fake_browser()
+    with browser.time_budget(10) as budget:
+        browser.wait_for_page(HomePage, timeout=1, log=False)
+        browser.exists(HomePage.Title, timeout=0, log=False)
+    assert counts(budget) == {("wait_for_page", "HomePage"): 1, ("exists", HomePage.Title.describe()): 1}
+
+
+def test_waits_on_another_thread_are_charged_on_their_own():
+    browser = fake_browser()
+    with browser.time_budget(10) as budget:
+        browser.wait_for_page(BackgroundCheckPage, timeout=1, log=False)
+    assert counts(budget) == {("wait_for_page", "BackgroundCheckPage"): 1,
+                              ("exists", BackgroundCheckPage.Title.describe()): 1}
+
+
+def test_a_wait_started_after_the_budget_ran_out_raises_before_waiting():
+    browser = fake_browser()
+    with pytest.raises(TimeBudgetExceeded) as raised:
+        with browser.time_budget(0, "test_login", log=False):
+            browser.exists(HomePage.Title, log=False)
+    message = str(raised.value)
+    assert "The time budget of 0.00 seconds for test_login ran out before exists {}.".format(
+        HomePage.Title.describe()) in message
+    assert raised.value.budget.name == "test_login"
+
+
+def test_a_wait_the_budget_cut_short_raises_instead_of_returning_false():
+    browser = fake_browser()
+    with pytest.raises(TimeBudgetExceeded) as raised:
+        with browser.time_budget(0.1, log=False):
+            browser.exists(Missing, timeout=5, log=False)
+    message = str(raised.value)
+    assert "ran out during exists {}.".format(Missing.describe()) in message
+    assert "1x  exists {}".format(Missing.describe()) in message
+
+
+def test_is_displayed_raises_when_the_budget_runs_out():
+    browser = fake_browser()
+    with pytest.raises(TimeBudgetExceeded):
+        with browser.time_budget(0.1, log=False):
+            browser.is_displayed(Missing, timeout=5, log=False)
+
+
+def test_a_wait_after_the_budget_is_over_uses_its_own_timeout():
+    browser = fake_browser()
+    with browser.time_budget(10):
+        pass
+    assert browser.budget is None
+    assert not browser.exists(Missing, timeout=0, log=False)
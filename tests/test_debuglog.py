@@ -0,0 +1,106 @@
+import json
+import logging
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from slickwd import Browser, BrowserType, DebugLog, Find, WebElementLocator
+
+Message = WebElementLocator("Message", Find.by_id("message"))
+Missing = WebElementLocator("Missing", Find.by_id("missing"))
+
+
+class Collect(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def browser(tmp_path):
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><p id='message'>Hi</p></body></html>")
+    browser.enable_debug_log(directory=str(tmp_path), log=False)
+    yield browser
+    browser.quit(log=False)
+
+
+@pytest.fixture
+def collect():
+    handler = Collect()
+    logger = logging.getLogger("slickwd")
+    logger.addHandler(handler)
+    yield handler
+    logger.removeHandler(handler)
+
+
+def read_dump(filename):
+    with open(filename) as lines:
+        return [json.loads(line) for line in lines]
+
+
+def test_debug_log_keeps_debug_records_without_changing_logger_levels(browser, collect):
+    browser.go_to("http://example.com/")
+    browser.get_text(Message)
+    assert logging.getLogger("slickwd").getEffectiveLevel() == logging.WARNING
+    assert logging.getLogger("slickwd").propagate
+    messages = [record.getMessage() for record in browser.debug_log.records]
+    assert "Navigating to url 'http://example.com/'." in messages
+    assert any(record.name == "slickwd.WebElementLocator" for record in browser.debug_log.records)
+    assert collect.records == []
+
+
+def test_debug_log_records_are_formatted_only_when_dumped(browser):
+    browser.go_to("http://example.com/")
+    record = [record for record in browser.debug_log.records if record.args][0]
+    assert "%" in record.msg
+    filename = browser.dump_debug_log("lazy", log=False)
+    assert record.getMessage() in [entry['message'] for entry in read_dump(filename)]
+
+
+def test_debug_log_passes_records_at_the_logger_level_on(browser, collect):
+    browser.logger.debug("quiet")
+    browser.logger.warning("loud %s", "warning")
+    assert [record.getMessage() for record in collect.records] == ["loud warning"]
+    assert [record.getMessage() for record in browser.debug_log.records] == ["quiet", "loud warning"]
+
+
+def test_debug_log_only_keeps_its_own_browsers_records(browser):
+    other = Browser(BrowserType.FAKE, default_timeout=0)
+    other.wd_instance.add_page("http://example.com/other", "<html><body><p id='message'>Other</p></body></html>")
+    other.go_to("http://example.com/other")
+    other.get_text(Message)
+    assert other.logger is logging.getLogger("slickwd.Browser")
+    assert all("other" not in record.getMessage() for record in browser.debug_log.records)
+    other.quit(log=False)
+
+
+def test_debug_log_is_dumped_when_an_action_raises(browser, tmp_path):
+    browser.go_to("http://example.com/")
+    with pytest.raises(WebDriverException):
+        browser.get_text(Missing)
+    [filename] = browser.debug_log.dumped
+    assert filename.startswith(str(tmp_path)) and filename.endswith("-get_text.jsonl")
+    assert any("Missing" in entry['message'] for entry in read_dump(filename))
+
+
+def test_debug_log_is_not_dumped_when_dump_on_error_is_off(browser):
+    browser.enable_debug_log(directory=browser.debug_log.directory, dump_on_error=False, log=False)
+    with pytest.raises(WebDriverException):
+        browser.get_text(Missing)
+    assert browser.debug_log.dumped == []
+    assert len(browser.debug_log.records) > 0
+
+
+def test_debug_log_can_be_dumped_after_quit():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    debug_log = browser.enable_debug_log(directory=".", dump_on_error=False, log=False)
+    browser.logger.debug("before quit")
+    browser.quit(log=False)
+    assert browser.logger is logging.getLogger("slickwd.Browser")
+    assert browser.wd_instance not in DebugLog.drivers
+    browser.logger.debug("after quit")
+    assert [record.getMessage() for record in debug_log.records] == ["before quit"]
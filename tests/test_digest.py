@@ -0,0 +1,45 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+Message = WebElementLocator("Message", Find.by_id("message"))
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/one", "<html><body><p id='message'>Hello world</p></body></html>")
+    browser.wd_instance.add_page("http://example.com/two", "<html><body><p id='message'>Goodbye</p></body></html>")
+    browser.wd_instance.add_page("http://example.com/copy", "<html><body><div id='message'>Hello world</div>"
+                                 "</body></html>")
+    browser.go_to("http://example.com/one", log=False)
+    return browser
+
+
+def test_digest_matches_for_same_text():
+    browser = fake_browser()
+    digest = browser.get_digest(log=False)
+    assert digest == browser.get_digest(log=False)
+    browser.go_to("http://example.com/copy", log=False)
+    assert browser.get_digest(log=False) == digest
+    assert browser.get_digest(structure=True, log=False) != digest
+
+
+def test_wait_for_change_returns_new_digest():
+    browser = fake_browser()
+    digest = browser.get_digest(Message, log=False)
+    browser.go_to("http://example.com/two", log=False)
+    assert browser.wait_for_change(digest, Message, log=False) == browser.get_digest(Message, log=False)
+
+
+def test_wait_for_change_raises_when_nothing_changes():
+    browser = fake_browser()
+    digest = browser.get_digest(log=False)
+    with pytest.raises(WebDriverException):
+        browser.wait_for_change(digest, timeout=0, log=False)
+
+
+def test_contains_text():
+    browser = fake_browser()
+    assert browser.contains_text("world", log=False)
+    assert not browser.contains_text("Goodbye", Message, log=False)
@@ -0,0 +1,47 @@
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+Row = WebElementLocator("Row", Find.by_css_selector("tr.row"))
+Next = WebElementLocator("Next", Find.by_css_selector("a.next"))
+
+
+def results_page(names, next_url=None):
+    rows = "".join(["<tr class='row' data-id='{0}'><td class='name a:b'>{1}</td><td><a href='/{1}'>link</a></td>"
+                    "</tr>".format(index, name) for index, name in enumerate(names)])
+    pager = "<a class='next' href='{}'>next</a>".format(next_url) if next_url else ""
+    return "<html><body><table>{}</table>{}</body></html>".format(rows, pager)
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/1", results_page(["Alice", "Bob"], "/2"))
+    browser.wd_instance.add_page("http://example.com/2", results_page(["Carol"], "/3"))
+    # the last page links to itself, so clicking next doesn't change anything
+    browser.wd_instance.add_page("http://example.com/3", results_page(["Dave"], "/3"))
+    browser.go_to("http://example.com/1", log=False)
+    return browser
+
+
+def test_extract_rows_reads_text_and_attributes():
+    browser = fake_browser()
+    rows = browser.extract_rows(Row, [("name", Find.by_css_selector("td")), ("link", (Find.by_tag_name("a"), "href")),
+                                      ("id", "data-id")], log=False)
+    assert rows == [{"name": "Alice", "link": "http://example.com/Alice", "id": "0"},
+                    {"name": "Bob", "link": "http://example.com/Bob", "id": "1"}]
+
+
+def test_extract_rows_class_name_with_css_special_characters():
+    browser = fake_browser()
+    rows = browser.extract_rows(Row, {"name": Find.by_class_name("a:b")}, log=False)
+    assert rows == [{"name": "Alice"}, {"name": "Bob"}]
+
+
+def test_extract_rows_follows_next_page_until_it_stops_changing():
+    browser = fake_browser()
+    pages = list(browser.iter_extracted_rows(Row, {"name": Find.by_css_selector("td")}, next_page=Next, log=False))
+    assert pages == [[{"name": "Alice"}, {"name": "Bob"}], [{"name": "Carol"}], [{"name": "Dave"}]]
+
+
+def test_extract_rows_max_pages():
+    browser = fake_browser()
+    rows = browser.extract_rows(Row, {"name": Find.by_css_selector("td")}, next_page=Next, max_pages=2, log=False)
+    assert [row["name"] for row in rows] == ["Alice", "Bob", "Carol"]
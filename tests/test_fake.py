@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from slickwd import Browser, BrowserType, Container, Find, WebElementLocator
+
+PAGE = """<html><body>
+<form><input id='name' name='name' value=''><input id='agree' type='checkbox'>
+<input id='secret' type='hidden' value='x'></form>
+<p id='hidden' style='display: none'>hidden</p><a id='next' href='/two'>next</a>
+</body></html>"""
+
+
+class TwoPage(Container):
+    Heading = WebElementLocator("Heading", Find.by_id("two"))
+
+    def is_current_page(self, browser):
+        return browser.exists(self.Heading, timeout=0, log=False)
+
+
+Name = WebElementLocator("Name", Find.by_name("name"))
+Agree = WebElementLocator("Agree", Find.by_id("agree"))
+Hidden = WebElementLocator("Hidden", Find.by_xpath("//p[@id='hidden']"))
+Secret = WebElementLocator("Secret", Find.by_css_selector("#secret"))
+Next = WebElementLocator("Next", Find.by_link_text("next"))
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/one", PAGE)
+    browser.wd_instance.add_page("http://example.com/two", "<html><body><h1 id='two'>two</h1></body></html>")
+    browser.go_to("http://example.com/one", log=False)
+    return browser
+
+
+def test_type_keeps_unicode_text():
+    browser = fake_browser()
+    browser.type(Name, "Zoë 東京", log=False)
+    assert browser.get_attribute_value(Name, "value", log=False) == "Zoë 東京"
+
+
+def test_checkbox_click():
+    browser = fake_browser()
+    assert not browser.get_checkbox_state(Agree, log=False)
+    browser.set_checkbox_state(Agree, True, timeout=1, log=False)
+    assert browser.get_checkbox_state(Agree, log=False)
+
+
+def test_only_inline_styles_hide_elements():
+    browser = fake_browser()
+    assert not browser.is_displayed(Hidden, log=False)
+    assert not browser.is_displayed(Secret, log=False)
+    assert browser.is_displayed(Name, log=False)
+
+
+def test_clicking_a_link_loads_the_page():
+    browser = fake_browser()
+    browser.click(Next, log=False)
+    browser.wait_for_page(TwoPage, timeout=1, log=False)
+    assert browser.get_url(log=False) == "http://example.com/two"
+
+
+def test_session_storage_survives_navigation_within_origin():
+    browser = fake_browser()
+    browser.wd_instance.execute_script(Browser.SET_STORAGE_JS, {}, {'tab': '1'})
+    browser.go_to("http://example.com/two", log=False)
+    assert browser.wd_instance.execute_script(Browser.GET_STORAGE_JS)[2] == {'tab': '1'}
+    browser.wd_instance.add_page("http://other.example.com/", "<html><body></body></html>")
+    browser.go_to("http://other.example.com/", log=False)
+    assert browser.wd_instance.execute_script(Browser.GET_STORAGE_JS)[2] == {}
@@ -0,0 +1,52 @@
+import pytest
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.command import Command
+
+from slickwd import Browser, BrowserType, Find, Gesture, WebElementLocator
+
+Menu = WebElementLocator("Menu", Find.by_id("menu"))
+
+
+def fake_browser(monkeypatch):
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.load_html("<html><body><button id='menu'>menu</button></body></html>")
+    browser.wd_instance.w3c = True
+    sent = []
+    monkeypatch.setattr(browser.wd_instance, "execute", lambda command, params=None: sent.append((command, params)))
+    return browser, sent
+
+
+def test_gesture_is_sent_in_one_command(monkeypatch):
+    browser, sent = fake_browser(monkeypatch)
+    element = Menu.find_element_matching(browser.wd_instance, 0, False)
+    browser.gesture().tap(Menu, offset=(5, 0)).swipe((100, 500), (100, 100), duration=0.25).perform(log=False)
+    assert len(sent) == 1
+    command, params = sent[0]
+    assert command == Command.W3C_ACTIONS
+    assert len(params['actions']) == 1
+    actions = params['actions'][0]['actions']
+    assert actions[0] == {'type': 'pointerMove', 'duration': 0, 'origin': {Gesture.ELEMENT_KEY: element.id},
+                          'x': 5, 'y': 0}
+    assert actions[4:] == [{'type': 'pointerMove', 'duration': 0, 'origin': 'viewport', 'x': 100, 'y': 500},
+                           {'type': 'pointerDown', 'button': 0},
+                           {'type': 'pointerMove', 'duration': 250, 'origin': 'viewport', 'x': 100, 'y': 100},
+                           {'type': 'pointerUp', 'button': 0}]
+
+
+def test_pinch_moves_two_fingers_at_the_same_time(monkeypatch):
+    browser, sent = fake_browser(monkeypatch)
+    actions = browser.gesture().tap((1, 1)).pinch((200, 300), 200, 50).get_actions()
+    first, second = [source['actions'] for source in actions]
+    assert len(first) == len(second)
+    # the second finger waits while the first one taps
+    assert [action['type'] for action in second[:4]] == ['pause'] * 4
+    assert first[4]['x'] == 100 and second[4]['x'] == 300
+    assert first[6]['x'] == 175 and second[6]['x'] == 225
+
+
+def test_gesture_needs_a_w3c_session(monkeypatch):
+    browser, sent = fake_browser(monkeypatch)
+    browser.wd_instance.w3c = False
+    with pytest.raises(WebDriverException):
+        browser.gesture().tap((1, 1)).perform(log=False)
+    assert sent == []
@@ -0,0 +1,53 @@
+import pytest
+
+from slickwd import Browser, BrowserGroup, BrowserGroupError, BrowserType, Find, WebElementLocator
+
+Message = WebElementLocator("Message", Find.by_id("message"))
+
+
+def fake_browser(text):
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><p id='message'>{}</p></body></html>".format(text))
+    return browser
+
+
+def test_group_runs_browser_methods_on_every_browser():
+    group = BrowserGroup([fake_browser("one"), fake_browser("two")])
+    group.go_to("http://example.com/", log=False)
+    results = group.get_text(Message, log=False)
+    assert [result.value for result in results] == ["one", "two"]
+    assert all(result.succeeded for result in results)
+    group.quit(log=False)
+
+
+def test_group_raises_with_every_result_when_one_browser_fails():
+    group = BrowserGroup([fake_browser("one"), Browser(BrowserType.FAKE, default_timeout=0)])
+    with pytest.raises(BrowserGroupError) as raised:
+        group.go_to("http://example.com/", log=False)
+    results = raised.value.results
+    assert results[0].succeeded
+    assert not results[1].succeeded
+    group.quit(log=False)
+
+
+def test_group_only_proxies_instance_methods():
+    group = BrowserGroup([fake_browser("one")])
+    with pytest.raises(AttributeError):
+        group.session_state_file("admin")
+    with pytest.raises(AttributeError):
+        group._budget_timeout
+    group.quit(log=False)
+
+
+def test_create_needs_a_browser_type():
+    with pytest.raises(BrowserGroupError):
+        BrowserGroup.create([])
+
+
+def test_create_reports_browsers_that_failed_to_start():
+    with pytest.raises(BrowserGroupError) as raised:
+        BrowserGroup.create([BrowserType.FAKE, "not a browser"])
+    results = raised.value.results
+    assert results[0].succeeded
+    assert results[1].browser is None
+    assert "not a browser" in str(raised.value)
@@ -0,0 +1,40 @@
+from appium.webdriver.common.mobileby import MobileBy
+from selenium.webdriver.common.by import By
+
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+IOS_SOURCE = """<?xml version="1.0" encoding="UTF-8"?>
+<XCUIElementTypeApplication type="XCUIElementTypeApplication" name="Example" x="0" y="0" width="375" height="812">
+  <XCUIElementTypeWindow type="XCUIElementTypeWindow" x="0" y="0" width="375" height="812" visible="true">
+    <XCUIElementTypeButton type="XCUIElementTypeButton" name="login" label="Log in" enabled="true" visible="true"
+        x="20" y="700" width="335" height="50"/>
+    <XCUIElementTypeButton type="XCUIElementTypeButton" name="signup" label="Sign up" enabled="false" visible="true"
+        x="20" y="760" width="335" height="50"/>
+  </XCUIElementTypeWindow>
+</XCUIElementTypeApplication>"""
+
+
+def test_by_ios_uiautomation_uses_the_uiautomation_strategy():
+    assert Find.by_ios_uiautomation(".buttons()[0]").finders == [(MobileBy.IOS_UIAUTOMATION, ".buttons()[0]")]
+
+
+def test_by_ios_xpath_uses_faster_strategies():
+    assert Find.by_ios_xpath("//*[@name='login']").finders == [(MobileBy.ACCESSIBILITY_ID, "login")]
+    assert Find.by_ios_xpath("//XCUIElementTypeButton[@label='Log in' and @enabled='true']").finders == \
+        [(MobileBy.IOS_CLASS_CHAIN, '**/XCUIElementTypeButton[`label == "Log in" AND enabled == 1`]')]
+    assert Find.by_ios_xpath("/XCUIElementTypeApplication/XCUIElementTypeWindow/XCUIElementTypeButton[2]").finders == \
+        [(MobileBy.IOS_CLASS_CHAIN, 'XCUIElementTypeWindow/XCUIElementTypeButton[2]')]
+    # an index of every match, and functions a class chain doesn't have, stay xpath
+    for xpath in ("//XCUIElementTypeButton[2]", "//XCUIElementTypeButton[last()]"):
+        assert Find.by_ios_xpath(xpath).finders == [(By.XPATH, xpath)]
+
+
+def test_class_chains_and_predicates_against_page_source():
+    browser = Browser(BrowserType.FAKE_MOBILE, default_timeout=0)
+    browser.wd_instance.load_source(IOS_SOURCE)
+    login = WebElementLocator("Login", Find.by_ios_xpath("//XCUIElementTypeButton[starts-with(@label, 'Log')]"))
+    signup = WebElementLocator("Sign Up", Find.by_ios_predicate("label == 'Sign up' AND enabled == false"))
+    second = WebElementLocator("Second", Find.by_ios_class_chain("**/XCUIElementTypeWindow/XCUIElementTypeButton[2]"))
+    assert browser.get_attribute_value(login, "name", log=False) == "login"
+    assert browser.get_attribute_value(signup, "name", log=False) == "signup"
+    assert browser.get_attribute_value(second, "name", log=False) == "signup"
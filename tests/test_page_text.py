@@ -0,0 +1,41 @@
+import io
+
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+Message = WebElementLocator("Message", Find.by_id("message"))
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><h1>Title</h1>"
+                                 "<p id='message'>Hello wide world</p></body></html>")
+    browser.go_to("http://example.com/", log=False)
+    return browser
+
+
+def test_iter_page_text_chunks_join_to_the_text():
+    browser = fake_browser()
+    chunks = list(browser.iter_page_text(Message, chunk_size=4, log=False))
+    assert all(len(chunk) <= 4 for chunk in chunks)
+    assert "".join(chunks) == "Hello wide world"
+
+
+def test_iter_page_source_returns_html():
+    browser = fake_browser()
+    source = "".join(browser.iter_page_source(chunk_size=16, log=False))
+    assert "<p id=\"message\">Hello wide world</p>" in source
+
+
+def test_find_in_page_text_across_chunk_boundaries():
+    browser = fake_browser()
+    text = "Title\nHello wide world"
+    assert browser.find_in_page_text("wide world", chunk_size=3, log=False) == text.index("wide world")
+    assert browser.find_in_page_text("missing", chunk_size=3, log=False) == -1
+
+
+def test_save_page_text(tmp_path):
+    browser = fake_browser()
+    filename = str(tmp_path / "page.txt")
+    assert browser.save_page_text(filename, Message, chunk_size=5, log=False) == len("Hello wide world")
+    with io.open(filename, encoding='utf-8') as saved:
+        assert saved.read() == "Hello wide world"
@@ -0,0 +1,60 @@
+from slickwd import Browser, BrowserType, Container, Find, PerformanceStore, PinnedScripts, WebElementLocator
+
+
+class HomePage(Container):
+    Title = WebElementLocator("Title", Find.by_id("title"))
+
+    def is_current_page(self, browser):
+        return browser.exists(self.Title, timeout=0, log=False)
+
+
+def fake_browser(monkeypatch, load_times):
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><h1 id='title'>Home</h1></body></html>")
+    execute_script = browser.wd_instance.execute_script
+    load_times = iter(load_times)
+
+    def fake_metrics(script, *args):
+        if script == Browser.PERFORMANCE_JS:
+            return {'navigation.load': next(load_times)}
+        return execute_script(script, *args)
+    monkeypatch.setattr(browser.wd_instance, "execute_script", fake_metrics)
+    return browser
+
+
+def test_samples_are_attributed_to_the_page_found_next(monkeypatch):
+    browser = fake_browser(monkeypatch, [100, 5])
+    store = browser.enable_performance_capture()
+    browser.go_to("http://example.com/", log=False)
+    assert store.samples == []
+    browser.wait_for_page(HomePage, timeout=1, log=False)
+    assert [(sample['page'], sample['action']) for sample in store.samples] == \
+        [("Home", "go_to"), ("Home", "wait_for_page")]
+    assert store.percentiles(action="go_to") == {"Home": {'navigation.load': {50: 100, 90: 100, 95: 100}}}
+
+
+def test_go_to_always_installs_the_performance_script(monkeypatch):
+    browser = fake_browser(monkeypatch, [1, 2])
+    browser.enable_performance_capture()
+    installed = []
+    install = PinnedScripts.install
+
+    def recording_install(wd_browser, source, *args):
+        installed.append(source)
+        return install(wd_browser, source, *args)
+    monkeypatch.setattr(PinnedScripts, "install", recording_install)
+    browser.go_to("http://example.com/", log=False)
+    browser.go_to("http://example.com/", log=False, test_for_angular=True)
+    assert installed == [Browser.PERFORMANCE_JS, Browser.PERFORMANCE_JS]
+
+
+def test_percentiles_interpolate_and_persist(tmp_path):
+    assert PerformanceStore.percentile([1, 2, 3, 4], 50) == 2.5
+    assert PerformanceStore.percentile([], 50) is None
+    filename = str(tmp_path / "performance.jsonl")
+    store = PerformanceStore(filename)
+    for load in (10, 20, 30):
+        store.add({'page': "Home", 'action': "go_to", 'url': "http://example.com/", 'time': 0,
+                   'metrics': {'navigation.load': load, 'paint.first-paint': None}})
+    reloaded = PerformanceStore(filename)
+    assert reloaded.percentiles("Home", percents=(50, 100)) == {"Home": {'navigation.load': {50: 20, 100: 30}}}
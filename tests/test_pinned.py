@@ -0,0 +1,67 @@
+from slickwd import PinnedScripts
+
+BIG_SCRIPT = "var total = 0;\n" + "total += arguments[0];\n" * 50 + "return total;"
+
+
+class PinningDriver(object):
+    """
+    Runs BIG_SCRIPT in python, and keeps the functions a page has pinned on window.__slickwd like a browser would.
+    """
+
+    def __init__(self):
+        self.pinned = {}
+        self.sent = []
+
+    def navigate(self):
+        self.pinned = {}
+
+    def execute_script(self, script, *args):
+        self.sent.append(script)
+        name = PinnedScripts.name_of(BIG_SCRIPT)
+        if script == PinnedScripts.STUB_JS:
+            if args[0] not in self.pinned:
+                return {'__slickwdMissing': True}
+            return self.pinned[args[0]](*args[1:])
+        if script == PinnedScripts.INSTALL_JS.format(name=name, source=BIG_SCRIPT, call="return "):
+            self.pinned[name] = lambda value: value * 50
+            return self.pinned[name](*args)
+        if script == BIG_SCRIPT:
+            return args[0] * 50
+        return "sent as is"
+
+
+def test_script_is_only_sent_once_per_page():
+    driver = PinningDriver()
+    assert PinnedScripts.execute(driver, BIG_SCRIPT, 2) == 100
+    assert driver.sent == [PinnedScripts.STUB_JS, driver.sent[1]]
+    assert BIG_SCRIPT in driver.sent[1]
+    assert PinnedScripts.execute(driver, BIG_SCRIPT, 3) == 150
+    assert driver.sent[2:] == [PinnedScripts.STUB_JS]
+
+
+def test_script_is_installed_again_after_navigating():
+    driver = PinningDriver()
+    PinnedScripts.execute(driver, BIG_SCRIPT, 1)
+    driver.navigate()
+    driver.sent = []
+    before = dict(PinnedScripts.stats)
+    assert PinnedScripts.execute(driver, BIG_SCRIPT, 1) == 50
+    assert len(driver.sent) == 2
+    assert PinnedScripts.stats['calls'] == before['calls'] + 1
+    assert PinnedScripts.stats['installs'] == before['installs'] + 1
+
+
+def test_install_skips_the_stub():
+    driver = PinningDriver()
+    assert PinnedScripts.install(driver, BIG_SCRIPT, 1) == 50
+    assert len(driver.sent) == 1
+    assert PinnedScripts.execute(driver, BIG_SCRIPT, 1) == 50
+    assert driver.sent[1:] == [PinnedScripts.STUB_JS]
+
+
+def test_short_scripts_and_fake_drivers_get_the_whole_script():
+    driver = PinningDriver()
+    assert PinnedScripts.execute(driver, "return 1;") == "sent as is"
+    driver.supports_pinned_scripts = False
+    assert PinnedScripts.execute(driver, BIG_SCRIPT, 2) == 100
+    assert driver.sent == ["return 1;", BIG_SCRIPT]
@@ -0,0 +1,30 @@
+from slickwd import Browser, BrowserType, PooledRemoteConnection
+
+
+def test_remote_browsers_share_one_connection_pool(hub):
+    first = Browser(BrowserType.CHROME, remote_url=hub.remote_url)
+    second = Browser(BrowserType.CHROME, remote_url=hub.remote_url)
+    for i in range(5):
+        first.get_url(log=False)
+        second.get_url(log=False)
+    stats = first.get_connection_stats()
+    assert stats == second.get_connection_stats()
+    assert stats['requests'] == len(hub.requests)
+    assert stats['connections'] <= 2
+    assert stats['reused'] == stats['requests'] - stats['connections']
+
+
+def test_command_timeouts_by_command_name(hub, monkeypatch):
+    executor = PooledRemoteConnection(hub.remote_url, default_command_timeout=5, command_timeouts={'get': 60})
+    browser = Browser(BrowserType.CHROME, remote_url=hub.remote_url, command_executor=executor)
+    manager = executor._conn.manager
+    timeouts = []
+    original = manager.request
+
+    def request(method, url, **kwargs):
+        timeouts.append(kwargs.get('timeout'))
+        return original(method, url, **kwargs)
+    monkeypatch.setattr(manager, "request", request)
+    browser.go_to("http://example.com/", log=False)
+    assert browser.get_url(log=False) == "http://example.com/"
+    assert timeouts == [60, 5]
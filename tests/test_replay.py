@@ -0,0 +1,62 @@
+import json
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from slickwd import Browser, BrowserType, ReplayConnection
+
+
+def record(hub, filename):
+    browser = Browser(BrowserType.CHROME, remote_url=hub.remote_url)
+    recorder = browser.start_recording(filename, log=False)
+    browser.go_to("http://example.com/one", log=False)
+    assert browser.get_url(log=False) == "http://example.com/one"
+    browser.go_to("http://example.com/two", log=False)
+    assert browser.get_url(log=False) == "http://example.com/two"
+    assert browser.stop_recording(log=False) is recorder
+    assert browser.stop_recording(log=False) is None
+    return recorder
+
+
+def test_recording_writes_one_line_per_command(hub, tmp_path):
+    filename = str(tmp_path / "trace.jsonl")
+    recorder = record(hub, filename)
+    assert recorder.counts == {'get': 2, 'getCurrentUrl': 2}
+    with open(filename) as trace:
+        entries = [json.loads(line) for line in trace]
+    assert entries[0]['session'] == "fake-session"
+    assert [entry['c'] for entry in entries[1:]] == ['get', 'getCurrentUrl', 'get', 'getCurrentUrl']
+
+
+def test_replay_answers_commands_in_order(hub, tmp_path):
+    filename = str(tmp_path / "trace.jsonl")
+    record(hub, filename)
+    browser = Browser.replay(filename)
+    browser.go_to("http://example.com/one", log=False)
+    assert browser.get_url(log=False) == "http://example.com/one"
+    browser.go_to("http://example.com/two", log=False)
+    assert browser.get_url(log=False) == "http://example.com/two"
+    # out of order, the last matching command seen is used
+    assert browser.get_url(log=False) == "http://example.com/two"
+    connection = browser.wd_instance.command_executor
+    while not isinstance(connection, ReplayConnection):
+        connection = connection.command_executor
+    assert connection.stats['served'] == 5
+    assert connection.stats['missing'] == 0
+    browser.get_title(log=False)
+    assert connection.stats['missing'] == 1
+
+
+def test_strict_replay_raises_for_commands_not_in_the_trace(hub, tmp_path):
+    filename = str(tmp_path / "trace.jsonl")
+    record(hub, filename)
+    browser = Browser.replay(filename, strict=True)
+    with pytest.raises(WebDriverException):
+        browser.get_title(log=False)
+
+
+def test_replay_needs_a_trace(tmp_path):
+    filename = tmp_path / "empty.jsonl"
+    filename.write_text(u"")
+    with pytest.raises(WebDriverException):
+        Browser.replay(str(filename))
@@ -0,0 +1,74 @@
+import os
+import sys
+
+from slickwd import BrowserType, discover_tests, run_tests, shard_tests
+
+TEST_MODULE = """
+from {prefix}pages import NAME
+
+
+def test_{name}_passes(browser):
+    browser.wd_instance.load_html("<p id='name'>{{}}</p>".format(NAME))
+
+
+def test_{name}_fails(browser):
+    from {prefix}late_helper import VALUE
+    assert VALUE == NAME
+
+
+def helper(browser):
+    pass
+"""
+
+
+def write(path, text):
+    with open(str(path), 'w') as output:
+        output.write(text)
+
+
+def make_suite(directory, name, package=False):
+    directory.mkdir()
+    if package:
+        write(directory / "__init__.py", "")
+    write(directory / "pages.py", "NAME = {!r}\n".format(name))
+    write(directory / "late_helper.py", "VALUE = 'late'\n")
+    write(directory / "test_{}.py".format(name), TEST_MODULE.format(name=name, prefix="." if package else ""))
+    write(directory / "notes.py", "def test_not_collected(browser):\n    pass\n")
+    return str(directory)
+
+
+def test_discover_tests_finds_functions_that_take_a_browser(tmp_path):
+    directory = make_suite(tmp_path / "suite", "alone")
+    test_ids = discover_tests([directory])
+    assert [test_id.rsplit("::", 1)[1] for test_id in test_ids] == ["test_alone_fails", "test_alone_passes"]
+
+
+def test_packages_keep_their_helper_modules_apart(tmp_path):
+    first = make_suite(tmp_path / "runner_first", "first", package=True)
+    second = make_suite(tmp_path / "runner_second", "second", package=True)
+    test_ids = discover_tests([first, second])
+    assert len(test_ids) == 4
+    assert sys.modules["runner_first.pages"].NAME == "first"
+    assert sys.modules["runner_second.pages"].NAME == "second"
+
+
+def test_shard_tests_balances_by_duration():
+    durations = {"a": 10.0, "b": 6.0, "c": 5.0, "d": 1.0}
+    shards = shard_tests(["a", "b", "c", "d", "e"], 2, durations)
+    assert shards == [["a", "c"], ["b", "e", "d"]]
+    assert shard_tests(["a"], 3) == [["a"], [], []]
+
+
+def test_run_tests_reports_every_test(tmp_path):
+    directory = make_suite(tmp_path / "suite", "run")
+    durations_file = str(tmp_path / "durations.json")
+    test_ids = discover_tests([directory])
+    results = dict((result.test_id, result) for result in
+                   run_tests(test_ids, BrowserType.FAKE, workers=2, durations_file=durations_file, default_timeout=0))
+    passed, failed = [test_id for test_id in test_ids if test_id.endswith("_passes")], \
+        [test_id for test_id in test_ids if test_id.endswith("_fails")]
+    assert results[passed[0]].status == "pass"
+    # the helper is imported while the test runs, long after the module was loaded
+    assert results[failed[0]].status == "fail"
+    assert "AssertionError" in results[failed[0]].message
+    assert os.path.exists(durations_file)
@@ -0,0 +1,85 @@
+import base64
+import io
+import json
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException, WebDriverException
+from selenium.webdriver.remote.errorhandler import ErrorHandler
+
+from slickwd import Browser, BrowserType, CommandErrorHandler, Find, UnsupportedCommandException, WebElementLocator
+
+Image = pytest.importorskip("PIL.Image")
+
+Box = WebElementLocator("Box", Find.by_id("box"))
+
+
+def page_png():
+    output = io.BytesIO()
+    Image.new("RGB", (20, 10), (255, 255, 255)).save(output, format="PNG")
+    return output.getvalue()
+
+
+def screenshot_browser(element_error):
+    """A fake browser that can take page screenshots, where element screenshots raise element_error."""
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><div id='box'>Box</div></body></html>")
+    browser.go_to("http://example.com/", log=False)
+    driver = browser.wd_instance
+    driver.element_screenshots = 0
+
+    def element_screenshot():
+        driver.element_screenshots += 1
+        raise element_error
+
+    execute_script = driver.execute_script
+
+    def execute_element_rect(script, *args):
+        if script == Browser.ELEMENT_RECT_JS:
+            return [2, 1, 4, 3, 1.0]
+        return execute_script(script, *args)
+
+    # the fake element screenshot calls get_screenshot_as_png, the page screenshot get_screenshot_as_base64
+    driver.get_screenshot_as_png = element_screenshot
+    driver.get_screenshot_as_base64 = lambda: base64.b64encode(page_png()).decode('ascii')
+    driver.execute_script = execute_element_rect
+    return browser
+
+
+def test_unsupported_element_screenshots_crop_the_page_from_then_on():
+    browser = screenshot_browser(UnsupportedCommandException("unknown command"))
+    png = browser.screenshot(Box, log=False)
+    assert Image.open(io.BytesIO(png)).size == (4, 3)
+    browser.screenshot(Box, log=False)
+    assert browser.wd_instance.element_screenshots == 1
+
+
+def test_a_failed_element_screenshot_is_tried_again_next_time():
+    # the message alone doesn't decide it, only the status the driver answered with
+    browser = screenshot_browser(WebDriverException("element screenshot not supported while the element is moving"))
+    png = browser.screenshot(Box, log=False)
+    assert Image.open(io.BytesIO(png)).size == (4, 3)
+    browser.screenshot(Box, log=False)
+    assert browser.wd_instance.element_screenshots == 2
+
+
+def error_response(status, error, message="no such command"):
+    if error is None:
+        return {'status': status, 'value': {'message': message}}
+    return {'status': status, 'value': json.dumps({'value': {'error': error, 'message': message}})}
+
+
+@pytest.mark.parametrize("response", [
+    error_response(404, "unknown command"),
+    error_response(500, "unsupported operation"),
+    error_response(9, None),
+])
+def test_error_handler_raises_unsupported_command_for_the_unknown_command_status(response):
+    with pytest.raises(UnsupportedCommandException):
+        CommandErrorHandler(ErrorHandler()).check_response(response)
+
+
+def test_error_handler_keeps_other_errors():
+    with pytest.raises(NoSuchElementException) as raised:
+        CommandErrorHandler(ErrorHandler()).check_response(error_response(404, "no such element", "unknown command"))
+    assert not isinstance(raised.value, UnsupportedCommandException)
+    CommandErrorHandler(ErrorHandler()).check_response({'status': 0, 'value': None})
@@ -0,0 +1,76 @@
+import threading
+import time
+
+from slickwd import Browser, BrowserType, CommandRecorder, SerializedConnection
+
+
+class SlowExecutor(object):
+    def __init__(self):
+        self.sent = []
+
+    def execute(self, command, params):
+        self.sent.append(command)
+        time.sleep(.01)
+        return {'status': 0, 'value': command}
+
+
+def run_in_thread(function):
+    thread = threading.Thread(target=function)
+    thread.start()
+    return thread
+
+
+def test_locked_keeps_other_threads_commands_out():
+    executor = SlowExecutor()
+    connection = SerializedConnection(executor)
+    inside = threading.Event()
+
+    def other_thread():
+        inside.wait()
+        connection.execute("other", {})
+    thread = run_in_thread(other_thread)
+    with connection.locked():
+        connection.execute("switch", {})
+        inside.set()
+        time.sleep(.05)
+        with connection.locked():
+            connection.execute("use", {})
+    thread.join()
+    assert executor.sent == ["switch", "use", "other"]
+
+
+def test_background_commands_let_waiting_foreground_commands_go_first():
+    executor = SlowExecutor()
+    connection = SerializedConnection(executor)
+
+    def background_thread():
+        with connection.background():
+            connection.execute("background", {})
+    with connection.locked():
+        connection.execute("held", {})
+        background = run_in_thread(background_thread)
+        time.sleep(.05)
+        foreground = run_in_thread(lambda: connection.execute("foreground", {}))
+        time.sleep(.05)
+    background.join()
+    foreground.join()
+    assert executor.sent == ["held", "foreground", "background"]
+
+
+def test_recorder_counts_commands_from_many_threads(tmp_path):
+    recorder = CommandRecorder(SerializedConnection(SlowExecutor()), str(tmp_path / "trace.jsonl"), "session", {},
+                               True)
+    threads = [run_in_thread(lambda: [recorder.execute("getTitle", {}) for i in range(10)]) for j in range(5)]
+    for thread in threads:
+        thread.join()
+    recorder.close()
+    assert recorder.counts == {"getTitle": 50}
+    with open(str(tmp_path / "trace.jsonl")) as trace:
+        assert len(trace.readlines()) == 51
+
+
+def test_browser_locked_without_a_command_connection():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    with browser.locked():
+        with browser.locked():
+            browser.wd_instance.load_html("<p>locked</p>")
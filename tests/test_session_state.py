@@ -0,0 +1,49 @@
+import os
+import stat
+
+from slickwd import Browser, BrowserType
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/login", "<html><body><p>login</p></body></html>")
+    browser.wd_instance.add_page("http://example.com/home", "<html><body><p>home</p></body></html>")
+    browser.go_to("http://example.com/login", log=False)
+    return browser
+
+
+def logged_in_browser():
+    browser = fake_browser()
+    browser.wd_instance.add_cookie({'name': 'session', 'value': 'secret'})
+    browser.wd_instance.add_cookie({'name': 'old', 'value': 'gone', 'expiry': 1})
+    browser.wd_instance.execute_script(Browser.SET_STORAGE_JS, {'token': 'abc'}, {'tab': '1'})
+    browser.go_to("http://example.com/home", log=False)
+    return browser
+
+
+def test_set_session_state_restores_cookies_and_storage():
+    state = logged_in_browser().get_session_state(log=False)
+    assert state['origin'] == "http://example.com"
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com", "<html><body></body></html>")
+    browser.wd_instance.add_page("http://example.com/home", "<html><body><p>home</p></body></html>")
+    browser.set_session_state(state, log=False)
+    assert browser.get_url(log=False) == "http://example.com/home"
+    assert browser.wd_instance.get_cookie('session')['value'] == 'secret'
+    assert browser.wd_instance.get_cookie('old') is None
+    origin, local_storage, session_storage = browser.wd_instance.execute_script(Browser.GET_STORAGE_JS)
+    assert local_storage == {'token': 'abc'}
+    assert session_storage == {'tab': '1'}
+
+
+def test_save_and_restore_session_state(tmp_path):
+    directory = str(tmp_path)
+    logged_in_browser().save_session_state("admin", "staging", directory, log=False)
+    filename = Browser.session_state_file("admin", "staging", directory)
+    if hasattr(os, 'getuid'):
+        assert stat.S_IMODE(os.stat(filename).st_mode) == 0o600
+    browser = fake_browser()
+    assert browser.restore_session_state("admin", "staging", directory=directory, log=False)
+    assert browser.wd_instance.get_cookie('session')['value'] == 'secret'
+    assert not browser.restore_session_state("admin", "production", directory=directory, log=False)
+    assert not browser.restore_session_state("admin", "staging", max_age=-1, directory=directory, log=False)
@@ -0,0 +1,31 @@
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+PAGE = """<html><body>
+<app-card><template shadowrootmode="open"><button class="save">First</button></template></app-card>
+<app-card><template shadowrootmode="open"><button class="save">Second</button><span class="only">only</span></template></app-card>
+</body></html>"""
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", PAGE)
+    browser.go_to("http://example.com/", log=False)
+    return browser
+
+
+def test_shadow_path_finds_element_inside_shadow_root():
+    browser = fake_browser()
+    save = WebElementLocator("Save Button", Find.by_shadow_path("app-card", "button.save"))
+    assert browser.get_text(save, log=False) == "First"
+
+
+def test_shadow_path_searches_every_matching_host():
+    browser = fake_browser()
+    only = WebElementLocator("Only", Find.by_shadow_path("app-card", "span.only"))
+    assert browser.get_text(only, log=False) == "only"
+
+
+def test_shadow_path_skips_hosts_without_shadow_root():
+    browser = fake_browser()
+    missing = WebElementLocator("Missing", Find.by_shadow_path("body", "button.save"))
+    assert not browser.exists(missing, timeout=0, log=False)
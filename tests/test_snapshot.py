@@ -0,0 +1,50 @@
+from slickwd import Browser, BrowserType, Container, Find, WebElementLocator
+
+
+class HomePage(Container):
+    Title = WebElementLocator("Title", Find.by_id("title"))
+    Menu = WebElementLocator("Menu", Find.by_css_selector("nav a.menu"))
+
+    def is_current_page(self, browser):
+        return browser.exists(self.Title, timeout=0, log=False) and browser.exists(self.Menu, timeout=0, log=False)
+
+
+class OtherPage(Container):
+    Text = WebElementLocator("Text", Find.by_tag_name("p"))
+
+    def is_current_page(self, browser):
+        return browser.exists(self.Text, timeout=0, log=False)
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/", "<html><body><h1 id='title'>Home</h1>"
+                                 "<nav><a class='menu' href='/menu'>menu</a></nav></body></html>")
+    browser.wd_instance.add_page("http://example.com/other", "<html><body><p>other</p></body></html>")
+    browser.go_to("http://example.com/", log=False)
+    return browser
+
+
+def test_snapshot_answers_from_the_page_source():
+    browser = fake_browser()
+    snapshot = browser.snapshot(log=False)
+    assert snapshot is not browser
+    assert snapshot.get_text(HomePage.Title, log=False) == "Home"
+    assert snapshot.get_url(log=False) == "http://example.com/"
+    assert HomePage().is_current_page(snapshot)
+
+
+def test_snapshot_is_reused_and_only_changes_when_taken_again():
+    browser = fake_browser()
+    snapshot = browser.snapshot(log=False)
+    browser.go_to("http://example.com/other", log=False)
+    assert snapshot.exists(HomePage.Title, timeout=0, log=False)
+    assert browser.snapshot(log=False) is snapshot
+    assert not snapshot.exists(HomePage.Title, timeout=0, log=False)
+
+
+def test_wait_for_page_with_snapshot():
+    browser = fake_browser()
+    browser.wait_for_page(HomePage, timeout=1, log=False, snapshot=True)
+    browser.go_to("http://example.com/other", log=False)
+    assert browser.first_page_found([HomePage, OtherPage], timeout=1, log=False, snapshot=True) is OtherPage
@@ -0,0 +1,46 @@
+import gc
+import time
+import weakref
+
+from slickwd import Browser, BrowserType, WarmStandby
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition() and time.time() < end:
+        time.sleep(.01)
+    return condition()
+
+
+def test_spare_browser_is_handed_out_and_replaced(hub):
+    standby = WarmStandby(spares=1).install()
+    try:
+        standby.keep(BrowserType.CHROME, hub.remote_url)
+        assert wait_for(lambda: standby.stats['started'] == 1)
+        browser = Browser(BrowserType.CHROME, remote_url=hub.remote_url)
+        assert browser.get_url(log=False) == "about:blank"
+        assert standby.stats['taken'] == 1
+        assert wait_for(lambda: standby.stats['started'] == 2)
+    finally:
+        standby.shutdown()
+
+
+def test_shutdown_quits_spares_and_uninstalls(hub):
+    standby = WarmStandby(spares=2).install()
+    standby.keep(BrowserType.CHROME, hub.remote_url)
+    assert wait_for(lambda: standby.stats['started'] == 2)
+    standby.shutdown()
+    assert Browser.standby is None
+    assert standby.stats['discarded'] == 2
+    assert len([request for request in hub.requests if request[0] == "DELETE"]) == 2
+    assert standby not in WarmStandby._running
+    standby.shutdown()
+
+
+def test_abandoned_standby_can_be_collected():
+    standby = WarmStandby(spares=1)
+    reference = weakref.ref(standby)
+    standby.executor.shutdown()
+    del standby
+    gc.collect()
+    assert reference() is None
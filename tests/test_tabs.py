@@ -0,0 +1,42 @@
+from slickwd import Browser, BrowserType
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/one", "<html><body><p id='one'>one</p></body></html>")
+    browser.wd_instance.add_page("http://example.com/two", "<html><body><p id='two'>two</p></body></html>")
+    browser.go_to("http://example.com/one", log=False)
+    return browser
+
+
+def test_close_current_tab_switches_to_remaining_tab():
+    browser = fake_browser()
+    first = browser.current_tab
+    second = browser.open_tab("http://example.com/two")
+    assert browser.current_tab == second
+    browser.close_tab()
+    assert browser.current_tab == first
+    assert browser.get_tabs() == [first]
+    assert browser.get_url(log=False) == "http://example.com/one"
+
+
+def test_close_current_tab_switches_to_given_tab():
+    browser = fake_browser()
+    first = browser.current_tab
+    second = browser.open_tab("http://example.com/two")
+    third = browser.open_tab()
+    browser.close_tab(switch_to=second)
+    assert browser.current_tab == second
+    assert third not in browser.get_tabs()
+    assert browser.get_url(log=False) == "http://example.com/two"
+    assert first in browser.get_tabs()
+
+
+def test_close_other_tab_stays_in_current_tab():
+    browser = fake_browser()
+    first = browser.current_tab
+    second = browser.open_tab("http://example.com/two")
+    third = browser.open_tab()
+    browser.close_tab(second, switch_to=first)
+    assert browser.current_tab == third
+    assert browser.get_tabs() == [first, third]
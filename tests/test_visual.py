@@ -0,0 +1,128 @@
+import io
+import os
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from slickwd import Browser, BrowserType, Find, VisualComparison, WebElementLocator
+
+numpy = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+SOURCE = """<?xml version="1.0" encoding="UTF-8"?>
+<hierarchy rotation="0">
+  <android.widget.FrameLayout class="android.widget.FrameLayout" bounds="[0,0][1080,1920]" displayed="true">
+    <android.widget.TextView class="android.widget.TextView" resource-id="com.example:id/clock" text="12:00"
+        bounds="[40,1700][1040,1800]" displayed="true"/>
+  </android.widget.FrameLayout>
+</hierarchy>"""
+
+Clock = WebElementLocator("Clock", Find.by_id("com.example:id/clock"))
+
+
+def image(height=192, width=108, color=(255, 255, 255)):
+    return numpy.full((height, width, 3), color, dtype=numpy.uint8)
+
+
+def png(pixels):
+    output = io.BytesIO()
+    Image.fromarray(pixels).save(output, format="PNG")
+    return output.getvalue()
+
+
+def screenshot_browser(pixels):
+    browser = Browser(BrowserType.FAKE_MOBILE, default_timeout=0)
+    browser.wd_instance.load_source(SOURCE)
+    browser.wd_instance.get_window_size = lambda: {'width': 1080, 'height': 1920}
+    browser.wd_instance.get_screenshot_as_png = lambda: png(pixels)
+    return browser
+
+
+def test_identical_images_pass():
+    result = VisualComparison("unused").compare(png(image()), image())
+    assert result.passed
+    assert result.different_pixels == 0
+    assert result.total_pixels == 192 * 108
+
+
+def test_pixels_over_the_tolerance_are_counted():
+    actual = image()
+    actual[0, 0] = (250, 255, 255)
+    actual[1, 1] = (0, 0, 0)
+    result = VisualComparison("unused", tolerance=0.05).compare(actual, image(), name="home")
+    assert result.different_pixels == 1
+    assert result.max_difference == pytest.approx(1.0)
+    assert not result.passed
+    assert repr(result) == "ScreenshotDiff(home: 1 of 20736 pixels differ, max difference 1.000, failed)"
+
+
+def test_max_diff_ratio_allows_a_few_different_pixels():
+    actual = image()
+    actual[0, :2] = (0, 0, 0)
+    assert VisualComparison("unused", max_diff_ratio=0.0001).compare(actual, image()).passed
+    assert not VisualComparison("unused", max_diff_ratio=0.00005).compare(actual, image()).passed
+
+
+def test_images_of_different_sizes_are_not_compared():
+    result = VisualComparison("unused").compare(image(height=100), image())
+    assert result.size_mismatch
+    assert not result.passed
+    assert result.diff_mask is None
+
+
+def test_perceptual_difference_weighs_brightness_over_blue():
+    blue = image(color=(255, 255, 200))
+    grey = image(color=(200, 200, 200))
+    visual = VisualComparison("unused", tolerance=0.02, perceptual=True)
+    assert visual.compare(blue, image()).passed
+    assert not visual.compare(grey, image()).passed
+    assert not VisualComparison("unused", tolerance=0.02).compare(blue, image()).passed
+
+
+def test_masked_pixels_are_ignored_and_not_counted():
+    actual = image()
+    actual[170:180, 4:104] = (0, 0, 0)
+    mask = numpy.zeros((192, 108), dtype=bool)
+    mask[170:180, 4:104] = True
+    result = VisualComparison("unused").compare(actual, image(), mask)
+    assert result.passed
+    assert result.total_pixels == 192 * 108 - 10 * 100
+
+
+def test_mask_covers_the_elements_in_screenshot_pixels():
+    browser = screenshot_browser(image())
+    assert VisualComparison.scale(browser, 108) == pytest.approx(0.1)
+    mask = VisualComparison.mask(browser, [Clock], (192, 108))
+    assert numpy.count_nonzero(mask) == 10 * 100
+    assert mask[170:180, 4:104].all()
+    assert VisualComparison.mask(browser, [], (192, 108)) is None
+
+
+def test_check_saves_a_baseline_then_compares_against_it(tmp_path):
+    pixels = image()
+    browser = screenshot_browser(pixels)
+    visual = VisualComparison(str(tmp_path / "baselines"))
+    assert visual.check(browser, "home page", log=False).passed
+    assert os.path.exists(str(tmp_path / "baselines" / "home_page.png"))
+
+    pixels[170:180, 4:104] = (0, 0, 0)
+    assert not visual.check(browser, "home page", log=False).passed
+    assert visual.check(browser, "home page", ignore=[Clock], log=False).passed
+    assert VisualComparison(str(tmp_path / "baselines")).check(browser, "home page", ignore=[Clock],
+                                                               log=False).passed
+
+
+def test_check_needs_a_name_or_a_page():
+    with pytest.raises(WebDriverException):
+        VisualComparison("unused").check(screenshot_browser(image()), log=False)
+
+
+def test_compare_many_uses_the_saved_baselines(tmp_path):
+    visual = VisualComparison(str(tmp_path))
+    visual.save_baseline("one", png(image()))
+    changed = image()
+    changed[0, 0] = (0, 0, 0)
+    results = visual.compare_many([("one", png(image())), ("one", png(changed))])
+    assert [result.passed for result in results] == [True, False]
+    with pytest.raises(WebDriverException):
+        visual.compare_many([("two", png(image()))])
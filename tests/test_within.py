@@ -0,0 +1,58 @@
+from slickwd import Browser, BrowserType, Find, WebElementLocator
+
+Card = WebElementLocator("Card", Find.by_id("card"))
+Title = WebElementLocator("Card Title", Find.by_css_selector(".title"), within=Card)
+Body = WebElementLocator("Card Body", Find.by_css_selector(".body"), within=Card)
+
+
+def fake_browser():
+    browser = Browser(BrowserType.FAKE, default_timeout=0)
+    browser.wd_instance.add_page("http://example.com/one", "<html><body><p class='title'>outside</p>"
+                                 "<div id='card'><p class='title'>One</p><p class='body'>first</p></div></body></html>")
+    browser.wd_instance.add_page("http://example.com/two", "<html><body>"
+                                 "<div id='card'><p class='title'>Two</p><p class='body'>second</p></div></body></html>")
+    browser.go_to("http://example.com/one", log=False)
+    return browser
+
+
+def count_parent_lookups(monkeypatch):
+    lookups = []
+    original = Card.find_element_matching
+
+    def counting(*args, **kwargs):
+        lookups.append(args)
+        return original(*args, **kwargs)
+    monkeypatch.setattr(Card, "find_element_matching", counting)
+    return lookups
+
+
+def test_within_looks_only_inside_parent():
+    browser = fake_browser()
+    assert browser.get_text(Title, log=False) == "One"
+
+
+def test_parent_is_found_once_for_sibling_lookups(monkeypatch):
+    browser = fake_browser()
+    lookups = count_parent_lookups(monkeypatch)
+    assert browser.get_text(Title, log=False) == "One"
+    assert browser.get_text(Body, log=False) == "first"
+    assert len(lookups) == 1
+
+
+def test_parent_cache_is_cleared_by_go_to(monkeypatch):
+    browser = fake_browser()
+    lookups = count_parent_lookups(monkeypatch)
+    assert browser.get_text(Title, log=False) == "One"
+    browser.go_to("http://example.com/two", log=False)
+    assert browser.get_text(Title, log=False) == "Two"
+    assert len(lookups) == 2
+
+
+def test_parent_cache_is_kept_per_browser():
+    first = fake_browser()
+    second = fake_browser()
+    second.go_to("http://example.com/two", log=False)
+    assert first.get_text(Title, log=False) == "One"
+    assert second.get_text(Title, log=False) == "Two"
+    assert first.get_text(Body, log=False) == "first"
+    assert second.get_text(Body, log=False) == "second"